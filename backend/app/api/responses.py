@@ -0,0 +1,60 @@
+"""
+Fast-path JSON responses for trusted, server-generated data.
+Skips pydantic model construction and response_model validation while
+producing the same JSON as ProductWithPrices / SearchResponse.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-encoded JSON response.
+
+    OPT_UTC_Z renders UTC datetimes with a "Z" suffix, matching pydantic's
+    output for the same values.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def product_payload(product: dict, prices: List[dict], stats: dict, now: datetime) -> dict:
+    """
+    Build a ProductWithPrices-shaped dict from a catalog product.
+
+    Args:
+        product: Catalog product dict
+        prices: Serialized price dicts (see PriceBatch.price_dicts_for)
+        stats: lowest/highest/average price, already rounded
+        now: Timestamp used for created_at/updated_at
+
+    Returns:
+        Dict with the same keys and value types as ProductWithPrices JSON
+    """
+    return {
+        "name": product["name"],
+        "description": product["description"],
+        "category": product["category"],
+        "image_url": product["image_url"],
+        "id": product["id"],
+        "created_at": now,
+        "updated_at": now,
+        "prices": prices,
+        "lowest_price": stats["lowest_price"],
+        "highest_price": stats["highest_price"],
+        "average_price": stats["average_price"],
+    }
+
+
+def search_payload(query: str, products: List[dict], total_results: Optional[int] = None) -> dict:
+    """Build a SearchResponse-shaped dict."""
+    return {
+        "query": query,
+        "total_results": len(products) if total_results is None else total_results,
+        "products": products,
+    }
@@ -1,14 +1,21 @@
+import asyncio
 import logging
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, BackgroundTasks
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
-from app.schemas.product import ProductWithPrices, SearchResponse, PriceInfo
+from app.schemas.product import ProductWithPrices, SearchResponse, PriceInfo, SuggestResponse, Suggestion, PriceHistoryResponse, PriceSeries, PricePoint
 from app.services.scraper import PriceScraper
-from app.data.products_database import search_products, get_products_by_category, get_categories, get_category_stats, get_all_products
+from app.services.price_history import PriceHistoryService, lttb
+from app.data.products_database import search_products, search_products_ranked, fuzzy_search_products, get_products_by_category, get_categories, get_category_stats, get_all_products, get_product_by_id, resolve_category, suggest_products
+from app.core.config import settings
+from app.core.database import get_db
 from app.core.dependencies import require_admin
+from app.api.responses import FastJSONResponse, product_payload, search_payload
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +29,88 @@ except ImportError:
 
 router = APIRouter(prefix="/api", tags=["products"])
 mock_scraper = PriceScraper()
+SOURCE_ORDER = {source.value: i for i, source in enumerate(mock_scraper.SOURCES)}
 
 # Use real scrapers if enabled via environment variable
 USE_REAL_SCRAPERS = os.getenv("USE_REAL_SCRAPERS", "false").lower() in ("true", "1", "yes")
 
 
-def get_scraper_manager():
-    """Get scraper manager instance"""
-    if USE_REAL_SCRAPERS and SCRAPERS_AVAILABLE:
-        return ScraperManager()
-    return None
+def get_scraper_manager(request: Request):
+    """
+    Get the process-wide scraper manager created in the app lifespan.
+
+    Returns None when real scrapers are unavailable.
+    """
+    return getattr(request.app.state, "scraper_manager", None)
+
+
+def _with_prices(products: List[dict]) -> List[dict]:
+    """
+    Attach mock prices to catalog products, priced as a single batch.
+
+    Returns ProductWithPrices-shaped dicts for FastJSONResponse - the data
+    is generated server-side, so it skips model construction and validation.
+    """
+    batch = mock_scraper.scrape_prices_batch(products)
+    now = datetime.now(timezone.utc)
+    return [
+        product_payload(product, batch.price_dicts_for(row), batch.statistics_for(row), now)
+        for row, product in enumerate(products)
+    ]
+
+
+def _current_prices(db: Session, product: dict, background_tasks: BackgroundTasks) -> List[PriceInfo]:
+    """
+    Latest prices for a catalog product from the price history store.
+
+    Stored prices are served while they belong to the current pricing
+    bucket, each with the URL it was observed at (None when it came with
+    none); otherwise prices are scraped and recorded after the response
+    is sent, so the next request reads them back. Falls back to scraping
+    if the store is unavailable.
+    """
+    product_id = product["id"]
+    try:
+        stored = PriceHistoryService.latest_prices(db, [product_id]).get(product_id, [])
+    except SQLAlchemyError as e:
+        logger.warning("Price history unavailable for product %s: %s", product_id, e)
+        db.rollback()
+        return mock_scraper.scrape_prices(product["name"], product.get("base_price"), product_id=product_id)
+
+    bucket_start = mock_scraper.current_bucket() * mock_scraper.bucket_seconds
+    if stored and min(o.observed_at for o in stored) >= bucket_start:
+        stored.sort(key=lambda o: SOURCE_ORDER.get(o.source, len(SOURCE_ORDER)))
+        return [
+            PriceInfo(
+                source=o.source,
+                price=o.price,
+                availability=o.available,
+                url=o.url,
+                last_updated=datetime.fromtimestamp(o.observed_at, tz=timezone.utc),
+            )
+            for o in stored if o.price
+        ]
+    prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"), product_id=product_id)
+    background_tasks.add_task(_record_prices, db.get_bind(), product_id, prices)
+    return prices
+
+
+def _record_prices(bind, product_id: int, prices: List[PriceInfo]) -> None:
+    """Record scraped prices in the price history store (runs after the response, in its own session)."""
+    try:
+        with Session(bind=bind) as db:
+            PriceHistoryService.record_prices(db, product_id, prices)
+    except SQLAlchemyError as e:
+        logger.warning("Could not record prices for product %s: %s", product_id, e)
+
+
+def _record_offers(db: Session, products: List[dict]) -> None:
+    """Record scraped offers in the price history store (blocking)."""
+    try:
+        PriceHistoryService.record_offers(db, products)
+    except SQLAlchemyError as e:
+        logger.warning("Could not record scraped prices: %s", e)
+        db.rollback()
 
 
 @router.get("/products/search", response_model=SearchResponse)
@@ -39,6 +118,10 @@ async def search_products_endpoint(
     query: str = Query(..., min_length=1, description="Search query for products"),
     category: Optional[str] = Query(None, description="Filter by category"),
     use_real_data: bool = Query(False, description="Use real scraping (slower but accurate)"),
+    fuzzy: bool = Query(True, description="Fall back to typo-tolerant matching when nothing matches exactly"),
+    sort: str = Query("relevance", pattern="^(relevance|catalog)$", description="Order results by relevance or catalog order"),
+    manager=Depends(get_scraper_manager),
+    db: Session = Depends(get_db),
 ):
     """
     Search for products by name.
@@ -48,41 +131,46 @@ async def search_products_endpoint(
     Default uses fast mock data for demo purposes.
     """
 
-    if use_real_data and SCRAPERS_AVAILABLE:
+    if use_real_data and manager is not None:
         # Use real scrapers
         logger.info("Using REAL scrapers for query: %s", query)
 
         try:
-            with ScraperManager() as manager:
-                # Search all sites in parallel
-                scraper_results = manager.search_all_parallel(query, max_results_per_site=5)
-
-                # Aggregate results
-                aggregated_products = manager.aggregate_results(scraper_results)
-
-                # Convert to API response format
-                products_with_prices = []
-                for idx, product in enumerate(aggregated_products[:10], start=1):
-                    product_with_prices = ProductWithPrices(
-                        id=idx,
-                        name=product.get('name', ''),
-                        description=product.get('description'),
-                        category=product.get('category'),
-                        image_url=product.get('image_url'),
-                        created_at=datetime.now(timezone.utc),
-                        updated_at=datetime.now(timezone.utc),
-                        prices=product.get('prices', []),
-                        lowest_price=product.get('lowest_price'),
-                        highest_price=product.get('highest_price'),
-                        average_price=product.get('average_price')
-                    )
-                    products_with_prices.append(product_with_prices)
-
-                return SearchResponse(
-                    query=query,
-                    total_results=len(products_with_prices),
-                    products=products_with_prices
+            # Search all sites concurrently without blocking the event loop
+            scraper_results = await manager.search_all(query, max_results_per_site=5)
+
+            # Aggregate results, linked to catalog product ids - matching and the
+            # offer_links lookups are blocking work, so they run off the event loop
+            aggregated_products = await asyncio.to_thread(
+                manager.aggregate_results, scraper_results, link_catalog=True
+            )
+
+            # Keep the scraped prices - detail pages and history read them back
+            await asyncio.to_thread(_record_offers, db, aggregated_products)
+
+            # Convert to API response format
+            products_with_prices = []
+            for product in aggregated_products[:10]:
+                product_with_prices = ProductWithPrices(
+                    id=product['id'],
+                    name=product.get('name', ''),
+                    description=product.get('description'),
+                    category=product.get('category'),
+                    image_url=product.get('image_url'),
+                    created_at=datetime.now(timezone.utc),
+                    updated_at=datetime.now(timezone.utc),
+                    prices=product.get('prices', []),
+                    lowest_price=product.get('lowest_price'),
+                    highest_price=product.get('highest_price'),
+                    average_price=product.get('average_price')
                 )
+                products_with_prices.append(product_with_prices)
+
+            return SearchResponse(
+                query=query,
+                total_results=len(products_with_prices),
+                products=products_with_prices
+            )
         except Exception as e:
             logger.error("Real scraper failed for query '%s': %s", query, e)
             raise HTTPException(status_code=502, detail="Failed to fetch prices from external sources")
@@ -91,53 +179,53 @@ async def search_products_endpoint(
         # Use mock data (fast for demo) with 3000 products database
         logger.info("Using MOCK data for query: %s, category: %s", query, category)
 
-        # Search in the large products database
-        matching_products = search_products(query, category=category)
-
-        # Limit results to 50 for performance
-        matching_products = matching_products[:50]
-
-        # Add price information to each product
-        products_with_prices = []
-        for product in matching_products:
-            prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"))
-            price_stats = mock_scraper.get_price_statistics(prices)
-
-            product_with_prices = ProductWithPrices(
-                id=product["id"],
-                name=product["name"],
-                description=product["description"],
-                category=product["category"],
-                image_url=product["image_url"],
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc),
-                prices=prices,
-                **price_stats
-            )
-            products_with_prices.append(product_with_prices)
+        # Search in the large products database, limited to 50 results for performance
+        if sort == "relevance":
+            matching_products = search_products_ranked(query, category=category, limit=50)
+        else:
+            matching_products = search_products(query, category=category, limit=50)
+        if not matching_products and fuzzy:
+            matching_products = fuzzy_search_products(query, category=category, limit=50)
 
-        return SearchResponse(
-            query=query,
-            total_results=len(products_with_prices),
-            products=products_with_prices
-        )
+        # Add price information to each product (one vectorized batch)
+        products_with_prices = _with_prices(matching_products)
+
+        return FastJSONResponse(search_payload(query, products_with_prices))
+
+
+@router.get("/products/suggest", response_model=SuggestResponse)
+async def suggest_products_endpoint(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Number of suggestions to return"),
+):
+    """
+    Autocomplete product names for search-as-you-type.
+    Served from a prefix index built at startup - no price lookups.
+    """
+    products = suggest_products(q, limit=limit)
+    return SuggestResponse(
+        query=q,
+        suggestions=[
+            Suggestion(id=p["id"], name=p["name"], category=p["category"])
+            for p in products
+        ]
+    )
 
 
 @router.get("/products/{product_id}", response_model=ProductWithPrices)
-async def get_product(product_id: int):
+def get_product(product_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Get a specific product by ID with price comparison.
+    Plain def - FastAPI runs it in its threadpool, off the event loop, as
+    it reads the price history store.
     """
-    products = get_all_products()
-
-    # Find product by ID
-    product = next((p for p in products if p["id"] == product_id), None)
+    product = get_product_by_id(product_id)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Get prices from different sources
-    prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"))
+    # Latest prices from the price history store
+    prices = _current_prices(db, product, background_tasks)
     price_stats = mock_scraper.get_price_statistics(prices)
 
     return ProductWithPrices(
@@ -154,23 +242,63 @@ async def get_product(product_id: int):
 
 
 @router.get("/products/{product_id}/prices", response_model=List[PriceInfo])
-async def get_product_prices(product_id: int):
+def get_product_prices(product_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Get price comparison for a specific product.
-    Returns prices from all available sources.
+    Returns the latest price from all available sources.
     """
-    products = get_all_products()
-
-    # Find product by ID
-    product = next((p for p in products if p["id"] == product_id), None)
+    product = get_product_by_id(product_id)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Get prices from different sources
-    prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"))
+    return _current_prices(db, product, background_tasks)
 
-    return prices
+
+@router.get("/products/{product_id}/history", response_model=PriceHistoryResponse)
+def get_product_history(
+    product_id: int,
+    start: Optional[datetime] = Query(None, alias="from", description="Range start (default: 30 days before 'to')"),
+    end: Optional[datetime] = Query(None, alias="to", description="Range end (default: now)"),
+    resolution: str = Query("auto", pattern="^(auto|raw|hour|day)$", description="Bucket size; auto picks hour up to a week, day beyond"),
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample each source to at most this many points (LTTB)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get a product's price history per source, downsampled on the server.
+    Hourly and daily OHLC buckets come from rollup tables, so a one-year
+    chart reads one row per day per source. Plain def, so those reads run
+    in the threadpool.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="'from' must be before 'to'")
+    if resolution == "auto":
+        resolution = "hour" if end - start <= timedelta(days=7) else "day"
+
+    history = PriceHistoryService.get_history(db, product_id, int(start.timestamp()), int(end.timestamp()), resolution)
+    if not history and get_product_by_id(product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    series = []
+    for source, rows in history.items():
+        if points is not None and len(rows) > points:
+            kept = lttb([row[0] for row in rows], [row[4] for row in rows], points)
+            rows = [rows[i] for i in kept]
+        series.append(PriceSeries(source=source, points=[
+            PricePoint(
+                timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc),
+                open=open_, high=high, low=low, close=close, average=average, count=count,
+            )
+            for timestamp, open_, high, low, close, average, count in rows
+        ]))
+
+    return PriceHistoryResponse(product_id=product_id, resolution=resolution, start=start, end=end, series=series)
 
 
 @router.get("/products", response_model=List[ProductWithPrices])
@@ -182,35 +310,17 @@ async def list_products(
     List all products with price comparison.
     Optionally filter by category.
     """
-    products = get_all_products()
-
-    # Filter by category if provided
+    # Filter by category if provided (case-insensitive)
     if category:
-        products = [p for p in products if p["category"].lower() == category.lower()]
-
-    # Limit results
-    products = products[:limit]
-
-    # Add price information to each product
-    products_with_prices = []
-    for product in products:
-        prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"))
-        price_stats = mock_scraper.get_price_statistics(prices)
-
-        product_with_prices = ProductWithPrices(
-            id=product["id"],
-            name=product["name"],
-            description=product["description"],
-            category=product["category"],
-            image_url=product["image_url"],
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-            prices=prices,
-            **price_stats
-        )
-        products_with_prices.append(product_with_prices)
+        resolved = resolve_category(category)
+        products = get_products_by_category(resolved, limit=limit) if resolved else []
+    else:
+        products = get_all_products()[:limit]
 
-    return products_with_prices
+    # Add price information to each product (one vectorized batch)
+    products_with_prices = _with_prices(products)
+
+    return FastJSONResponse(products_with_prices)
 
 
 @router.get("/categories")
@@ -245,74 +355,70 @@ async def get_category_products(
             products=[]
         )
 
-    # Add price information to each product
-    products_with_prices = []
-    for product in products:
-        prices = mock_scraper.scrape_prices(product["name"], product.get("base_price"))
-        price_stats = mock_scraper.get_price_statistics(prices)
-
-        product_with_prices = ProductWithPrices(
-            id=product["id"],
-            name=product["name"],
-            description=product["description"],
-            category=product["category"],
-            image_url=product["image_url"],
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-            prices=prices,
-            **price_stats
-        )
-        products_with_prices.append(product_with_prices)
+    # Add price information to each product (one vectorized batch)
+    products_with_prices = _with_prices(products)
+
+    return FastJSONResponse(search_payload(category_name, products_with_prices))
 
-    return SearchResponse(
-        query=category_name,
-        total_results=len(products_with_prices),
-        products=products_with_prices
-    )
+
+@router.post("/prices/archive")
+def archive_prices(_: dict = Depends(require_admin), db: Session = Depends(get_db)):
+    """
+    Move whole months of price observations older than
+    PRICE_ARCHIVE_AFTER_DAYS into compressed column archives.
+    Plain def - archiving rewrites whole partitions, so it runs in the
+    threadpool rather than on the event loop.
+    """
+    before = datetime.now(timezone.utc) - timedelta(days=settings.PRICE_ARCHIVE_AFTER_DAYS)
+    return {"archived_partitions": PriceHistoryService.archive_partitions(db, before)}
 
 
 @router.get("/scraper/status")
-async def scraper_status(_: dict = Depends(require_admin)):
+async def scraper_status(_: dict = Depends(require_admin), manager=Depends(get_scraper_manager)):
     """
-    Get status of real scrapers.
+    Get status of real scrapers, with cache and request-coalescing statistics.
     """
     return {
         "scrapers_available": SCRAPERS_AVAILABLE,
         "use_real_scrapers": USE_REAL_SCRAPERS,
         "enabled_scrapers": ["zap", "ksp", "bug"] if SCRAPERS_AVAILABLE else [],
-        "message": "Real scrapers active" if USE_REAL_SCRAPERS and SCRAPERS_AVAILABLE else "Using mock data"
+        "message": "Real scrapers active" if USE_REAL_SCRAPERS and SCRAPERS_AVAILABLE else "Using mock data",
+        "stats": manager.stats() if manager is not None else None
     }
 
 
 @router.post("/scraper/test")
-async def test_scrapers(query: str = Query("mouse", description="Test query"), _: dict = Depends(require_admin)):
+async def test_scrapers(
+    query: str = Query("mouse", description="Test query"),
+    _: dict = Depends(require_admin),
+    manager=Depends(get_scraper_manager),
+):
     """
     Test real scrapers with a query.
     This endpoint always uses real scraping.
     """
-    if not SCRAPERS_AVAILABLE:
+    if manager is None:
         raise HTTPException(
             status_code=503,
             detail="Real scrapers not available. Install required packages: beautifulsoup4, selenium, requests"
         )
 
     try:
-        with ScraperManager() as manager:
-            results = manager.search_all_parallel(query, max_results_per_site=3)
-
-            # Format results for response
-            formatted_results = {}
-            for scraper_name, products in results.items():
-                formatted_results[scraper_name] = {
-                    "count": len(products),
-                    "products": products[:3]  # Return top 3 from each
-                }
-
-            return {
-                "query": query,
-                "results": formatted_results,
-                "total_products": sum(len(p) for p in results.values())
+        results = await manager.search_all(query, max_results_per_site=3)
+
+        # Format results for response
+        formatted_results = {}
+        for scraper_name, products in results.items():
+            formatted_results[scraper_name] = {
+                "count": len(products),
+                "products": products[:3]  # Return top 3 from each
             }
+
+        return {
+            "query": query,
+            "results": formatted_results,
+            "total_products": sum(len(p) for p in results.values())
+        }
     except Exception as e:
         logger.error("Scraper test failed for query '%s': %s", query, e)
         raise HTTPException(status_code=502, detail="Scraper test failed")
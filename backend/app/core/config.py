@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -27,6 +27,45 @@ class Settings(BaseSettings):
     MAX_LOGIN_ATTEMPTS: int = 5
     LOCKOUT_DURATION_MINUTES: int = 30
 
+    # Mock pricing - prices are stable within a time bucket and cached
+    PRICE_BUCKET_SECONDS: int = 900
+    PRICE_CACHE_SIZE: int = 10000
+    PRICE_BATCH_CACHE_SIZE: int = 256
+
+    # Real scrapers - size of the process-wide worker pool used for
+    # blocking fetches and HTML parsing
+    SCRAPER_MAX_WORKERS: int = 8
+
+    # Search page parser backend: "lxml" (compiled XPath), "strainer"
+    # (SoupStrainer over product containers) or "soup" (full tree)
+    SCRAPER_PARSER_BACKEND: str = "lxml"
+
+    # Real-data searches return whatever sites answered by the deadline;
+    # slow requests are hedged after SCRAPE_HEDGE_AFTER_SECONDS (0 = off)
+    SCRAPE_DEADLINE_SECONDS: float = 10.0
+    SCRAPE_HEDGE_AFTER_SECONDS: float = 0.0
+
+    # Scrape result cache - results are fresh for the TTL (per-site
+    # overrides by scraper name, e.g. {"zap": 300}), then served stale while
+    # refreshed in the background. Set SCRAPE_CACHE_PATH to persist to SQLite.
+    SCRAPE_CACHE_TTL_SECONDS: int = 600
+    SCRAPE_CACHE_STALE_SECONDS: int = 3600
+    SCRAPE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    SCRAPE_CACHE_SITE_TTLS: Dict[str, int] = {}
+    SCRAPE_CACHE_PATH: str = ""
+
+    # HTTP cache for scraped pages (ETag / Last-Modified revalidation,
+    # Cache-Control max-age) - memory budget for stored page bodies
+    HTTP_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # Catalog linking of scraped listings - in-memory entries kept in
+    # front of the persistent offer_links table
+    CATALOG_LINK_CACHE_SIZE: int = 50000
+
+    # Price history - whole months of observations older than this are
+    # moved into compressed column archives by POST /api/prices/archive
+    PRICE_ARCHIVE_AFTER_DAYS: int = 90
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     AUTH_RATE_LIMIT_PER_MINUTE: int = 10
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -16,6 +17,23 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def insert_ignoring_duplicates(db, model):
+    """
+    INSERT statement for a model that skips rows whose key is already stored.
+
+    Uses ON CONFLICT DO NOTHING on SQLite and PostgreSQL, so a row a
+    concurrent writer stored first doesn't fail the whole batch; with
+    .returning() only the rows actually inserted come back. Other
+    databases get a plain INSERT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
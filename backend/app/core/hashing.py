@@ -0,0 +1,14 @@
+"""
+Vectorized integer hashing shared by the mock price generator and
+MinHash offer matching.
+"""
+
+import numpy as np
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer over a uint64 array (arithmetic wraps mod 2**64)."""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
@@ -0,0 +1,74 @@
+"""
+Text normalization shared by catalog search and scraper aggregation.
+Handles Hebrew niqqud, geresh/gershayim, final letter forms and unit
+spacing ("256 GB" -> "256gb") with precompiled tables and patterns.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+
+# Hebrew points and cantillation marks (U+0591-U+05C7) are dropped, except
+# the maqaf and punctuation marks in that block, which become spaces.
+_HEBREW_MARKS = {code: None for code in range(0x0591, 0x05C8)}
+_HEBREW_MARKS.update({0x05BE: ' ', 0x05C0: ' ', 0x05C3: ' ', 0x05C6: ' '})
+
+# Final letter forms fold into their regular forms (ם -> מ) so "אינץ" and
+# "אינצים" share a prefix.
+_FINAL_LETTERS = {'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'}
+
+# Geresh, gershayim and quote-like characters are removed so 'אינץ׳',
+# 'מ"ל' and "L'Occitane" normalize to single words.
+_QUOTES = "׳״'\"`‘’“”"
+
+_TRANSLATE_TABLE = str.maketrans({
+    **_HEBREW_MARKS,
+    **{ord(k): v for k, v in _FINAL_LETTERS.items()},
+    **{ord(q): None for q in _QUOTES},
+})
+
+# "256 GB", "5000 mAh", "65 W" -> "256gb", "5000mah", "65w"
+_UNIT_SPACING = re.compile(r"(?<=\d)\s+(?=(?:tb|gb|mb|mah|mp|hz|khz|ml|kg|mm|cm|w|g|l|m)\b)")
+
+_WHITESPACE = re.compile(r"\s+")
+
+NORMALIZE_CACHE_SIZE = 65536
+
+
+def _normalize(text: str) -> str:
+    """Uncached normalization - see normalize()."""
+    text = text.translate(_TRANSLATE_TABLE).lower()
+    text = _UNIT_SPACING.sub('', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize(text: str) -> str:
+    """
+    Normalize text for matching.
+
+    Lowercases, strips niqqud, removes geresh/gershayim and quotes, folds
+    Hebrew final letters, joins numbers to their units and collapses
+    whitespace. Results are LRU-cached, since the same queries and
+    product names are normalized over and over.
+
+    Args:
+        text: Raw text
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ''
+    return _normalize(text)
+
+
+def normalize_many(texts: Iterable[str]) -> List[str]:
+    """
+    Normalize a batch of texts.
+
+    Bypasses the LRU cache so bulk work (index builds, large scrape
+    batches) does not evict hot query entries.
+    """
+    return [_normalize(text) if text else '' for text in texts]
@@ -0,0 +1,150 @@
+"""
+Trigram index for typo-tolerant catalog search.
+Indexes the token vocabulary (not whole documents) so misspelled query
+words like "galxy" can be mapped to indexed words like "galaxy".
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Dict, Tuple
+
+
+DEFAULT_THRESHOLD = 0.5
+
+
+def trigrams(token: str) -> frozenset:
+    """
+    Return the set of padded character trigrams of a token.
+
+    The token is padded with two leading spaces and one trailing space,
+    so word starts weigh more than word ends ("galxy" still shares
+    "  g", " ga", "gal" with "galaxy").
+    """
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice_similarity(a: frozenset, b: frozenset) -> float:
+    """Dice coefficient between two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TrigramIndex:
+    """
+    Trigram -> term index for fuzzy term lookup.
+
+    Each trigram posting list holds term ids ordered by the term's trigram
+    count, so the Dice length bound can be applied with a binary search
+    instead of scanning every term that shares a common trigram. Only the
+    rarest query trigrams are scanned for candidates (prefix filtering);
+    common ones like "  s" never are.
+    """
+
+    def __init__(self):
+        self._terms: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._posting_sizes: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(cls, terms: Iterable[str]) -> "TrigramIndex":
+        """Build an index over a vocabulary of terms."""
+        index = cls()
+        postings: Dict[str, List[int]] = {}
+        for term in terms:
+            grams = trigrams(term)
+            term_id = len(index._terms)
+            index._terms.append(term)
+            index._sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+
+        sizes = index._sizes
+        for gram, term_ids in postings.items():
+            term_ids.sort(key=sizes.__getitem__)
+            index._postings[gram] = term_ids
+            index._posting_sizes[gram] = [sizes[t] for t in term_ids]
+        return index
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def terms_containing(self, fragment: str) -> List[str]:
+        """
+        Find indexed terms that contain a fragment anywhere ("phone" -> "iphone").
+
+        Fragments of three or more characters are looked up through their
+        rarest inner trigram and verified; shorter ones through every
+        trigram that contains them, which needs no verification.
+        """
+        if not fragment:
+            return []
+        if len(fragment) < 3:
+            term_ids = set()
+            for gram, posting in self._postings.items():
+                if fragment in gram:
+                    term_ids.update(posting)
+            return [self._terms[term_id] for term_id in sorted(term_ids)]
+
+        rarest = None
+        for i in range(len(fragment) - 2):
+            posting = self._postings.get(fragment[i:i + 3])
+            if not posting:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        terms = self._terms
+        return [terms[term_id] for term_id in sorted(rarest) if fragment in terms[term_id]]
+
+    def similar_terms(self, token: str, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+        """
+        Find indexed terms similar to a token.
+
+        Args:
+            token: Query token (already lowercased)
+            threshold: Minimum Dice similarity, between 0 and 1
+
+        Returns:
+            List of (term, similarity) sorted by similarity, best first
+        """
+        grams = trigrams(token)
+        size = len(grams)
+        # Dice >= t  =>  t * size / (2 - t) <= other_size <= (2 - t) * size / t
+        min_size = threshold * size / (2 - threshold)
+        max_size = (2 - threshold) * size / threshold
+        # ... and the terms share at least t * (size + other_size) / 2 trigrams
+        required = max(1, math.ceil(threshold * (size + math.ceil(min_size)) / 2 - 1e-9))
+
+        # Prefix filter: a term sharing `required` of the query's trigrams shares
+        # one of any size - required + 1 of them, so only the rarest (after the
+        # length bound) are scanned for candidates, which are then verified
+        ranges = []
+        for gram in grams:
+            term_ids = self._postings.get(gram)
+            if not term_ids:
+                ranges.append((0, gram, 0, 0))
+                continue
+            sizes = self._posting_sizes[gram]
+            start = bisect_left(sizes, min_size)
+            end = bisect_right(sizes, max_size, start)
+            ranges.append((end - start, gram, start, end))
+        ranges.sort()
+
+        candidates = set()
+        for _, gram, start, end in ranges[:size - required + 1]:
+            if end > start:
+                candidates.update(self._postings[gram][start:end])
+
+        matches = []
+        terms, sizes = self._terms, self._sizes
+        for term_id in candidates:
+            term = terms[term_id]
+            padded = f"  {term} "
+            common = sum(gram in padded for gram in grams)
+            score = 2 * common / (size + sizes[term_id])
+            if score >= threshold:
+                matches.append((term, score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
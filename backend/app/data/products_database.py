@@ -3,8 +3,16 @@ Product database for the price comparison platform.
 Auto-generated from TypeScript template files.
 """
 
+import heapq
+import math
+import threading
 from typing import List, Dict, Optional
 
+from app.core.normalization import normalize, normalize_many
+from app.data.search_index import InvertedIndex, tokenize, union_postings, DEFAULT_FIELDS
+from app.data.fuzzy_index import TrigramIndex, DEFAULT_THRESHOLD
+from app.data.suggest_index import SuggestIndex
+
 
 electronics_products: list[tuple[str, str, int]] = [
     ('iPhone 15 Pro Max 256GB', 'iPhone 15 Pro Max עם מסך 6.7 אינץ׳, שבב A17 Pro, מצלמה טיטניום', 5299),
@@ -856,45 +864,270 @@ for _templates, _category, _start_id in CATEGORY_CONFIG:
     PRODUCTS_DATABASE.extend(generate_products(_templates, _category, _start_id))
 
 
+# Ids for scraped products with no catalog match start here, above any catalog id
+UNLINKED_ID_BASE = 1 << 32
+
+# Derived lookup structures, rebuilt whenever the catalog is (re)loaded
+_PRODUCTS_BY_ID: dict[int, dict] = {}
+_CATEGORY_PARTITIONS: dict[str, list[dict]] = {}
+_CATEGORY_BY_LOWER: dict[str, str] = {}
+_CATEGORY_STATS: dict[str, int] = {}
+
+# Search indexes - built on first use (or at startup), see ensure_indexes()
+_SEARCH_INDEX: InvertedIndex = InvertedIndex()
+_FUZZY_INDEX: TrigramIndex = TrigramIndex()
+_SUGGEST_INDEX: SuggestIndex = SuggestIndex()
+_SEARCH_TEXT: dict[int, str] = {}
+_INDEXES_READY = False
+_INDEX_LOCK = threading.RLock()
+
+# Bumped by load_catalog() so caches of catalog lookups can tell they are stale
+_CATALOG_VERSION = 0
+
+# Separates fields in _SEARCH_TEXT so a query never matches across two fields
+_FIELD_SEPARATOR = '\x00'
+
+
+def _build_lookups() -> None:
+    """Build the id lookup and category partitions."""
+    global _PRODUCTS_BY_ID, _CATEGORY_PARTITIONS, _CATEGORY_BY_LOWER, _CATEGORY_STATS
+    _PRODUCTS_BY_ID = {p['id']: p for p in PRODUCTS_DATABASE}
+
+    partitions: dict[str, list[dict]] = {category: [] for _, category, _ in CATEGORY_CONFIG}
+    for product in PRODUCTS_DATABASE:
+        partitions.setdefault(product['category'], []).append(product)
+    _CATEGORY_PARTITIONS = partitions
+    _CATEGORY_BY_LOWER = {category.lower(): category for category in partitions}
+    _CATEGORY_STATS = {category: len(products) for category, products in partitions.items()}
+
+
+def _build_indexes() -> None:
+    """Build the search, fuzzy and suggest indexes and the normalized search text."""
+    global _SEARCH_INDEX, _FUZZY_INDEX, _SUGGEST_INDEX, _SEARCH_TEXT
+    _SEARCH_INDEX = InvertedIndex.build(PRODUCTS_DATABASE)
+    _FUZZY_INDEX = TrigramIndex.build(_SEARCH_INDEX.vocabulary)
+    _SUGGEST_INDEX = SuggestIndex.build(PRODUCTS_DATABASE)
+    _SEARCH_TEXT = {
+        p['id']: _FIELD_SEPARATOR.join(normalize_many(p.get(field) for field in DEFAULT_FIELDS))
+        for p in PRODUCTS_DATABASE
+    }
+
+
+def ensure_indexes() -> None:
+    """
+    Build the search indexes if the catalog changed since they were last built.
+
+    Building takes seconds on large catalogs, so it is not done at import;
+    the app calls this at startup and every search function calls it too.
+    """
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
+    with _INDEX_LOCK:
+        if not _INDEXES_READY:
+            _build_indexes()
+            _INDEXES_READY = True
+
+
+_build_lookups()
+
+
+def load_catalog(products: list[dict]) -> None:
+    """Replace the catalog contents; search indexes are rebuilt on next use."""
+    global _INDEXES_READY, _SEARCH_INDEX, _FUZZY_INDEX, _SUGGEST_INDEX, _SEARCH_TEXT, _CATALOG_VERSION
+    with _INDEX_LOCK:
+        PRODUCTS_DATABASE[:] = products
+        _build_lookups()
+        # Free the old indexes now rather than holding them until the rebuild
+        _SEARCH_INDEX, _FUZZY_INDEX, _SUGGEST_INDEX, _SEARCH_TEXT = InvertedIndex(), TrigramIndex(), SuggestIndex(), {}
+        _INDEXES_READY = False
+        _CATALOG_VERSION += 1
+
+
+def catalog_version() -> int:
+    """Return a counter that changes whenever the catalog is reloaded."""
+    return _CATALOG_VERSION
+
+
 def get_all_products() -> list[dict]:
     """Return all products."""
     return PRODUCTS_DATABASE
 
 
-def search_products(query: str, category: Optional[str] = None) -> list[dict]:
-    """Search products by name, description, or category."""
-    query_lower = query.lower()
-    results = []
-    for product in PRODUCTS_DATABASE:
-        if category and product['category'] != category:
+def get_product_by_id(product_id: int) -> Optional[dict]:
+    """Return a single product by id, or None if it does not exist."""
+    return _PRODUCTS_BY_ID.get(product_id)
+
+
+def get_products_by_ids(product_ids: list[int]) -> list[dict]:
+    """Return products for the given ids in request order, skipping unknown ids."""
+    lookup = _PRODUCTS_BY_ID
+    return [lookup[pid] for pid in product_ids if pid in lookup]
+
+
+def _substring_candidates(query: str) -> Optional[List[int]]:
+    """
+    Ids of products that may contain the normalized query, in id order.
+
+    A product containing the query contains each query word inside one of
+    its indexed words. Only the longest (usually rarest) word is looked up
+    - the candidates are verified against the full text anyway, and short
+    words like "15" occur inside too many indexed words to be worth it.
+    Returns None when the query has no words and every product is a
+    candidate.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    token = max(tokens, key=len)
+    return union_postings([
+        _SEARCH_INDEX.postings(term, prefix=False) for term in _FUZZY_INDEX.terms_containing(token)
+    ])
+
+
+def _substring_matches(query: str, category: Optional[str] = None, limit: Optional[int] = None) -> list[int]:
+    """Ids of products containing the normalized query in one field, in catalog order."""
+    if limit is not None and limit <= 0:
+        return []
+    ensure_indexes()
+    needle = normalize(query)
+    candidates = _substring_candidates(query)
+    if candidates is None:
+        candidates = list(_SEARCH_TEXT)
+    text = _SEARCH_TEXT
+    lookup = _PRODUCTS_BY_ID
+    matches = []
+    for pid in candidates:
+        if needle not in text[pid]:
+            continue
+        if category and lookup[pid]['category'] != category:
+            continue
+        matches.append(pid)
+        if len(matches) == limit:
+            break
+    return matches
+
+
+def search_products(query: str, category: Optional[str] = None, limit: Optional[int] = None) -> list[dict]:
+    """
+    Search products by name, description, or category.
+
+    Matches products where the query occurs as a substring of one field
+    after normalization (case, niqqud, geresh, final letters, unit
+    spacing), so "phone" finds every iPhone. Candidates come from the
+    word and trigram indexes and are verified against the normalized
+    text. Results are returned in catalog order; with a limit, the scan
+    stops at the first `limit` matches.
+    """
+    return get_products_by_ids(_substring_matches(query, category, limit))
+
+
+def search_products_ranked(query: str, category: Optional[str] = None, limit: int = 50) -> list[dict]:
+    """
+    Search products and return the `limit` most relevant, best first.
+
+    Matches the same products as search_products() - the query anywhere
+    inside a field - and scores them with BM25F over name, description
+    and category. Query words found inside a longer word ("phone" in
+    "iphone") count like prefix matches.
+    """
+    matches = _substring_matches(query, category)
+    hits = _SEARCH_INDEX.rank(query, matches, limit, expand=_FUZZY_INDEX.terms_containing)
+    return get_products_by_ids([product_id for product_id, _ in hits])
+
+
+def search_products_any(query: str, limit: int = 20) -> list[dict]:
+    """
+    Return the `limit` products sharing the most query words, best first.
+
+    Unlike search_products(), a product only has to match one word
+    (exactly, not as a prefix). Shared words are weighted by IDF, so a
+    model number counts far more than a brand - suited to noisy listing
+    names from other sites, which rarely match every word.
+    """
+    ensure_indexes()
+    scores: dict[int, float] = {}
+    total = len(PRODUCTS_DATABASE)
+    for token in dict.fromkeys(tokenize(query)):
+        postings = _SEARCH_INDEX.postings(token, prefix=False)
+        if not postings:
             continue
-        if (query_lower in product['name'].lower() or
-                query_lower in product['description'].lower() or
-                query_lower in product['category'].lower()):
-            results.append(product)
-    return results
+        weight = math.log1p(total / len(postings))
+        for product_id in postings:
+            scores[product_id] = scores.get(product_id, 0.0) + weight
+    ranked = heapq.nsmallest(limit, scores, key=lambda pid: (-scores[pid], pid))
+    return get_products_by_ids(ranked)
+
+
+def fuzzy_search_products(
+    query: str,
+    category: Optional[str] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """
+    Typo-tolerant search using trigram similarity.
+
+    Each query word is mapped to indexed words whose trigram Dice
+    similarity is at least `threshold` (prefix matches count as exact).
+    Products must match every query word; they are ranked by the summed
+    word similarity, best first.
+    """
+    ensure_indexes()
+    scores: Optional[dict[int, float]] = None
+    for token in dict.fromkeys(tokenize(query)):
+        term_scores = {term: 1.0 for term in _SEARCH_INDEX.expand(token)}
+        for term, similarity in _FUZZY_INDEX.similar_terms(token, threshold):
+            term_scores.setdefault(term, similarity)
+
+        token_scores: dict[int, float] = {}
+        for term, similarity in term_scores.items():
+            for product_id in _SEARCH_INDEX.postings(term, prefix=False):
+                if similarity > token_scores.get(product_id, 0.0):
+                    token_scores[product_id] = similarity
+
+        if scores is None:
+            scores = token_scores
+        else:
+            scores = {pid: score + token_scores[pid] for pid, score in scores.items() if pid in token_scores}
+        if not scores:
+            return []
+
+    if not scores:
+        return []
+    if category:
+        scores = {pid: score for pid, score in scores.items() if _PRODUCTS_BY_ID[pid]['category'] == category}
+    if limit is not None:
+        ranked = heapq.nsmallest(limit, scores, key=lambda pid: (-scores[pid], pid))
+    else:
+        ranked = sorted(scores, key=lambda pid: (-scores[pid], pid))
+    return get_products_by_ids(ranked)
+
+
+def suggest_products(prefix: str, limit: int = 8) -> list[dict]:
+    """Return products whose name (or a word-suffix of it) starts with the prefix."""
+    ensure_indexes()
+    return get_products_by_ids(_SUGGEST_INDEX.suggest(prefix, limit))
 
 
 def get_products_by_category(category: str, limit: Optional[int] = None) -> list[dict]:
     """Get products filtered by category with optional limit."""
-    results = [p for p in PRODUCTS_DATABASE if p['category'] == category]
+    products = _CATEGORY_PARTITIONS.get(category, [])
     if limit is not None:
-        return results[:limit]
-    return results
+        return products[:limit]
+    return list(products)
+
+
+def resolve_category(category: str) -> Optional[str]:
+    """Return the canonical category name for a case-insensitive match, or None."""
+    return _CATEGORY_BY_LOWER.get(category.lower())
 
 
 def get_categories() -> list[str]:
     """Return a list of all unique categories."""
-    seen = []
-    for _, category, _ in CATEGORY_CONFIG:
-        if category not in seen:
-            seen.append(category)
-    return seen
+    return list(_CATEGORY_PARTITIONS)
 
 
 def get_category_stats() -> dict:
     """Return product count per category."""
-    stats = {}
-    for category in get_categories():
-        stats[category] = len(get_products_by_category(category))
-    return stats
+    return dict(_CATEGORY_STATS)
@@ -0,0 +1,363 @@
+"""
+Inverted token index for the product catalog.
+Maps normalized tokens to sorted posting lists of product ids.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+
+from app.core.normalization import normalize, normalize_many
+
+
+# Unicode-aware word pattern - matches Latin, Hebrew and digits alike
+TOKEN_PATTERN = re.compile(r"\w+")
+
+DEFAULT_FIELDS = ('name', 'description', 'category')
+
+# BM25F field weights - a name hit counts three times a description hit
+DEFAULT_FIELD_WEIGHTS = {'name': 3.0, 'description': 1.0, 'category': 0.5}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multiplier for tokens matched only as part of a longer word
+# ("pro" -> "proart", "phone" -> "iphone")
+PREFIX_MATCH_WEIGHT = 0.25
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized word tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def intersect_postings(lists: List[List[int]]) -> List[int]:
+    """
+    Intersect sorted posting lists.
+
+    Walks the shortest list and binary-searches the others from the last
+    matched position, so the cost is O(m log n) for the smallest list m.
+    """
+    if not lists:
+        return []
+    ordered = sorted(lists, key=len)
+    result = ordered[0]
+    for other in ordered[1:]:
+        if not result:
+            break
+        matched = []
+        pos = 0
+        other_len = len(other)
+        for doc_id in result:
+            pos = bisect_left(other, doc_id, pos)
+            if pos == other_len:
+                break
+            if other[pos] == doc_id:
+                matched.append(doc_id)
+        result = matched
+    return list(result)
+
+
+def union_postings(lists: List[List[int]]) -> List[int]:
+    """Union sorted posting lists into a single sorted, de-duplicated list."""
+    if not lists:
+        return []
+    if len(lists) == 1:
+        return list(lists[0])
+    merged = set()
+    for posting in lists:
+        merged.update(posting)
+    return sorted(merged)
+
+
+class InvertedIndex:
+    """
+    Token -> posting list index over product records.
+
+    Posting lists hold product ids in ascending order. Query tokens are
+    matched as prefixes of indexed tokens, so partial words such as "Sams"
+    or "אוזני" still find their products.
+
+    Every posting also carries a precomputed BM25F impact (the token's
+    score contribution for that product), and each token keeps its
+    postings ordered by impact so top_k() can stop early.
+    """
+
+    def __init__(self, fields: Iterable[str] = DEFAULT_FIELDS, field_weights: Optional[Dict[str, float]] = None):
+        self.fields = tuple(fields)
+        weights = DEFAULT_FIELD_WEIGHTS if field_weights is None else field_weights
+        self.field_weights = tuple(weights.get(field, 1.0) for field in self.fields)
+        self._postings: Dict[str, List[int]] = {}
+        self._vocabulary: List[str] = []
+        # Build-time state: per-posting field term frequencies and per-doc field lengths
+        self._term_freqs: Dict[str, List[Tuple[int, ...]]] = {}
+        self._doc_lengths: Dict[int, Tuple[int, ...]] = {}
+        # Query-time ranking state
+        self._impacts: Dict[str, Dict[int, float]] = {}
+        self._impact_order: Dict[str, List[Tuple[float, int]]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        products: Iterable[dict],
+        fields: Iterable[str] = DEFAULT_FIELDS,
+        field_weights: Optional[Dict[str, float]] = None,
+    ) -> "InvertedIndex":
+        """Build an index from product dicts with an 'id' key."""
+        index = cls(fields, field_weights)
+        for product in products:
+            index.add(product)
+        index.finalize()
+        return index
+
+    def add(self, product: dict) -> None:
+        """Add a single product to the index. Call finalize() when done."""
+        doc_id = product['id']
+        field_count = len(self.fields)
+        counts: Dict[str, List[int]] = {}
+        lengths = []
+        texts = normalize_many(product.get(field) for field in self.fields)
+        for field_pos, text in enumerate(texts):
+            field_tokens = TOKEN_PATTERN.findall(text)
+            lengths.append(len(field_tokens))
+            for token in field_tokens:
+                tf = counts.get(token)
+                if tf is None:
+                    tf = counts[token] = [0] * field_count
+                tf[field_pos] += 1
+        self._doc_lengths[doc_id] = tuple(lengths)
+        for token, tf in counts.items():
+            self._postings.setdefault(token, []).append(doc_id)
+            self._term_freqs.setdefault(token, []).append(tuple(tf))
+
+    def finalize(self) -> None:
+        """
+        Sort posting lists, rebuild the sorted vocabulary used for prefix
+        lookups and precompute BM25F impacts.
+        """
+        doc_count = len(self._doc_lengths) or 1
+        avg_lengths = [
+            (sum(lengths[pos] for lengths in self._doc_lengths.values()) / doc_count) or 1.0
+            for pos in range(len(self.fields))
+        ]
+        weighted_fields = list(zip(self.field_weights, avg_lengths))
+
+        for token, posting in self._postings.items():
+            pairs = sorted(zip(posting, self._term_freqs[token]))
+            posting[:] = [doc_id for doc_id, _ in pairs]
+
+            df = len(posting)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            impacts = {}
+            for doc_id, tf in pairs:
+                lengths = self._doc_lengths[doc_id]
+                weighted_tf = 0.0
+                for pos, (weight, avg_length) in enumerate(weighted_fields):
+                    if tf[pos]:
+                        norm = 1 - BM25_B + BM25_B * lengths[pos] / avg_length
+                        weighted_tf += weight * tf[pos] / norm
+                impacts[doc_id] = idf * weighted_tf * (BM25_K1 + 1) / (weighted_tf + BM25_K1)
+            self._impacts[token] = impacts
+            self._impact_order[token] = sorted(((-impact, doc_id) for doc_id, impact in impacts.items()))
+
+        self._term_freqs = {}
+        self._doc_lengths = {}
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    @property
+    def vocabulary(self) -> List[str]:
+        """Sorted list of all indexed tokens."""
+        return self._vocabulary
+
+    def expand(self, token: str) -> List[str]:
+        """Return all indexed tokens starting with the given prefix."""
+        start = bisect_left(self._vocabulary, token)
+        end = bisect_left(self._vocabulary, token + '\uffff', start)
+        return self._vocabulary[start:end]
+
+    def postings(self, token: str, prefix: bool = True) -> List[int]:
+        """Return the posting list for a token (union over prefix expansions)."""
+        if not prefix:
+            return self._postings.get(token, [])
+        expansions = self.expand(token)
+        if len(expansions) == 1:
+            return self._postings[expansions[0]]
+        return union_postings([self._postings[t] for t in expansions])
+
+    def search(self, query: str, mode: str = 'all') -> List[int]:
+        """
+        Return ids of products matching the query.
+
+        Args:
+            query: Free-text query, split into tokens
+            mode: 'all' to require every token (intersection),
+                  'any' to match at least one token (union)
+
+        Returns:
+            Sorted list of matching product ids
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        lists = [self.postings(token) for token in dict.fromkeys(tokens)]
+        if mode == 'any':
+            return union_postings(lists)
+        return intersect_postings(lists)
+
+    def _token_impacts(self, token: str, expansions: List[str]) -> Dict[int, float]:
+        """Merge impacts of a token's expansions, keeping the best per product."""
+        if expansions == [token]:
+            return self._impacts[token]
+        merged: Dict[int, float] = {}
+        for term in expansions:
+            weight = 1.0 if term == token else PREFIX_MATCH_WEIGHT
+            for doc_id, impact in self._impacts[term].items():
+                impact *= weight
+                if impact > merged.get(doc_id, 0.0):
+                    merged[doc_id] = impact
+        return merged
+
+    def _impact_stream(self, token: str, expansions: List[str]) -> Iterator[Tuple[float, int]]:
+        """Yield (-impact, product_id) for a token in descending impact order."""
+        if expansions == [token]:
+            return iter(self._impact_order[token])
+        streams = []
+        for term in expansions:
+            if term == token:
+                streams.append(self._impact_order[term])
+            else:
+                streams.append((neg * PREFIX_MATCH_WEIGHT, doc_id) for neg, doc_id in self._impact_order[term])
+        return heapq.merge(*streams)
+
+    def top_k(
+        self,
+        query: str,
+        k: int,
+        accept: Optional[Callable[[int], bool]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the k best matching products by BM25F score.
+
+        Every query token must match (as in search()). Uses the threshold
+        algorithm over impact-ordered postings: products are visited in
+        descending impact order of each token, and the scan stops as soon
+        as the k-th best score beats the best score any unseen product
+        could still reach.
+
+        Args:
+            query: Free-text query
+            k: Number of results to return
+            accept: Optional filter called with a product id
+
+        Returns:
+            List of (product_id, score), best first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or k <= 0:
+            return []
+
+        token_impacts = []
+        streams = []
+        for token in tokens:
+            expansions = self.expand(token)
+            if not expansions:
+                return []
+            token_impacts.append(self._token_impacts(token, expansions))
+            streams.append(self._impact_stream(token, expansions))
+
+        # Drive the scan from the rarest token; the others are probed by id
+        order = sorted(range(len(tokens)), key=lambda pos: len(token_impacts[pos]))
+        token_impacts = [token_impacts[pos] for pos in order]
+        streams = [streams[pos] for pos in order]
+
+        frontier = [float('inf')] * len(streams)
+        heap: List[Tuple[float, int]] = []
+        seen = set()
+        exhausted = False
+        while not exhausted:
+            for pos, stream in enumerate(streams):
+                entry = next(stream, None)
+                if entry is None:
+                    # Every full match appears in every stream, so all have been seen
+                    exhausted = True
+                    break
+                neg_impact, doc_id = entry
+                frontier[pos] = -neg_impact
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if accept is not None and not accept(doc_id):
+                    continue
+
+                score = 0.0
+                for impacts in token_impacts:
+                    impact = impacts.get(doc_id)
+                    if impact is None:
+                        break
+                    score += impact
+                else:
+                    if len(heap) < k:
+                        heapq.heappush(heap, (score, -doc_id))
+                    elif (score, -doc_id) > heap[0]:
+                        heapq.heapreplace(heap, (score, -doc_id))
+
+            if len(heap) == k and heap[0][0] > sum(frontier):
+                break
+
+        ranked = sorted(heap, reverse=True)
+        return [(-neg_id, score) for score, neg_id in ranked]
+
+    def rank(
+        self,
+        query: str,
+        doc_ids: Iterable[int],
+        k: int,
+        expand: Optional[Callable[[str], List[str]]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the k best of the given products by BM25F score.
+
+        Unlike top_k(), the caller decides which products match; each one
+        is scored on the query tokens it contains, so products matched in
+        other ways (inside a word) are ranked rather than dropped.
+
+        Args:
+            query: Free-text query
+            doc_ids: Matching product ids
+            k: Number of results to return
+            expand: Maps a query token to the indexed tokens that count for
+                    it (default: prefix expansion). Tokens other than the
+                    query token itself score PREFIX_MATCH_WEIGHT.
+
+        Returns:
+            List of (product_id, score), best first, ties by id
+        """
+        scores = dict.fromkeys(doc_ids, 0.0)
+        if k <= 0 or not scores:
+            return []
+        for token in dict.fromkeys(tokenize(query)):
+            best: Dict[int, float] = {}
+            for term in (expand or self.expand)(token):
+                impacts = self._impacts.get(term)
+                if not impacts:
+                    continue
+                weight = 1.0 if term == token else PREFIX_MATCH_WEIGHT
+                if len(impacts) < len(scores):
+                    pairs = ((doc_id, impact) for doc_id, impact in impacts.items() if doc_id in scores)
+                else:
+                    pairs = ((doc_id, impacts[doc_id]) for doc_id in scores if doc_id in impacts)
+                for doc_id, impact in pairs:
+                    impact *= weight
+                    if impact > best.get(doc_id, 0.0):
+                        best[doc_id] = impact
+            for doc_id, impact in best.items():
+                scores[doc_id] += impact
+        ranked = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc_id, score) for doc_id, score in ranked]
@@ -0,0 +1,116 @@
+"""
+Sorted-prefix index for search-as-you-type suggestions.
+Every word-suffix of a normalized product name is a key, so both
+"samsung gal" and "galaxy s2" complete to "Samsung Galaxy S24".
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List, Dict, Tuple
+
+from app.core.normalization import normalize, normalize_many
+
+
+# Prefix ranges longer than this get their top suggestions precomputed
+HEAVY_RANGE = 256
+
+MAX_SUGGESTIONS = 20
+
+
+class SuggestIndex:
+    """
+    Sorted array of (key, rank, product_id) entries.
+
+    A prefix maps to a contiguous range of the array found by binary
+    search. Short ranges are ranked on the fly; for "heavy" prefixes whose
+    range exceeds heavy_range the best MAX_SUGGESTIONS product ids are
+    precomputed at build time, so every lookup touches at most a few
+    hundred entries regardless of catalog size.
+
+    Rank order: whole-name matches before mid-name matches, then higher
+    base price (flagship models first), then product id.
+    """
+
+    def __init__(self, heavy_range: int = HEAVY_RANGE):
+        self.heavy_range = heavy_range
+        self._keys: List[str] = []
+        self._ranks: List[Tuple[int, float, int]] = []
+        self._heavy: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(cls, products: Iterable[dict], heavy_range: int = HEAVY_RANGE) -> "SuggestIndex":
+        """Build the index from product dicts."""
+        products = list(products)
+        names = normalize_many(p['name'] for p in products)
+        entries = []
+        for product, name in zip(products, names):
+            words = name.split()
+            price = -(product.get('base_price') or 0)
+            for start in range(len(words)):
+                kind = 0 if start == 0 else 1
+                entries.append((' '.join(words[start:]), (kind, price, product['id'])))
+        entries.sort()
+
+        index = cls(heavy_range)
+        index._keys = [key for key, _ in entries]
+        index._ranks = [rank for _, rank in entries]
+        index._precompute_heavy()
+        return index
+
+    def _precompute_heavy(self) -> None:
+        """Precompute top suggestions for every prefix with a large range."""
+        keys = self._keys
+        pending = [('', 0, len(keys))]
+        while pending:
+            prefix, start, end = pending.pop()
+            if end - start <= self.heavy_range:
+                continue
+            if prefix:
+                self._heavy[prefix] = self._rank_range(start, end, MAX_SUGGESTIONS)
+            # Split the range by the next character
+            depth = len(prefix)
+            pos = start
+            while pos < end:
+                if len(keys[pos]) <= depth:
+                    pos += 1
+                    continue
+                child = keys[pos][:depth + 1]
+                child_end = bisect_left(keys, child + '\uffff', pos, end)
+                pending.append((child, pos, child_end))
+                pos = child_end
+
+    def _rank_range(self, start: int, end: int, limit: int) -> List[int]:
+        """Return up to `limit` distinct product ids from a key range, best first."""
+        result = []
+        seen = set()
+        for _, _, product_id in sorted(self._ranks[start:end]):
+            if product_id not in seen:
+                seen.add(product_id)
+                result.append(product_id)
+                if len(result) == limit:
+                    break
+        return result
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[int]:
+        """
+        Return ids of the best products completing a prefix.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions (capped at MAX_SUGGESTIONS)
+
+        Returns:
+            Product ids, best first
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        heavy = self._heavy.get(prefix)
+        if heavy is not None:
+            return heavy[:limit]
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\uffff', start)
+        return self._rank_range(start, end, limit)
@@ -10,7 +10,8 @@ from app.core.config import settings
 from app.core.database import init_db
 from app.core.rate_limiter import limiter
 from app.core.middleware import SecurityHeadersMiddleware
-from app.api.routes import router
+from app.data.products_database import ensure_indexes
+from app.api.routes import router, SCRAPERS_AVAILABLE
 from app.api.auth_routes import router as auth_router
 import app.models  # noqa: F401 - ensure all models are imported for table creation
 
@@ -27,11 +28,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown events."""
     # Startup
     init_db()
+    ensure_indexes()
+    if SCRAPERS_AVAILABLE:
+        # One long-lived scraper pool per process - sessions and connections stay warm
+        from app.scrapers.scraper_manager import ScraperManager
+        app.state.scraper_manager = ScraperManager()
     logger.info(f"🚀 {settings.API_TITLE} v{settings.API_VERSION} started!")
     logger.info("API Documentation available at /docs")
     yield
     # Shutdown
     logger.info("Application shutting down...")
+    manager = getattr(app.state, "scraper_manager", None)
+    if manager is not None:
+        await manager.aclose()
+        app.state.scraper_manager = None
 
 
 # Create FastAPI app
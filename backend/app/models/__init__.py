@@ -3,3 +3,7 @@ from app.models.user import User
 from app.models.session import Session
 from app.models.token_blacklist import TokenBlacklist
 from app.models.audit_log import AuditLog
+from app.models.offer_link import OfferLink
+from app.models.price_observation import PriceObservation
+from app.models.price_archive import PriceArchive
+from app.models.price_rollup import PriceRollup
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class OfferLink(Base):
+    """Scraped listing -> catalog product mapping (product_id is NULL when nothing matched)"""
+
+    __tablename__ = "offer_links"
+    __table_args__ = (UniqueConstraint("source", "listing_name", name="uq_offer_links_listing"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(20), nullable=False)
+    listing_name = Column(String(500), nullable=False)
+    product_id = Column(Integer, nullable=True, index=True)
+    linked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<OfferLink(source='{self.source}', listing_name='{self.listing_name}', product_id={self.product_id})>"
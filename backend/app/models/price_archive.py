@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PriceArchive(Base):
+    """A month of price observations moved out of price_observations, stored column-wise and compressed"""
+
+    __tablename__ = "price_archives"
+
+    partition = Column(String(7), primary_key=True)  # "YYYY-MM"
+    row_count = Column(Integer, nullable=False)
+    first_observed = Column(Integer, nullable=False)
+    last_observed = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PriceArchive(partition='{self.partition}', row_count={self.row_count})>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Float, Boolean, Index
+from app.core.database import Base
+
+
+class PriceObservation(Base):
+    """
+    One observed price of a product at one source.
+
+    Append-only time series keyed by (product_id, source, observed_at). On
+    SQLite the table is WITHOUT ROWID, so rows are stored clustered by that
+    key - a product's history per source is contiguous and "latest price" is
+    a single index seek. observed_at is Unix seconds (UTC). url is the
+    offer's page at the source, when the observation came with one.
+    """
+
+    __tablename__ = "price_observations"
+    __table_args__ = (
+        # Covering index for time-range scans (archiving, rollups) - no table lookups
+        Index("ix_price_observations_time", "observed_at", "product_id", "source", "price", "available"),
+        {"sqlite_with_rowid": False},
+    )
+
+    product_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    source = Column(String(20), primary_key=True)
+    observed_at = Column(Integer, primary_key=True, autoincrement=False)
+    price = Column(Float, nullable=True)
+    available = Column(Boolean, nullable=False, default=True)
+    url = Column(String(1000), nullable=True)
+
+    def __repr__(self):
+        return f"<PriceObservation(product_id={self.product_id}, source='{self.source}', observed_at={self.observed_at}, price={self.price})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Float
+from app.core.database import Base
+
+
+class PriceRollup(Base):
+    """
+    Per-source price summary of a product over one time bucket.
+
+    Hourly (resolution=3600) and daily (resolution=86400) rows are updated
+    as observations are recorded, so charts read one row per bucket instead
+    of every observation. first_at/last_at are the times of the open and
+    close prices, which keeps late, out-of-order observations correct.
+    """
+
+    __tablename__ = "price_rollups"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    product_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    resolution = Column(Integer, primary_key=True, autoincrement=False)
+    source = Column(String(20), primary_key=True)
+    bucket = Column(Integer, primary_key=True, autoincrement=False)  # bucket start, Unix seconds
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    total = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+    first_at = Column(Integer, nullable=False)
+    last_at = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<PriceRollup(product_id={self.product_id}, resolution={self.resolution}, source='{self.source}', bucket={self.bucket})>"
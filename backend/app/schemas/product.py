@@ -112,3 +112,71 @@ class SearchResponse(BaseModel):
                 "products": []
             }
         }
+
+
+class Suggestion(BaseModel):
+    """Autocomplete suggestion"""
+    id: int
+    name: str
+    category: Optional[str] = None
+
+
+class SuggestResponse(BaseModel):
+    """Autocomplete response"""
+    query: str
+    suggestions: List[Suggestion]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "galaxy s2",
+                "suggestions": [
+                    {"id": 6, "name": "Samsung Galaxy S24 Ultra 512GB", "category": "אלקטרוניקה"}
+                ]
+            }
+        }
+
+
+class PricePoint(BaseModel):
+    """Price summary of one source over one time bucket (or one raw observation)"""
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    average: float
+    count: int
+
+
+class PriceSeries(BaseModel):
+    """Price history of one source"""
+    source: str
+    points: List[PricePoint]
+
+
+class PriceHistoryResponse(BaseModel):
+    """Downsampled price history of a product"""
+    product_id: int
+    resolution: str
+    start: datetime
+    end: datetime
+    series: List[PriceSeries]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "product_id": 6,
+                "resolution": "day",
+                "start": "2026-01-01T00:00:00Z",
+                "end": "2026-02-01T00:00:00Z",
+                "series": [
+                    {
+                        "source": "KSP",
+                        "points": [
+                            {"timestamp": "2026-01-01T00:00:00Z", "open": 5199.0, "high": 5199.0,
+                             "low": 4999.0, "close": 4999.0, "average": 5099.0, "count": 2}
+                        ]
+                    }
+                ]
+            }
+        }
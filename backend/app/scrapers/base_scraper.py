@@ -3,33 +3,100 @@ Base Scraper Class
 All specific scrapers inherit from this class
 """
 
+import asyncio
+import copy
 import time
-import random
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
+import httpx
 import requests
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 
+from app.core.config import settings
+from .circuit_breaker import CircuitBreaker
+from .http_cache import HTTPCache, HTTPCacheEntry, shared_http_cache
+from .parsers import PageSpec, parse_items, soup_items
+from .rate_limiter import RateLimiter, get_rate_limiter, backoff_delay
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Connection limits for the async fetch path. Each scraper talks to a
+# single host, so per-scraper limits are per-host limits.
+MAX_CONNECTIONS_PER_HOST = 4
+KEEPALIVE_EXPIRY = 30.0
+REQUEST_TIMEOUT = 15.0
+
+
+@lru_cache(maxsize=1)
+def shared_user_agent() -> UserAgent:
+    """Return the process-wide UserAgent (its browser data is loaded once)."""
+    return UserAgent()
+
+
+def create_async_client(headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+    """
+    Create a pooled async HTTP client.
+
+    HTTP/2 is used when the h2 package is installed; connections are kept
+    alive between requests.
+    """
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        headers=headers,
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=MAX_CONNECTIONS_PER_HOST * 8,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
 
 class BaseScraper(ABC):
     """
     Base class for all price scrapers.
     Provides common functionality like HTTP requests, parsing, rate limiting, etc.
+
+    Requests to a site are paced by a per-host GCRA limiter shared by every
+    scraper instance; subclasses may override REQUESTS_PER_SECOND and BURST.
+    Each scraper has a circuit breaker: while it is open, fetches fail fast
+    without contacting the site.
+
+    Pages go through an HTTP cache: fresh responses are reused without a
+    request, stale ones are revalidated with a conditional GET, and results
+    parsed from a page are reused for as long as the page is unchanged.
     """
 
-    def __init__(self, site_name: str, base_url: str):
+    # Sustained request rate and idle burst allowed per host
+    REQUESTS_PER_SECOND = 0.5
+    BURST = 3
+
+    # Selectors for search result pages, shared by all parser backends
+    SEARCH_PAGE: PageSpec = None
+
+    def __init__(self, site_name: str, base_url: str, async_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the base scraper.
 
         Args:
             site_name: Name of the website (e.g., "Zap", "KSP")
             base_url: Base URL of the website
+            async_client: Optional shared async client (one is created lazily otherwise)
         """
         self.site_name = site_name
         self.base_url = base_url
-        self.ua = UserAgent()
+        self.ua = shared_user_agent()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': self.ua.random,
@@ -39,6 +106,20 @@ class BaseScraper(ABC):
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        self.async_client = async_client
+        self._owns_async_client = False
+        self._host_semaphore: Optional[asyncio.Semaphore] = None
+        # Worker pool for blocking work on the async path (None = asyncio default)
+        self.executor: Optional[Executor] = None
+        self.rate_limiter: RateLimiter = get_rate_limiter(
+            urlparse(base_url).netloc, self.REQUESTS_PER_SECOND, self.BURST
+        )
+        self.circuit_breaker = CircuitBreaker(site_name)
+        # Send a duplicate request when the first is slower than this (0 = off)
+        self.hedge_after = settings.SCRAPE_HEDGE_AFTER_SECONDS
+        # Search page parser: 'lxml' (compiled XPath), 'strainer' or 'soup'
+        self.parser_backend = settings.SCRAPER_PARSER_BACKEND
+        self.http_cache: HTTPCache = shared_http_cache()
 
     def get_page(self, url: str, max_retries: int = 3) -> Optional[BeautifulSoup]:
         """
@@ -51,23 +132,270 @@ class BaseScraper(ABC):
         Returns:
             BeautifulSoup object or None if failed
         """
+        content = self.fetch(url, max_retries)
+        if content is None:
+            return None
+        return BeautifulSoup(content, 'lxml')
+
+    def fetch(self, url: str, max_retries: int = 3) -> Optional[bytes]:
+        """
+        Fetch a page body with the blocking session.
+
+        Args:
+            url: URL to fetch
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            Response body or None if failed
+        """
+        return self._fetch(url, max_retries)[0]
+
+    def _fetch(self, url: str, max_retries: int = 3) -> Tuple[Optional[bytes], Optional[HTTPCacheEntry]]:
+        """
+        Fetch a page through the HTTP cache with the blocking session.
+
+        Returns:
+            (body or None if failed, HTTP cache entry holding that body or
+            None if the response was not cacheable)
+        """
+        cached = self.http_cache.get(url)
+        if cached is not None and self.http_cache.is_fresh(cached):
+            return cached.body, cached
+        headers = cached.conditional_headers() if cached is not None else {}
+
         for attempt in range(max_retries):
+            if not self.circuit_breaker.allow():
+                print(f"[{self.site_name}] Circuit open, skipping {url}")
+                return None, None
+
+            started = time.monotonic()
             try:
-                # Random delay to avoid detection (1-3 seconds)
-                time.sleep(random.uniform(1, 3))
+                # Only waits when this host's request rate is exceeded
+                self.rate_limiter.acquire()
 
-                response = self.session.get(url, timeout=15)
+                started = time.monotonic()
+                response = self.session.get(url, headers=headers, timeout=15)
                 response.raise_for_status()
+                self.circuit_breaker.record_success(time.monotonic() - started)
 
-                return BeautifulSoup(response.content, 'lxml')
+                return self._cache_response(url, response.status_code, response.headers, response.content, cached)
 
             except requests.RequestException as e:
+                self._record_error(e, time.monotonic() - started)
+                print(f"[{self.site_name}] Error fetching {url} (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt == max_retries - 1:
+                    return None, None
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    return None, None
+                time.sleep(delay)
+
+        return None, None
+
+    def _cache_response(
+        self, url: str, status: int, headers, content: bytes, cached: Optional[HTTPCacheEntry]
+    ) -> Tuple[bytes, Optional[HTTPCacheEntry]]:
+        """Store a fresh response, or keep the cached body on 304 Not Modified."""
+        if status == 304 and cached is not None:
+            return cached.body, self.http_cache.revalidate(url, cached, headers)
+        return content, self.http_cache.store(url, headers, content)
+
+    def _reused(self, entry: Optional[HTTPCacheEntry], key: str) -> Any:
+        """A copy of the result previously parsed from this exact page, or None."""
+        if entry is None:
+            return None
+        result = entry.parsed.get(key)
+        return copy.deepcopy(result) if result is not None else None
+
+    def _remember(self, entry: Optional[HTTPCacheEntry], key: str, result: Any) -> None:
+        """Keep a parse result with the page it came from."""
+        if entry is not None and result:
+            entry.parsed[key] = copy.deepcopy(result)
+
+    def get_parsed(self, url: str, key: str, parse: Callable[[BeautifulSoup], Any], max_retries: int = 3) -> Any:
+        """
+        Fetch a page and parse it, skipping the parse while the page is unchanged.
+
+        Args:
+            url: URL to fetch
+            key: Name of this kind of result (one page may be parsed several ways)
+            parse: Extracts the result from the page's BeautifulSoup
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            The parsed result, or None if the fetch failed
+        """
+        content, entry = self._fetch(url, max_retries)
+        if content is None:
+            return None
+        result = self._reused(entry, key)
+        if result is None:
+            result = parse(BeautifulSoup(content, 'lxml'))
+            self._remember(entry, key, result)
+        return result
+
+    def _record_error(self, error: Exception, latency: float) -> None:
+        """
+        Record a failed request on the circuit breaker.
+
+        Client errors other than 429 (e.g. a 404 for one URL) say nothing
+        about the site's health and count as completed calls.
+        """
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+        if status is not None and status < 500 and status != 429:
+            self.circuit_breaker.record_success(latency)
+        else:
+            self.circuit_breaker.record_failure(latency)
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Jittered exponential backoff before the next attempt, honoring Retry-After.
+
+        Returns:
+            Seconds to wait, or None to give up
+        """
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        delay = backoff_delay(attempt, retry_after)
+        if delay is None:
+            print(f"[{self.site_name}] Retry-After too long ({retry_after}), giving up")
+        return delay
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return the async client, creating a private one on first use."""
+        if self.async_client is None:
+            self.async_client = create_async_client()
+            self._owns_async_client = True
+        return self.async_client
+
+    async def async_fetch(self, url: str, max_retries: int = 3) -> Optional[bytes]:
+        """
+        Fetch a page without blocking the event loop.
+
+        At most MAX_CONNECTIONS_PER_HOST requests per scraper are in flight;
+        the connection pool is shared with every scraper using the same client.
+
+        Args:
+            url: URL to fetch
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            Response body or None if failed
+        """
+        return (await self._async_fetch(url, max_retries))[0]
+
+    async def _async_fetch(self, url: str, max_retries: int = 3) -> Tuple[Optional[bytes], Optional[HTTPCacheEntry]]:
+        """Async variant of _fetch."""
+        cached = self.http_cache.get(url)
+        if cached is not None and self.http_cache.is_fresh(cached):
+            return cached.body, cached
+
+        client = self._get_async_client()
+        if self._host_semaphore is None:
+            self._host_semaphore = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        headers = dict(self.session.headers)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+
+        for attempt in range(max_retries):
+            if not self.circuit_breaker.allow():
+                print(f"[{self.site_name}] Circuit open, skipping {url}")
+                return None, None
+
+            started = time.monotonic()
+            try:
+                # Only waits when this host's request rate is exceeded
+                await self.rate_limiter.acquire_async()
+
+                started = time.monotonic()
+                response = await self._hedged_get(client, url, headers)
+                if response.status_code != 304:  # httpx treats 3xx as errors
+                    response.raise_for_status()
+                self.circuit_breaker.record_success(time.monotonic() - started)
+                return self._cache_response(url, response.status_code, response.headers, response.content, cached)
+
+            except asyncio.CancelledError:
+                # Client disconnect, fan-out deadline or shutdown - says nothing about the
+                # site, so free a half-open trial slot without counting a failure
+                self.circuit_breaker.release()
+                raise
+
+            except httpx.HTTPError as e:
+                self._record_error(e, time.monotonic() - started)
                 print(f"[{self.site_name}] Error fetching {url} (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt == max_retries - 1:
-                    return None
-                time.sleep(2 ** attempt)  # Exponential backoff
+                    return None, None
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    return None, None
+                await asyncio.sleep(delay)
+
+        return None, None
+
+    async def async_get_parsed(
+        self, url: str, key: str, parse: Callable[[BeautifulSoup], Any], max_retries: int = 3
+    ) -> Any:
+        """Async variant of get_parsed - HTML parsing runs in a worker thread."""
+        content, entry = await self._async_fetch(url, max_retries)
+        if content is None:
+            return None
+        result = self._reused(entry, key)
+        if result is None:
+            result = await self._run_blocking(lambda: parse(BeautifulSoup(content, 'lxml')))
+            self._remember(entry, key, result)
+        return result
+
+    async def _send(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+        async with self._host_semaphore:
+            return await client.get(url, headers=headers)
 
-        return None
+    async def _hedged_get(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """
+        GET with an optional hedge.
+
+        If the request has not completed after hedge_after seconds, a second
+        identical request is sent (only if the rate limiter has a slot free
+        right now) and the first successful response wins; the other request
+        is cancelled.
+        """
+        if not self.hedge_after:
+            return await self._send(client, url, headers)
+
+        primary = asyncio.ensure_future(self._send(client, url, headers))
+        try:
+            return await asyncio.wait_for(asyncio.shield(primary), self.hedge_after)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            primary.cancel()
+            raise
+
+        if not self.rate_limiter.try_acquire():
+            # Hedging now would exceed the site's rate - keep waiting instead
+            return await primary
+
+        print(f"[{self.site_name}] Hedging slow request to {url}")
+        pending = {primary, asyncio.ensure_future(self._send(client, url, headers))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def async_get_page(self, url: str, max_retries: int = 3) -> Optional[BeautifulSoup]:
+        """Async variant of get_page - HTML parsing runs in a worker thread."""
+        content = await self.async_fetch(url, max_retries)
+        if content is None:
+            return None
+        return await self._run_blocking(BeautifulSoup, content, 'lxml')
 
     def extract_price(self, price_text: str) -> Optional[float]:
         """
@@ -91,7 +419,6 @@ class BaseScraper(ABC):
         except (ValueError, AttributeError):
             return None
 
-    @abstractmethod
     def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
         """
         Search for products on the website.
@@ -103,6 +430,124 @@ class BaseScraper(ABC):
         Returns:
             List of product dictionaries
         """
+        print(f"[{self.site_name}] Searching for: {query}")
+        content, entry = self._fetch(self.build_search_url(query))
+
+        if content is None:
+            print(f"[{self.site_name}] Failed to fetch search results")
+            return []
+
+        key = self._search_key(max_results)
+        products = self._reused_search(entry, key)
+        if products is None:
+            products = self._parse_search_page(content, max_results)
+            self._remember(entry, key, products)
+        return products
+
+    async def async_search_product(self, query: str, max_results: int = 10) -> List[Dict]:
+        """
+        Async variant of search_product.
+
+        The fetch is awaited on the event loop; HTML parsing and result
+        extraction (CPU-bound) run in a worker thread.
+        """
+        print(f"[{self.site_name}] Searching for: {query}")
+        content, entry = await self._async_fetch(self.build_search_url(query))
+
+        if content is None:
+            print(f"[{self.site_name}] Failed to fetch search results")
+            return []
+
+        key = self._search_key(max_results)
+        products = self._reused_search(entry, key)
+        if products is None:
+            products = await self._run_blocking(self._parse_search_page, content, max_results)
+            self._remember(entry, key, products)
+        return products
+
+    def _search_key(self, max_results: int) -> str:
+        return f"search:{self.parser_backend}:{max_results}"
+
+    def _reused_search(self, entry: Optional[HTTPCacheEntry], key: str) -> Optional[List[Dict]]:
+        """Products parsed from an unchanged search page, re-stamped as current."""
+        products = self._reused(entry, key)
+        if products is not None:
+            now = datetime.now()
+            for product in products:
+                product['last_updated'] = now
+            print(f"[{self.site_name}] Page unchanged, reusing {len(products)} products")
+        return products
+
+    async def _run_blocking(self, func, *args):
+        """Run CPU-bound or blocking work on the scraper's worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _parse_search_page(self, content: bytes, max_results: int) -> List[Dict]:
+        """Parse raw search page HTML into product dictionaries using parser_backend."""
+        try:
+            items = parse_items(content, self.SEARCH_PAGE, max_results, self.parser_backend)
+        except Exception as e:
+            print(f"[{self.site_name}] Error during search: {e}")
+            return []
+        return self._products_from_items(items)
+
+    def parse_search_results(self, soup: BeautifulSoup, max_results: int = 10) -> List[Dict]:
+        """
+        Extract products from an already-parsed search results page.
+
+        Args:
+            soup: BeautifulSoup of the search page
+            max_results: Maximum number of results
+
+        Returns:
+            List of product dictionaries
+        """
+        try:
+            items = soup_items(soup, self.SEARCH_PAGE, max_results)
+        except Exception as e:
+            print(f"[{self.site_name}] Error during search: {e}")
+            return []
+        return self._products_from_items(items)
+
+    def _products_from_items(self, items) -> List[Dict]:
+        products = []
+        for item in items:
+            try:
+                product_data = self._parse_product_item(item)
+                if product_data:
+                    products.append(self.format_product_data(product_data))
+            except Exception as e:
+                print(f"[{self.site_name}] Error parsing product item: {e}")
+                continue
+
+        print(f"[{self.site_name}] Found {len(products)} products")
+        return products
+
+    @abstractmethod
+    def build_search_url(self, query: str) -> str:
+        """
+        Build the search results URL for a query.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Absolute URL
+        """
+        pass
+
+    @abstractmethod
+    def _parse_product_item(self, item) -> Optional[Dict]:
+        """
+        Parse a single product item from search results.
+
+        Args:
+            item: Product item node (SoupNode or LxmlNode) - use item.find(field),
+                  node.text and node.get(attr), with fields from SEARCH_PAGE
+
+        Returns:
+            Product data dictionary or None
+        """
         pass
 
     @abstractmethod
@@ -118,6 +563,27 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def async_get_product_details(self, product_url: str) -> Optional[Dict]:
+        """Async variant of get_product_details."""
+        print(f"[{self.site_name}] Fetching details from: {product_url}")
+        return await self.async_get_parsed(
+            product_url, 'details', lambda soup: self._parse_product_details(soup, product_url)
+        )
+
+    @abstractmethod
+    def _parse_product_details(self, soup: BeautifulSoup, product_url: str) -> Optional[Dict]:
+        """
+        Extract product details from a parsed product page.
+
+        Args:
+            soup: BeautifulSoup of the product page
+            product_url: URL of the product page
+
+        Returns:
+            Product details dictionary or None
+        """
+        pass
+
     def format_product_data(self, raw_data: Dict) -> Dict:
         """
         Format raw scraped data into a standard structure.
@@ -145,6 +611,14 @@ class BaseScraper(ABC):
         """Close the session"""
         self.session.close()
 
+    async def aclose(self):
+        """Close the session and the async client (if this scraper created it)"""
+        self.close()
+        if self._owns_async_client and self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
+            self._owns_async_client = False
+
     def __enter__(self):
         """Context manager entry"""
         return self
@@ -3,9 +3,11 @@ Bug Scraper
 Major Israeli electronics retail chain
 """
 
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from urllib.parse import quote
+from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .parsers import PageSpec
 
 
 class BugScraper(BaseScraper):
@@ -13,6 +15,23 @@ class BugScraper(BaseScraper):
     Scraper for Bug.co.il - Major Israeli electronics retailer
     """
 
+    # Bug uses product cards
+    SEARCH_PAGE = PageSpec(
+        containers=[
+            ('div', {'class': 'product-card'}),
+            ('div', {'class': 'item-product'}),
+            ('article', {'class': 'product'}),
+        ],
+        fields={
+            'name': [('a', {'class': 'product-title'}), ('h3', {}), ('a', {'class': 'title'}), ('div', {'class': 'name'})],
+            'link': [('a', {'href': True})],
+            'price': [('span', {'class': 'price'}), ('div', {'class': 'price-box'}), ('span', {'data-price': True})],
+            'image': [('img', {'class': 'product-img'}), ('img', {})],
+            'availability': [('span', {'class': 'stock'}), ('div', {'class': 'availability'})],
+            'rating': [('div', {'class': 'rating'}), ('span', {'class': 'stars'})],
+        },
+    )
+
     def __init__(self):
         super().__init__(
             site_name="Bug",
@@ -20,92 +39,44 @@ class BugScraper(BaseScraper):
         )
         self.search_url = f"{self.base_url}/search"
 
-    def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
-        """
-        Search for products on Bug.
-
-        Args:
-            query: Search query
-            max_results: Maximum number of results
-
-        Returns:
-            List of product dictionaries
-        """
-        products = []
-        encoded_query = quote(query)
-        search_url = f"{self.search_url}?q={encoded_query}"
-
-        print(f"[Bug] Searching for: {query}")
-        soup = self.get_page(search_url)
-
-        if not soup:
-            print(f"[Bug] Failed to fetch search results")
-            return products
-
-        try:
-            # Bug uses product cards
-            product_items = soup.find_all('div', class_='product-card', limit=max_results)
-
-            if not product_items:
-                # Try alternative selectors
-                product_items = soup.find_all('div', class_='item-product', limit=max_results)
-                if not product_items:
-                    product_items = soup.find_all('article', class_='product', limit=max_results)
-
-            for item in product_items:
-                try:
-                    product_data = self._parse_product_item(item)
-                    if product_data:
-                        products.append(self.format_product_data(product_data))
-                except Exception as e:
-                    print(f"[Bug] Error parsing product item: {e}")
-                    continue
-
-            print(f"[Bug] Found {len(products)} products")
-
-        except Exception as e:
-            print(f"[Bug] Error during search: {e}")
-
-        return products
+    def build_search_url(self, query: str) -> str:
+        """Return the Bug search results URL for a query."""
+        return f"{self.search_url}?q={quote(query)}"
 
     def _parse_product_item(self, item) -> Optional[Dict]:
         """
         Parse a single product item from search results.
 
         Args:
-            item: BeautifulSoup element
+            item: Product item node
 
         Returns:
             Product data dictionary or None
         """
         try:
             # Product name
-            name_elem = item.find('a', class_='product-title') or item.find('h3') or item.find('a', class_='title')
-            if not name_elem:
-                name_elem = item.find('div', class_='name')
+            name_elem = item.find('name')
             if not name_elem:
                 return None
 
-            product_name = name_elem.get_text(strip=True)
+            product_name = name_elem.text
 
             # Product URL
-            link_elem = item.find('a', href=True)
+            link_elem = item.find('link')
             product_link = link_elem.get('href', '') if link_elem else ''
             if product_link and not product_link.startswith('http'):
                 product_link = f"{self.base_url}{product_link}"
 
             # Price
-            price_elem = item.find('span', class_='price') or item.find('div', class_='price-box')
-            if not price_elem:
-                price_elem = item.find('span', attrs={'data-price': True})
+            price_elem = item.find('price')
 
             price = None
             if price_elem:
-                price_text = price_elem.get('data-price') or price_elem.get_text(strip=True)
+                price_text = price_elem.get('data-price') or price_elem.text
                 price = self.extract_price(price_text)
 
             # Image
-            img_elem = item.find('img', class_='product-img') or item.find('img')
+            img_elem = item.find('image')
             image_url = None
             if img_elem:
                 image_url = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-lazy-src')
@@ -114,17 +85,17 @@ class BugScraper(BaseScraper):
 
             # Availability
             availability = True
-            availability_elem = item.find('span', class_='stock') or item.find('div', class_='availability')
+            availability_elem = item.find('availability')
             if availability_elem:
-                availability_text = availability_elem.get_text(strip=True).lower()
+                availability_text = availability_elem.text.lower()
                 if 'אזל' in availability_text or 'לא זמין' in availability_text or 'out of stock' in availability_text:
                     availability = False
 
             # Rating
             rating = None
-            rating_elem = item.find('div', class_='rating') or item.find('span', class_='stars')
+            rating_elem = item.find('rating')
             if rating_elem:
-                rating_text = rating_elem.get('data-rating') or rating_elem.get_text(strip=True)
+                rating_text = rating_elem.get('data-rating') or rating_elem.text
                 try:
                     rating = float(''.join(c for c in rating_text if c.isdigit() or c == '.'))
                 except ValueError:
@@ -154,11 +125,10 @@ class BugScraper(BaseScraper):
             Detailed product data or None
         """
         print(f"[Bug] Fetching details from: {product_url}")
-        soup = self.get_page(product_url)
-
-        if not soup:
-            return None
+        return self.get_parsed(product_url, 'details', lambda soup: self._parse_product_details(soup, product_url))
 
+    def _parse_product_details(self, soup: BeautifulSoup, product_url: str) -> Optional[Dict]:
+        """Extract product details from a parsed product page."""
         try:
             # Product name
             name_elem = soup.find('h1', class_='product-title') or soup.find('h1')
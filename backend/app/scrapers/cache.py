@@ -0,0 +1,290 @@
+"""
+Scrape Result Cache
+TTL cache with stale-while-revalidate for per-site search results
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.normalization import normalize
+
+
+CacheKey = Tuple[str, str, int]
+
+
+class CacheEntry:
+    """A cached result list with its freshness window."""
+
+    __slots__ = ('value', 'payload', 'stored_at', 'expires_at', 'stale_until')
+
+    def __init__(self, value: List[Dict], payload: bytes, stored_at: float, expires_at: float, stale_until: float):
+        self.value = value
+        self.payload = payload
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint (serialized size) in bytes."""
+        return len(self.payload)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+def _dumps(value: List[Dict]) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+def _loads(payload: bytes) -> List[Dict]:
+    """Deserialize results, restoring last_updated timestamps."""
+    products = orjson.loads(payload)
+    for product in products:
+        last_updated = product.get('last_updated')
+        if isinstance(last_updated, str):
+            try:
+                product['last_updated'] = datetime.fromisoformat(last_updated)
+            except ValueError:
+                pass
+    return products
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk cache store so entries survive restarts.
+
+    One row per key; values are stored as JSON. Safe to use from several
+    threads (the connection is guarded by a lock).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " stale_until REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row_key(key: CacheKey) -> str:
+        query, site, max_results = key
+        return f"{site}\x1f{max_results}\x1f{query}"
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, stored_at, expires_at, stale_until FROM scrape_cache WHERE key = ?",
+                (self._row_key(key),),
+            ).fetchone()
+        if row is None:
+            return None
+        payload, stored_at, expires_at, stale_until = row
+        return CacheEntry(_loads(payload), bytes(payload), stored_at, expires_at, stale_until)
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (key, payload, stored_at, expires_at, stale_until)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self._row_key(key), entry.payload, entry.stored_at, entry.expires_at, entry.stale_until),
+            )
+            self._conn.commit()
+
+    def delete(self, key: CacheKey) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scrape_cache WHERE key = ?", (self._row_key(key),))
+            self._conn.commit()
+
+    def purge_expired(self, now: float) -> int:
+        """Delete entries past their stale window; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM scrape_cache WHERE stale_until <= ?", (now,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ScrapeCache:
+    """
+    Cache of per-site search results keyed by (normalized query, site, max_results).
+
+    An entry is fresh for the site's TTL, then stale (still served) for a
+    further stale_ttl seconds while the caller refreshes it in the
+    background; after that it is dropped. The in-memory LRU is bounded by
+    the serialized size of its entries. An optional SQLite backend acts as
+    a second level that survives restarts.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        max_bytes: int = 32 * 1024 * 1024,
+        site_ttls: Optional[Dict[str, float]] = None,
+        backend: Optional[SQLiteCacheBackend] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Default seconds an entry stays fresh
+            stale_ttl: Seconds a stale entry may still be served after its TTL
+            max_bytes: Memory budget for the in-memory LRU
+            site_ttls: Per-site TTL overrides, keyed by scraper name
+            backend: Optional persistent store
+            clock: Wall-clock time source (wall time so persisted entries stay valid)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.site_ttls = dict(site_ttls or {})
+        self.backend = backend
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, site: str, max_results: int) -> CacheKey:
+        return (normalize(query), site, max_results)
+
+    def ttl_for(self, site: str) -> float:
+        return self.site_ttls.get(site, self.ttl)
+
+    def is_stale(self, entry: CacheEntry) -> bool:
+        """True if the entry is past its TTL and should be revalidated."""
+        return not entry.is_fresh(self._clock())
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """
+        Look up an entry (memory first, then the backend).
+
+        Returns:
+            The entry if it is fresh or still within its stale window, else None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.is_usable(now):
+                    self._entries.move_to_end(key)
+                else:
+                    self._remove(key)
+                    entry = None
+
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None:
+                if entry.is_usable(now):
+                    with self._lock:
+                        self._store(key, entry)
+                else:
+                    self.backend.delete(key)
+                    entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            elif entry.is_fresh(now):
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return entry
+
+    def set(self, key: CacheKey, value: List[Dict]) -> CacheEntry:
+        """Store results for a key using the site's TTL."""
+        now = self._clock()
+        expires_at = now + self.ttl_for(key[1])
+        entry = CacheEntry(value, _dumps(value), now, expires_at, expires_at + self.stale_ttl)
+        with self._lock:
+            self._store(key, entry)
+        if self.backend is not None:
+            self.backend.set(key, entry)
+        return entry
+
+    def _store(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Insert into the memory LRU and evict down to max_bytes (lock held)."""
+        self._remove(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def begin_refresh(self, key: CacheKey) -> bool:
+        """Claim a background refresh for a key; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: CacheKey) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def info(self) -> dict:
+        """Return cache statistics."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "refreshing": len(self._refreshing),
+                "persistent": self.backend is not None,
+            }
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+
+
+def create_scrape_cache() -> ScrapeCache:
+    """Create a scrape cache configured from settings."""
+    backend = None
+    if settings.SCRAPE_CACHE_PATH:
+        backend = SQLiteCacheBackend(settings.SCRAPE_CACHE_PATH)
+        backend.purge_expired(time.time())
+    return ScrapeCache(
+        ttl=settings.SCRAPE_CACHE_TTL_SECONDS,
+        stale_ttl=settings.SCRAPE_CACHE_STALE_SECONDS,
+        max_bytes=settings.SCRAPE_CACHE_MAX_BYTES,
+        site_ttls=settings.SCRAPE_CACHE_SITE_TTLS,
+        backend=backend,
+    )
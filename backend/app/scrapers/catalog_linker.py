@@ -0,0 +1,234 @@
+"""
+Catalog Linker
+Maps scraped listings to catalog product ids, with a persistent mapping table
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.normalization import normalize
+from app.data.products_database import UNLINKED_ID_BASE, catalog_version, get_product_by_id, search_products_any
+from app.models.offer_link import OfferLink
+from .matching import DEFAULT_THRESHOLD, ListingFeatures, extract_features, is_match, jaccard
+
+
+# Catalog products verified per listing (best catalog search hits first)
+CANDIDATES = 20
+
+# Keys looked up per IN (...) query - stays under SQLite's variable limit
+_LOOKUP_BATCH = 500
+
+LinkKey = Tuple[str, str]
+
+
+@lru_cache(maxsize=4096)
+def _catalog_features(name: str) -> ListingFeatures:
+    return extract_features(name)
+
+
+def unlinked_product_id(name: str) -> int:
+    """Stable id for a scraped product that matches no catalog product."""
+    return UNLINKED_ID_BASE + zlib.crc32(normalize(name).encode('utf-8'))
+
+
+class CatalogLinker:
+    """
+    Links scraped listings to catalog products.
+
+    A listing is matched by searching the catalog for products sharing its
+    words (model numbers weigh most) and verifying the best hits with the
+    same rules OfferMatcher uses across sites - conflicting brand, storage,
+    variant or model number rule a product out. Every decision, including
+    "no match", is stored in the offer_links table keyed by (source,
+    listing name), so a listing seen before is resolved by lookup - from
+    an in-memory LRU first, then one batched query per call. Stored
+    matches are re-verified against the current catalog product before
+    they are used, and re-matched if that product is gone or no longer
+    matches. When the catalog is reloaded, the in-memory links and the
+    stored "no match" decisions are dropped so listings get matched
+    against the new products.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the linker.
+
+        Args:
+            session_factory: Creates database sessions for the offer_links table
+            threshold: Minimum token Jaccard similarity to a catalog name
+            max_entries: In-memory link cache size
+        """
+        self._session_factory = session_factory
+        self.threshold = threshold
+        self.max_entries = max_entries or settings.CATALOG_LINK_CACHE_SIZE
+        self._links: "OrderedDict[LinkKey, Optional[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._catalog_version = catalog_version()
+        self.memory_hits = 0
+        self.stored_hits = 0
+        self.matched = 0
+
+    def match(self, name: str) -> Optional[int]:
+        """
+        Find the catalog product a listing name describes.
+
+        Args:
+            name: Listing name (raw or normalized)
+
+        Returns:
+            Catalog product id, or None if no product matches
+        """
+        features = extract_features(name)
+        if not features.tokens:
+            return None
+        best_id, best_score = None, 0.0
+        for product in search_products_any(' '.join(features.tokens), limit=CANDIDATES):
+            candidate = _catalog_features(product['name'])
+            if not is_match(features, candidate, self.threshold):
+                continue
+            score = jaccard(features.tokens, candidate.tokens)
+            if score > best_score:
+                best_id, best_score = product['id'], score
+        return best_id
+
+    def link(self, listings: Sequence[LinkKey]) -> List[Optional[int]]:
+        """
+        Resolve (source, listing name) pairs to catalog product ids.
+
+        New listings are matched against the catalog and the results are
+        written back in one batch. If the database is unavailable, matching
+        still works - results are only kept in memory.
+
+        Args:
+            listings: (source, normalized listing name) pairs
+
+        Returns:
+            Catalog product id (or None) per listing
+        """
+        if self._catalog_version != catalog_version():
+            self._forget_links()
+
+        resolved: Dict[LinkKey, Optional[int]] = {}
+        with self._lock:
+            for key in listings:
+                if key in self._links:
+                    self._links.move_to_end(key)
+                    resolved[key] = self._links[key]
+                    self.memory_hits += 1
+
+        missing = [key for key in dict.fromkeys(listings) if key not in resolved]
+        if missing:
+            stored = self._load(missing)
+            stale = [key for key, product_id in stored.items() if not self._still_matches(key[1], product_id)]
+            for key in stale:
+                del stored[key]
+            self.stored_hits += len(stored)
+            new = {}
+            for key in missing:
+                if key in stored:
+                    resolved[key] = stored[key]
+                else:
+                    resolved[key] = new[key] = self.match(key[1])
+                    self.matched += 1
+            if new:
+                self._save(new, replace=stale)
+            with self._lock:
+                for key in missing:
+                    self._links[key] = resolved[key]
+                while len(self._links) > self.max_entries:
+                    self._links.popitem(last=False)
+
+        return [resolved[key] for key in listings]
+
+    def _forget_links(self) -> None:
+        """
+        Drop remembered links and stored "no match" decisions after a
+        catalog reload. Stored matches are kept; _still_matches() checks
+        them against the new catalog when they are next looked up.
+        """
+        with self._lock:
+            version = catalog_version()
+            if self._catalog_version == version:
+                return
+            self._catalog_version = version
+            self._links.clear()
+        try:
+            with self._session_factory() as db:
+                db.query(OfferLink).filter(OfferLink.product_id.is_(None)).delete(synchronize_session=False)
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"[CatalogLinker] Could not clear unmatched links: {e}")
+
+    def _load(self, keys: List[LinkKey]) -> Dict[LinkKey, Optional[int]]:
+        """Look up stored links; returns the keys found."""
+        wanted = set(keys)
+        found = {}
+        try:
+            with self._session_factory() as db:
+                names = sorted({name for _, name in keys})
+                for start in range(0, len(names), _LOOKUP_BATCH):
+                    rows = db.query(OfferLink.source, OfferLink.listing_name, OfferLink.product_id).filter(
+                        OfferLink.listing_name.in_(names[start:start + _LOOKUP_BATCH])
+                    )
+                    for source, name, product_id in rows:
+                        if (source, name) in wanted:
+                            found[(source, name)] = product_id
+        except SQLAlchemyError as e:
+            print(f"[CatalogLinker] Lookup failed: {e}")
+        return found
+
+    def _still_matches(self, name: str, product_id: Optional[int]) -> bool:
+        """Check that a stored match still points at a catalog product the listing matches."""
+        if product_id is None:
+            return True
+        product = get_product_by_id(product_id)
+        if product is None:
+            return False
+        return is_match(extract_features(name), _catalog_features(product['name']), self.threshold)
+
+    def _save(self, links: Dict[LinkKey, Optional[int]], replace: Sequence[LinkKey] = ()) -> None:
+        """
+        Store new links in one transaction.
+
+        Rows for the `replace` keys (stale matches) are deleted first. A
+        concurrent search may have stored some of the same listings first;
+        those rows are skipped instead of failing the whole batch.
+        """
+        try:
+            with self._session_factory() as db:
+                for source, name in replace:
+                    db.query(OfferLink).filter(
+                        OfferLink.source == source, OfferLink.listing_name == name
+                    ).delete(synchronize_session=False)
+                statement = insert(OfferLink).prefix_with("OR IGNORE", dialect="sqlite")
+                db.execute(statement, [
+                    {'source': source, 'listing_name': name, 'product_id': product_id}
+                    for (source, name), product_id in links.items()
+                ])
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"[CatalogLinker] Could not store {len(links)} links: {e}")
+
+    def info(self) -> dict:
+        """Return linker statistics."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "stored_hits": self.stored_hits,
+                "matched": self.matched,
+                "entries": len(self._links),
+                "max_entries": self.max_entries,
+            }
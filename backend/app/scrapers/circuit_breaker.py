@@ -0,0 +1,164 @@
+"""
+Circuit Breaker
+Per-site health tracking so unhealthy sites are skipped immediately
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Defaults: trip when at least half of the last minute's calls (and at
+# least MIN_CALLS of them) failed or were slower than SLOW_CALL_SECONDS.
+FAILURE_RATE = 0.5
+MIN_CALLS = 5
+WINDOW_SECONDS = 60.0
+SLOW_CALL_SECONDS = 8.0
+OPEN_SECONDS = 30.0
+HALF_OPEN_MAX_CALLS = 1
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker over a rolling time window.
+
+    Closed: calls flow and their outcomes are recorded. When the share of
+    bad calls (errors or calls slower than slow_call_seconds) in the last
+    window_seconds reaches failure_rate, the circuit opens.
+    Open: calls are rejected without touching the site for open_seconds.
+    Half-open: up to half_open_max_calls trial calls are let through; a
+    good one closes the circuit, a bad one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = FAILURE_RATE,
+        min_calls: int = MIN_CALLS,
+        window_seconds: float = WINDOW_SECONDS,
+        slow_call_seconds: float = SLOW_CALL_SECONDS,
+        open_seconds: float = OPEN_SECONDS,
+        half_open_max_calls: int = HALF_OPEN_MAX_CALLS,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._window = deque()  # (timestamp, is_error, latency)
+        self._errors = 0
+        self._slow = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _current_state(self, now: float) -> str:
+        """Return the state, moving open -> half-open once the cool-down has passed (lock held)."""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def state(self, now: Optional[float] = None) -> str:
+        """Return the current state."""
+        with self._lock:
+            return self._current_state(time.monotonic() if now is None else now)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """
+        Ask to make a call.
+
+        Returns:
+            True if the call may proceed (its outcome must then be recorded)
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic() if now is None else now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self) -> None:
+        """Give back an allowed call that ended without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trials = max(0, self._trials - 1)
+
+    def record_success(self, latency: float, now: Optional[float] = None) -> None:
+        """Record a completed call (slow calls count against the site)."""
+        self._record(False, latency, now)
+
+    def record_failure(self, latency: float = 0.0, now: Optional[float] = None) -> None:
+        """Record a failed call."""
+        self._record(True, latency, now)
+
+    def _record(self, is_error: bool, latency: float, now: Optional[float]) -> None:
+        now = time.monotonic() if now is None else now
+        is_slow = latency > self.slow_call_seconds
+        with self._lock:
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._trials = max(0, self._trials - 1)
+                if is_error or is_slow:
+                    self._open(now)
+                else:
+                    self._close()
+                return
+            if state == OPEN:
+                return
+
+            self._window.append((now, is_error, is_slow))
+            self._errors += is_error
+            self._slow += is_slow and not is_error
+            self._prune(now)
+            calls = len(self._window)
+            if calls >= self.min_calls and (self._errors + self._slow) / calls >= self.failure_rate:
+                self._open(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        window = self._window
+        while window and window[0][0] < cutoff:
+            _, is_error, is_slow = window.popleft()
+            self._errors -= is_error
+            self._slow -= is_slow and not is_error
+
+    def _open(self, now: float) -> None:
+        print(f"[CircuitBreaker] {self.name} circuit opened")
+        self._state = OPEN
+        self._opened_at = now
+        self._trials = 0
+
+    def _close(self) -> None:
+        print(f"[CircuitBreaker] {self.name} circuit closed")
+        self._state = CLOSED
+        self._window.clear()
+        self._errors = 0
+        self._slow = 0
+
+    def info(self) -> dict:
+        """Return breaker state and rolling-window statistics."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            self._prune(now)
+            calls = len(self._window)
+            return {
+                "state": state,
+                "calls": calls,
+                "error_rate": round(self._errors / calls, 3) if calls else 0.0,
+                "slow_rate": round(self._slow / calls, 3) if calls else 0.0,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,220 @@
+"""
+HTTP Response Cache
+Private HTTP cache for scraped pages - validators, freshness and parsed results
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from app.core.config import settings
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into {directive: argument}.
+
+    Directive names are lower-cased; directives without an argument map to None.
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """
+    Seconds from now that a response may be reused without revalidation.
+
+    Cache-Control max-age (less the Age header) takes precedence over
+    Expires; no-cache means "always revalidate".
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+        now: Current wall-clock time
+
+    Returns:
+        Remaining lifetime in seconds (0 = stale immediately), or None if
+        the response must not be stored (no-store)
+    """
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+
+    age = headers.get('Age', '')
+    age = float(age) if age.strip().isdigit() else 0.0
+    max_age = directives.get('max-age')
+    if max_age is not None:
+        try:
+            return max(0.0, float(max_age) - age)
+        except ValueError:
+            return 0.0
+
+    expires = _http_date(headers.get('Expires'))
+    if expires is not None:
+        date = _http_date(headers.get('Date')) or now
+        return max(0.0, expires - date - age)
+    return 0.0
+
+
+class HTTPCacheEntry:
+    """A stored response body, its validators and results parsed from it."""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'expires_at', 'parsed')
+
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        # Results extracted from this body, keyed by the caller (e.g. "details")
+        self.parsed: Dict[str, Any] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that revalidate this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Per-URL cache of page bodies, in the spirit of a private browser cache.
+
+    A response is stored when it carries a validator (ETag / Last-Modified)
+    or a freshness lifetime. While fresh it is served without a request;
+    once stale the scraper revalidates it with a conditional GET, and a
+    304 keeps the stored body - and anything already parsed from it.
+    The LRU is bounded by the total size of the stored bodies.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, clock: Callable[[], float] = time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for stored bodies
+            clock: Wall-clock time source (HTTP dates are wall-clock)
+        """
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, HTTPCacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[HTTPCacheEntry]:
+        """Look up a stored response (fresh or not); counts fresh hits and misses."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            if entry.is_fresh(self._clock()):
+                self.fresh_hits += 1
+            return entry
+
+    def is_fresh(self, entry: HTTPCacheEntry) -> bool:
+        return entry.is_fresh(self._clock())
+
+    def store(self, url: str, headers: Mapping[str, str], body: bytes) -> Optional[HTTPCacheEntry]:
+        """
+        Store a 200 response, replacing any previous entry for the URL.
+
+        Returns:
+            The new entry, or None if the response is not cacheable
+        """
+        now = self._clock()
+        lifetime = freshness_lifetime(headers, now)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._lock:
+            self._remove(url)
+            if lifetime is None or (not lifetime and not etag and not last_modified):
+                return None
+            entry = HTTPCacheEntry(body, etag, last_modified, now + lifetime)
+            self._store(url, entry)
+            return entry
+
+    def revalidate(self, url: str, entry: HTTPCacheEntry, headers: Mapping[str, str]) -> HTTPCacheEntry:
+        """
+        Refresh an entry after a 304 Not Modified.
+
+        The body and parsed results are kept; freshness and validators are
+        updated from the 304's headers.
+        """
+        now = self._clock()
+        lifetime = freshness_lifetime(headers, now)
+        with self._lock:
+            self.revalidated += 1
+            entry.etag = headers.get('ETag') or entry.etag
+            entry.last_modified = headers.get('Last-Modified') or entry.last_modified
+            entry.expires_at = now + (lifetime or 0.0)
+            if lifetime is None:
+                self._remove(url)
+            elif self._entries.get(url) is not entry:
+                self._remove(url)
+                self._store(url, entry)
+        return entry
+
+    def _store(self, url: str, entry: HTTPCacheEntry) -> None:
+        """Insert into the LRU and evict down to max_bytes (lock held)."""
+        if entry.size > self.max_bytes:
+            return
+        self._entries[url] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def _remove(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def info(self) -> dict:
+        """Return cache statistics."""
+        with self._lock:
+            return {
+                "fresh_hits": self.fresh_hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+@lru_cache(maxsize=1)
+def shared_http_cache() -> HTTPCache:
+    """Return the process-wide HTTP cache used by every scraper."""
+    return HTTPCache(max_bytes=settings.HTTP_CACHE_MAX_BYTES)
@@ -3,9 +3,11 @@ KSP Scraper
 Major Israeli electronics and computer retail chain
 """
 
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from urllib.parse import quote
+from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .parsers import PageSpec
 
 
 class KSPScraper(BaseScraper):
@@ -13,6 +15,22 @@ class KSPScraper(BaseScraper):
     Scraper for KSP.co.il - Major Israeli electronics retailer
     """
 
+    # KSP uses product cards in search results
+    SEARCH_PAGE = PageSpec(
+        containers=[
+            ('div', {'class': 'product-item'}),
+            ('div', {'class': 'item'}),
+            ('div', {'data-product-id': True}),
+        ],
+        fields={
+            'name': [('a', {'class': 'product-name'}), ('h3', {}), ('a', {'class': 'name'})],
+            'price': [('span', {'class': 'price'}), ('div', {'class': 'price-wrapper'}), ('span', {'data-price': True})],
+            'image': [('img', {'class': 'product-image'}), ('img', {})],
+            'availability': [('span', {'class': 'availability'}), ('div', {'class': 'stock'})],
+            'sku': [('span', {'class': 'sku'}), ('span', {'class': 'product-code'})],
+        },
+    )
+
     def __init__(self):
         super().__init__(
             site_name="KSP",
@@ -20,70 +38,26 @@ class KSPScraper(BaseScraper):
         )
         self.search_url = f"{self.base_url}/web/he/search"
 
-    def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
-        """
-        Search for products on KSP.
-
-        Args:
-            query: Search query
-            max_results: Maximum number of results
-
-        Returns:
-            List of product dictionaries
-        """
-        products = []
-        encoded_query = quote(query)
-        search_url = f"{self.search_url}?q={encoded_query}"
-
-        print(f"[KSP] Searching for: {query}")
-        soup = self.get_page(search_url)
-
-        if not soup:
-            print(f"[KSP] Failed to fetch search results")
-            return products
-
-        try:
-            # KSP uses product cards in search results
-            product_items = soup.find_all('div', class_='product-item', limit=max_results)
-
-            if not product_items:
-                # Try alternative selectors
-                product_items = soup.find_all('div', class_='item', limit=max_results)
-                if not product_items:
-                    product_items = soup.find_all('div', attrs={'data-product-id': True}, limit=max_results)
-
-            for item in product_items:
-                try:
-                    product_data = self._parse_product_item(item)
-                    if product_data:
-                        products.append(self.format_product_data(product_data))
-                except Exception as e:
-                    print(f"[KSP] Error parsing product item: {e}")
-                    continue
-
-            print(f"[KSP] Found {len(products)} products")
-
-        except Exception as e:
-            print(f"[KSP] Error during search: {e}")
-
-        return products
+    def build_search_url(self, query: str) -> str:
+        """Return the KSP search results URL for a query."""
+        return f"{self.search_url}?q={quote(query)}"
 
     def _parse_product_item(self, item) -> Optional[Dict]:
         """
         Parse a single product item from search results.
 
         Args:
-            item: BeautifulSoup element
+            item: Product item node
 
         Returns:
             Product data dictionary or None
         """
         try:
             # Product name
-            name_elem = item.find('a', class_='product-name') or item.find('h3') or item.find('a', class_='name')
+            name_elem = item.find('name')
             if not name_elem:
                 return None
-            product_name = name_elem.get_text(strip=True)
+            product_name = name_elem.text
 
             # Product URL
             product_link = name_elem.get('href', '')
@@ -91,17 +65,15 @@ class KSPScraper(BaseScraper):
                 product_link = f"{self.base_url}{product_link}"
 
             # Price
-            price_elem = item.find('span', class_='price') or item.find('div', class_='price-wrapper')
-            if not price_elem:
-                price_elem = item.find('span', attrs={'data-price': True})
+            price_elem = item.find('price')
 
             price = None
             if price_elem:
-                price_text = price_elem.get('data-price') or price_elem.get_text(strip=True)
+                price_text = price_elem.get('data-price') or price_elem.text
                 price = self.extract_price(price_text)
 
             # Image
-            img_elem = item.find('img', class_='product-image') or item.find('img')
+            img_elem = item.find('image')
             image_url = None
             if img_elem:
                 image_url = img_elem.get('src') or img_elem.get('data-src')
@@ -109,15 +81,15 @@ class KSPScraper(BaseScraper):
                     image_url = f"{self.base_url}{image_url}"
 
             # Availability
-            availability_elem = item.find('span', class_='availability') or item.find('div', class_='stock')
+            availability_elem = item.find('availability')
             availability = True  # Default to available
             if availability_elem:
-                availability_text = availability_elem.get_text(strip=True).lower()
+                availability_text = availability_elem.text.lower()
                 availability = 'במלאי' in availability_text or 'זמין' in availability_text or 'available' in availability_text
 
             # Product code/SKU
-            sku_elem = item.find('span', class_='sku') or item.find('span', class_='product-code')
-            sku = sku_elem.get_text(strip=True) if sku_elem else None
+            sku_elem = item.find('sku')
+            sku = sku_elem.text if sku_elem else None
 
             return {
                 'name': product_name,
@@ -143,11 +115,10 @@ class KSPScraper(BaseScraper):
             Detailed product data or None
         """
         print(f"[KSP] Fetching details from: {product_url}")
-        soup = self.get_page(product_url)
-
-        if not soup:
-            return None
+        return self.get_parsed(product_url, 'details', lambda soup: self._parse_product_details(soup, product_url))
 
+    def _parse_product_details(self, soup: BeautifulSoup, product_url: str) -> Optional[Dict]:
+        """Extract product details from a parsed product page."""
         try:
             # Product name
             name_elem = soup.find('h1', class_='product-name') or soup.find('h1', class_='title')
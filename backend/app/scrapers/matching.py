@@ -0,0 +1,367 @@
+"""
+Offer Matching
+Groups listings of the same product across sites - blocking keys and
+MinHash/LSH generate candidates, a cheap rule-based check verifies them
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.hashing import mix64
+from app.core.normalization import normalize
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# "S24+" is the "S24 Plus" - spelled out before tokenizing drops the "+"
+_PLUS_SUFFIX = re.compile(r"(?<=\w)\+")
+
+# Brand spellings (normalized - Hebrew final letters are folded) and
+# product lines that imply a brand
+BRAND_ALIASES = {
+    'samsung': ('samsung', 'סמסונג', 'galaxy', 'גלקסי'),
+    'apple': ('apple', 'אפל', 'iphone', 'ipad', 'airpods', 'macbook', 'imac', 'אייפונ', 'אייפד'),
+    'xiaomi': ('xiaomi', 'שיאומי', 'redmi', 'poco'),
+    'google': ('google', 'גוגל', 'pixel'),
+    'sony': ('sony', 'סוני', 'playstation', 'ps5'),
+    'lg': ('lg',),
+    'lenovo': ('lenovo', 'לנובו', 'thinkpad'),
+    'asus': ('asus', 'אסוס', 'zenbook', 'rog'),
+    'hp': ('hp',),
+    'dell': ('dell', 'xps'),
+    'microsoft': ('microsoft', 'מיקרוסופט', 'xbox', 'surface'),
+    'logitech': ('logitech', 'לוגיטק'),
+    'jbl': ('jbl',),
+    'bose': ('bose', 'בוז'),
+    'huawei': ('huawei', 'וואווי'),
+    'nintendo': ('nintendo', 'נינטנדו'),
+    'dyson': ('dyson', 'דייסונ'),
+    'philips': ('philips', 'פיליפס'),
+}
+BRANDS = {alias: brand for brand, aliases in BRAND_ALIASES.items() for alias in aliases}
+
+# Words that distinguish variants of one model ("S24" vs "S24 Ultra")
+VARIANT_WORDS = frozenset({
+    'pro', 'max', 'ultra', 'plus', 'mini', 'lite', 'fe', 'air', 'se', 'edge', 'fold', 'flip', 'neo',
+    'פרו', 'מקס', 'אולטרה', 'פלוס', 'מיני', 'לייט',
+})
+
+# Listing words that don't identify a product (colors, condition, import)
+STOP_WORDS = frozenset({
+    'black', 'white', 'blue', 'red', 'green', 'gold', 'silver', 'gray', 'grey', 'pink', 'purple',
+    'graphite', 'midnight', 'starlight', 'cream', 'violet', 'yellow', 'orange',
+    'שחור', 'לבנ', 'כחול', 'אדומ', 'ירוק', 'זהב', 'כסופ', 'כסף', 'אפור', 'ורוד', 'סגול', 'צהוב', 'כתומ',
+    'יבואנ', 'רשמי', 'מקורי', 'חדש', 'אחריות', 'שנה', 'שנתיימ', 'new', 'original', 'official', 'warranty',
+    'with', 'and', 'the', 'עמ', 'של', 'ו',
+})
+
+# "256gb", "1tb" (storage) and other unit tokens, which are not model numbers
+_STORAGE = re.compile(r"^(\d+)(gb|tb)$")
+_UNIT = re.compile(r"^\d+(?:mb|mah|mp|hz|khz|ml|kg|mm|cm|w|g|l|m)$")
+_DIGIT = re.compile(r"\d")
+
+# Candidate similarity thresholds (IDF-weighted Jaccard over listing tokens)
+DEFAULT_THRESHOLD = 0.5
+BLOCK_THRESHOLD = 0.3
+
+# Share of a model-less listing's tokens that must appear in a listing
+# with a model number ("Galaxy Buds Pro" vs "Galaxy Buds Pro SM-R190")
+CONTAINMENT_THRESHOLD = 0.8
+
+# MinHash signature length and LSH banding: 16 bands of 4 rows put the
+# 50% candidate point at a Jaccard similarity of (1/16) ** (1/4) = 0.5
+NUM_PERM = 64
+BANDS = 16
+
+# Listings compared against per candidate bucket - keeps huge buckets linear
+MAX_COMPARISONS = 32
+
+# Listings hashed per NumPy batch (bounds the token x permutation matrix)
+_CHUNK = 4096
+
+
+class ListingFeatures:
+    """Matching features extracted from one listing name."""
+
+    __slots__ = ('tokens', 'brand', 'models', 'storage', 'variants')
+
+    def __init__(self, tokens: FrozenSet[str], brand: Optional[str], models: FrozenSet[str],
+                 storage: Optional[int], variants: FrozenSet[str]):
+        self.tokens = tokens
+        self.brand = brand
+        self.models = models
+        self.storage = storage
+        self.variants = variants
+
+
+def extract_features(name: str) -> ListingFeatures:
+    """
+    Extract matching features from a listing name.
+
+    Brand aliases (Hebrew and English, and brand-implying product lines)
+    map to one canonical brand token; colors and listing boilerplate are
+    dropped; a "+" suffix counts as the variant word "plus"; tokens
+    containing digits become model numbers, except storage sizes (kept
+    separately, in GB) and other units.
+
+    Args:
+        name: Raw or normalized listing name
+
+    Returns:
+        ListingFeatures
+    """
+    tokens = set()
+    brand = None
+    models = set()
+    storage = None
+    for token in TOKEN_PATTERN.findall(_PLUS_SUFFIX.sub(' plus', normalize(name))):
+        if token in STOP_WORDS:
+            continue
+        alias = BRANDS.get(token)
+        if alias is not None:
+            brand = brand or alias
+            tokens.add(alias)
+            if token != alias:
+                tokens.add(token)  # product line ("iphone") is also a name token
+            continue
+        tokens.add(token)
+        size = _STORAGE.match(token)
+        if size:
+            gb = int(size.group(1)) * (1024 if size.group(2) == 'tb' else 1)
+            storage = max(storage or 0, gb)
+        elif _DIGIT.search(token) and not _UNIT.match(token):
+            models.add(token)
+    return ListingFeatures(
+        frozenset(tokens), brand, frozenset(models), storage, frozenset(tokens & VARIANT_WORDS)
+    )
+
+
+def blocking_keys(features: ListingFeatures) -> List[str]:
+    """
+    Blocking keys for a listing: one per model number, qualified by the
+    variant words. Brand and storage are left out (listings often omit
+    them) and checked during verification instead. Listings without a
+    model number get no keys.
+    """
+    suffix = '|' + ' '.join(sorted(features.variants))
+    return [model + suffix for model in features.models]
+
+
+def token_weights(token_sets: Iterable[FrozenSet[str]]) -> Dict[str, float]:
+    """
+    Smoothed IDF weight per token, log(1 + N / df), over a batch of listings.
+
+    Words most listings share (brand, category, the search query itself)
+    weigh little; distinctive words and model numbers weigh a lot.
+    """
+    df = Counter()
+    n = 0
+    for tokens in token_sets:
+        df.update(tokens)
+        n += 1
+    return {token: math.log1p(n / count) for token, count in df.items()}
+
+
+def _weight(tokens: FrozenSet[str], weights: Optional[Dict[str, float]]) -> float:
+    if weights is None:
+        return float(len(tokens))
+    return sum(weights.get(token, 1.0) for token in tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str], weights: Optional[Dict[str, float]] = None) -> float:
+    """Jaccard similarity, IDF-weighted when weights are given."""
+    if not a or not b:
+        return 0.0
+    common = _weight(a & b, weights)
+    return common / (_weight(a, weights) + _weight(b, weights) - common)
+
+
+def is_match(
+    a: ListingFeatures,
+    b: ListingFeatures,
+    threshold: float = DEFAULT_THRESHOLD,
+    weights: Optional[Dict[str, float]] = None,
+) -> bool:
+    """
+    Verify a candidate pair.
+
+    Conflicting brands, storage sizes, variant words or (disjoint) model
+    numbers rule a pair out; otherwise the token Jaccard similarity must
+    reach the threshold. When only one listing has a model number, the
+    other's tokens must be almost entirely contained in it instead.
+    """
+    if a.brand and b.brand and a.brand != b.brand:
+        return False
+    if a.storage and b.storage and a.storage != b.storage:
+        return False
+    if a.variants != b.variants:
+        return False
+    if a.models and b.models:
+        if not a.models & b.models:
+            return False
+    elif a.models or b.models:
+        plain, other = (b, a) if a.models else (a, b)
+        if not plain.tokens:
+            return False
+        shared = _weight(plain.tokens & other.tokens, weights)
+        return shared >= CONTAINMENT_THRESHOLD * _weight(plain.tokens, weights)
+    return jaccard(a.tokens, b.tokens, weights) >= threshold
+
+
+def minhash_signatures(token_sets: Sequence[FrozenSet[str]], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """
+    MinHash signatures for a batch of token sets.
+
+    Tokens are numbered through a shared vocabulary and each permutation
+    is a seeded SplitMix64 hash, so a whole batch is hashed with a few
+    NumPy operations.
+
+    Returns:
+        (len(token_sets), num_perm) uint64 array; empty sets get all-max rows
+    """
+    vocabulary: Dict[str, int] = {}
+    ids = []
+    counts = np.zeros(len(token_sets), dtype=np.int64)
+    for i, tokens in enumerate(token_sets):
+        counts[i] = len(tokens)
+        for token in tokens:
+            ids.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    seeds = mix64(np.arange(num_perm, dtype=np.uint64) + np.uint64(seed << 32))
+    signatures = np.full((len(token_sets), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    ids = np.asarray(ids, dtype=np.uint64)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    for first in range(0, len(token_sets), _CHUNK):
+        last = min(first + _CHUNK, len(token_sets))
+        nonempty = np.flatnonzero(counts[first:last]) + first
+        if not len(nonempty):
+            continue
+        chunk_ids = ids[starts[first]:ends[last - 1]]
+        hashed = mix64(chunk_ids[:, None] ^ seeds[None, :])
+        signatures[nonempty] = np.minimum.reduceat(hashed, starts[nonempty] - starts[first], axis=0)
+    return signatures
+
+
+def lsh_band_keys(signatures: np.ndarray, bands: int = BANDS) -> np.ndarray:
+    """Hash each band of each signature to one uint64: (n, bands) array."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    banded = signatures[:, :bands * rows].reshape(n, bands, rows)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    for r in range(rows):
+        keys = mix64(keys ^ banded[:, :, r])
+    return keys
+
+
+class OfferMatcher:
+    """
+    Clusters listing names that describe the same product.
+
+    Similarity is token Jaccard weighted by IDF over the batch being
+    clustered. Candidates come from two sources: listings sharing a
+    blocking key (model number + variant), verified with the looser
+    block_threshold, and listings sharing a MinHash LSH bucket, verified
+    with threshold. Two listings that both have model numbers can only
+    match through a shared model number, which blocking already covers,
+    so LSH only pairs listings where at least one side has none. Verified
+    pairs are merged with union-find. Within a bucket each listing is
+    only compared with up to max_comparisons distinct clusters, so the
+    total work stays near-linear.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        block_threshold: float = BLOCK_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        max_comparisons: int = MAX_COMPARISONS,
+    ):
+        self.threshold = threshold
+        self.block_threshold = block_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_comparisons = max_comparisons
+
+    def cluster(self, names: Sequence[str]) -> List[int]:
+        """
+        Cluster listing names.
+
+        Args:
+            names: Listing names (raw or normalized)
+
+        Returns:
+            A cluster label per name; labels are 0, 1, 2, ... in order of
+            each cluster's first listing
+        """
+        return self.cluster_features([extract_features(name) for name in names])
+
+    def cluster_features(self, features: Sequence[ListingFeatures]) -> List[int]:
+        """cluster() for already-extracted features."""
+        n = len(features)
+        parent = list(range(n))
+        weights = token_weights(f.tokens for f in features)
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def link(bucket: Iterable[int], threshold: float, blocked: bool) -> None:
+            representatives = {}  # cluster root -> first listing of it in this bucket
+            for i in bucket:
+                root = find(i)
+                if root in representatives:
+                    continue
+                has_models = features[i].models
+                for rep_root, rep in representatives.items():
+                    if not blocked and has_models and features[rep].models:
+                        continue
+                    if is_match(features[i], features[rep], threshold, weights):
+                        break
+                else:
+                    if len(representatives) < self.max_comparisons:
+                        representatives[root] = i
+                    continue
+                # Keep the earliest listing as the root, so labels follow input order
+                if root < rep_root:
+                    parent[rep_root] = root
+                    representatives[root] = representatives.pop(rep_root)
+                else:
+                    parent[root] = rep_root
+
+        # Blocking keys: shared model number and variant
+        blocks: Dict[str, List[int]] = {}
+        for i, f in enumerate(features):
+            for key in blocking_keys(f):
+                blocks.setdefault(key, []).append(i)
+        for bucket in blocks.values():
+            if len(bucket) > 1:
+                link(bucket, self.block_threshold, True)
+
+        # MinHash LSH buckets: similar token sets
+        hashed = np.array([i for i, f in enumerate(features) if f.tokens], dtype=np.int64)
+        if len(hashed) > 1:
+            signatures = minhash_signatures([features[i].tokens for i in hashed], self.num_perm)
+            keys = lsh_band_keys(signatures, self.bands)
+            no_models = np.array([not features[i].models for i in hashed], dtype=np.int64)
+            for band in range(keys.shape[1]):
+                order = np.argsort(keys[:, band], kind='stable')
+                ordered = keys[order, band]
+                starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+                ends = np.r_[starts[1:], len(ordered)]
+                # Only buckets with 2+ listings, at least one without a model number
+                without = np.add.reduceat(no_models[order], starts)
+                useful = (ends - starts > 1) & (without > 0)
+                for start, end in zip(starts[useful].tolist(), ends[useful].tolist()):
+                    link(hashed[order[start:end]].tolist(), self.threshold, False)
+
+        labels = {}
+        return [labels.setdefault(find(i), len(labels)) for i in range(n)]
@@ -0,0 +1,206 @@
+"""
+Search Page Parsers
+Pluggable backends for extracting product items from search result pages
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+from lxml import etree, html
+
+
+# A selector mirrors BeautifulSoup's find(name, attrs): a tag name (None =
+# any tag, a list = any of them) and attribute filters, where a string
+# value must match (for 'class', be one of the element's classes) and True
+# means "attribute present".
+Selector = Tuple[Union[str, List[str], None], Dict[str, Union[str, bool]]]
+
+# Backends:
+#   soup     - full BeautifulSoup tree, find()/find_all() (reference implementation)
+#   strainer - BeautifulSoup restricted by a SoupStrainer to product containers
+#   lxml     - lxml tree queried with XPath compiled once per site
+PARSER_BACKENDS = ('soup', 'strainer', 'lxml')
+
+_TEXT_XPATH = etree.XPath(
+    "descendant-or-self::text()[not(parent::script or parent::style or parent::template)]",
+    smart_strings=False,
+)
+
+
+def _xpath_for(selector: Selector) -> str:
+    """Translate a selector into a relative XPath over descendants."""
+    name, attrs = selector
+    if name is None:
+        step = '*'
+    elif isinstance(name, (list, tuple)):
+        step = '*[' + ' or '.join(f'self::{n}' for n in name) + ']'
+    else:
+        step = name
+
+    predicates = []
+    for attr, value in attrs.items():
+        if value is True:
+            predicates.append(f'@{attr}')
+        elif attr == 'class':
+            predicates.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')")
+        else:
+            predicates.append(f"@{attr}='{value}'")
+    return './/' + step + ''.join(f'[{p}]' for p in predicates)
+
+
+def _soup_kwargs(selector: Selector) -> dict:
+    name, attrs = selector
+    return {'name': name, 'attrs': dict(attrs)}
+
+
+class PageSpec:
+    """
+    Declarative description of a site's search results page.
+
+    containers: fallback list of selectors for product items - the first
+        selector that matches anything wins, as in the original find_all chains.
+    fields: per-field fallback lists of selectors, searched inside an item;
+        the first selector with a match wins.
+
+    Selectors are compiled to XPath once, when the spec is created.
+    """
+
+    def __init__(self, containers: List[Selector], fields: Dict[str, List[Selector]]):
+        self.containers = containers
+        self.fields = fields
+        self._container_xpaths = [etree.XPath(_xpath_for(s)) for s in containers]
+        self._field_xpaths = {
+            field: [etree.XPath(_xpath_for(s)) for s in selectors]
+            for field, selectors in fields.items()
+        }
+        self.strainer = SoupStrainer(self._is_container)
+
+    def _is_container(self, name, attrs) -> bool:
+        """SoupStrainer predicate: True for tags matching any container selector."""
+        if not isinstance(attrs, dict):
+            attrs = dict(attrs or ())
+        for tag, filters in self.containers:
+            if tag is not None and name != tag and not (isinstance(tag, (list, tuple)) and name in tag):
+                continue
+            if all(self._attr_matches(attrs, attr, value) for attr, value in filters.items()):
+                return True
+        return False
+
+    @staticmethod
+    def _attr_matches(attrs: dict, attr: str, value) -> bool:
+        actual = attrs.get(attr)
+        if value is True:
+            return actual is not None
+        if actual is None:
+            return False
+        if attr == 'class':
+            classes = actual.split() if isinstance(actual, str) else actual
+            return value in classes
+        return actual == value
+
+
+class SoupNode:
+    """Product item backed by a BeautifulSoup tag."""
+
+    __slots__ = ('element', 'spec')
+
+    def __init__(self, element, spec: PageSpec):
+        self.element = element
+        self.spec = spec
+
+    def find(self, field: str) -> Optional["SoupNode"]:
+        """First element matching the field's selector chain, or None."""
+        for selector in self.spec.fields[field]:
+            found = self.element.find(**_soup_kwargs(selector))
+            if found is not None:
+                return SoupNode(found, self.spec)
+        return None
+
+    @property
+    def text(self) -> str:
+        return self.element.get_text(strip=True)
+
+    def get(self, attr: str, default=None):
+        return self.element.get(attr, default)
+
+
+class LxmlNode:
+    """Product item backed by an lxml element."""
+
+    __slots__ = ('element', 'spec')
+
+    def __init__(self, element, spec: PageSpec):
+        self.element = element
+        self.spec = spec
+
+    def find(self, field: str) -> Optional["LxmlNode"]:
+        """First element matching the field's selector chain, or None."""
+        for xpath in self.spec._field_xpaths[field]:
+            found = xpath(self.element)
+            if found:
+                return LxmlNode(found[0], self.spec)
+        return None
+
+    @property
+    def text(self) -> str:
+        """Text with BeautifulSoup get_text(strip=True) semantics."""
+        return ''.join(s.strip() for s in _TEXT_XPATH(self.element))
+
+    def get(self, attr: str, default=None):
+        return self.element.get(attr, default)
+
+
+def _decode(content: bytes) -> str:
+    """Decode a page - UTF-8 first, then BeautifulSoup's encoding detection."""
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).unicode_markup
+
+
+def soup_items(soup: BeautifulSoup, spec: PageSpec, max_results: int) -> List[SoupNode]:
+    """Product items from an already-parsed BeautifulSoup tree."""
+    for selector in spec.containers:
+        items = soup.find_all(limit=max_results, **_soup_kwargs(selector))
+        if items:
+            return [SoupNode(item, spec) for item in items]
+    return []
+
+
+def lxml_items(content: bytes, spec: PageSpec, max_results: int) -> List[LxmlNode]:
+    """Product items via lxml and the spec's compiled XPath."""
+    text = _decode(content)
+    if not text.strip():
+        return []
+    try:
+        root = html.document_fromstring(text)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be parsed as bytes
+        root = html.document_fromstring(content)
+    for xpath in spec._container_xpaths:
+        items = xpath(root)
+        if items:
+            return [LxmlNode(item, spec) for item in items[:max_results]]
+    return []
+
+
+def parse_items(content: bytes, spec: PageSpec, max_results: int, backend: str = 'lxml') -> list:
+    """
+    Parse a search page and return its product items.
+
+    Args:
+        content: Raw page body
+        spec: The site's page spec
+        max_results: Maximum number of items
+        backend: One of PARSER_BACKENDS
+
+    Returns:
+        List of SoupNode or LxmlNode items (same interface)
+    """
+    if backend == 'lxml':
+        return lxml_items(content, spec, max_results)
+    if backend == 'strainer':
+        return soup_items(BeautifulSoup(content, 'lxml', parse_only=spec.strainer), spec, max_results)
+    if backend == 'soup':
+        return soup_items(BeautifulSoup(content, 'lxml'), spec, max_results)
+    raise ValueError(f"Unknown parser backend: {backend}")
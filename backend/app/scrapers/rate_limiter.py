@@ -0,0 +1,161 @@
+"""
+Outbound Rate Limiting
+Per-host GCRA limiter and retry backoff for the scrapers
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+# Retry backoff (seconds)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# Retry-After values above this are not waited for - the request is given up
+MAX_RETRY_AFTER = 60.0
+
+
+class RateLimiter:
+    """
+    Generic Cell Rate Algorithm (GCRA) limiter.
+
+    Equivalent to a token bucket of `burst` tokens refilled at `rate` per
+    second, but stores a single timestamp (the theoretical arrival time).
+    A request only waits when the configured rate has been exceeded, so
+    the first requests after an idle period go out immediately.
+
+    Reservations are made under a lock, so one limiter can be shared by
+    threads and asyncio tasks alike.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed back-to-back after an idle period
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1.0 / rate
+        self._tolerance = self._interval * (burst - 1)
+        self._tat = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """
+        Reserve the next request slot.
+
+        Args:
+            now: Current monotonic time (defaults to time.monotonic())
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat, now)
+            delay = max(0.0, tat - self._tolerance - now)
+            self._tat = tat + self._interval
+        return delay
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """Take a slot only if one is free right now; never waits."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat, now)
+            if tat - self._tolerance - now > 0:
+                return False
+            self._tat = tat + self._interval
+        return True
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the time waited."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Wait (without blocking the event loop) until a request may be sent."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, rate: float, burst: int = 1) -> RateLimiter:
+    """
+    Return the process-wide limiter for a host, creating it on first use.
+
+    Every scraper instance talking to the same host shares one limiter, so
+    the configured rate holds across threads, tasks and scraper instances.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = RateLimiter(rate, burst)
+        return limiter
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date).
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+    """
+    Delay before retry number `attempt` (0-based).
+
+    Uses "full jitter" exponential backoff - a uniform draw from
+    [0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt)] - so clients retrying
+    together spread out. A Retry-After header from the server takes
+    precedence when it asks for a longer wait.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        retry_after: Raw Retry-After header value, if any
+
+    Returns:
+        Seconds to wait, or None if the server asked for more than
+        MAX_RETRY_AFTER and the request should be given up
+    """
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is not None:
+        if server_delay > MAX_RETRY_AFTER:
+            return None
+        delay = max(delay, server_delay)
+    return delay
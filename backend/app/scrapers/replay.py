@@ -0,0 +1,151 @@
+"""
+Record / Replay
+Serve scraper HTTP traffic from a stored corpus of compressed responses,
+so parsing can be tested and benchmarked without touching live sites
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+MANIFEST_NAME = 'manifest.json'
+
+# Response headers kept in the corpus (validators matter for HTTP caching)
+RECORDED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control')
+
+
+class ReplayMissError(LookupError):
+    """Raised when a URL is requested that the corpus does not contain."""
+
+
+class ReplayCorpus:
+    """
+    A directory of gzip-compressed response bodies plus a manifest.
+
+    manifest.json maps each URL to {"file", "status", "headers", "kind"},
+    where file is relative to the corpus directory and kind is "search" or
+    "detail". Bodies are decompressed once and kept in memory.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._bodies: Dict[str, bytes] = {}
+        path = os.path.join(root, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries: Dict[str, dict] = json.load(f)
+        else:
+            self.entries = {}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def urls(self, site: Optional[str] = None, kind: Optional[str] = None) -> List[str]:
+        """Recorded URLs, optionally filtered by site directory and page kind."""
+        return [
+            url for url, entry in self.entries.items()
+            if (site is None or entry['file'].split('/', 1)[0] == site)
+            and (kind is None or entry.get('kind') == kind)
+        ]
+
+    def body(self, url: str) -> bytes:
+        """Decompressed body for a recorded URL."""
+        if url not in self.entries:
+            raise ReplayMissError(f"No recorded response for {url}")
+        with self._lock:
+            body = self._bodies.get(url)
+            if body is None:
+                with gzip.open(os.path.join(self.root, self.entries[url]['file']), 'rb') as f:
+                    body = self._bodies[url] = f.read()
+        return body
+
+    def record(self, url: str, site: str, kind: str, status: int, headers, body: bytes, name: str) -> None:
+        """Store a response (call save() to write the manifest)."""
+        relative = f"{site}/{name}.html.gz"
+        os.makedirs(os.path.join(self.root, site), exist_ok=True)
+        with gzip.open(os.path.join(self.root, relative), 'wb', compresslevel=9) as f:
+            f.write(body)
+        kept = {k: v for k, v in headers.items() if k.lower() in RECORDED_HEADERS}
+        with self._lock:
+            self.entries[url] = {'file': relative, 'status': status, 'headers': kept, 'kind': kind}
+            self._bodies[url] = body
+
+    def save(self) -> None:
+        with open(os.path.join(self.root, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport adapter that answers from a ReplayCorpus."""
+
+    def __init__(self, corpus: ReplayCorpus):
+        super().__init__()
+        self.corpus = corpus
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.corpus.entries.get(request.url)
+        if entry is None:
+            raise ReplayMissError(f"No recorded response for {request.url}")
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = self.corpus.body(request.url)
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = 'OK' if entry['status'] < 400 else 'Error'
+        return response
+
+    def close(self):
+        pass
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers from a ReplayCorpus (for the async fetch path)."""
+
+    def __init__(self, corpus: ReplayCorpus):
+        self.corpus = corpus
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        entry = self.corpus.entries.get(url)
+        if entry is None:
+            raise ReplayMissError(f"No recorded response for {url}")
+        return httpx.Response(entry['status'], headers=entry.get('headers', {}), content=self.corpus.body(url))
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    requests transport adapter that performs real requests and stores the
+    responses in a corpus. Used once, online, to refresh the fixtures.
+    """
+
+    def __init__(self, corpus: ReplayCorpus, site: str, kind: str = 'search'):
+        super().__init__()
+        self.corpus = corpus
+        self.site = site
+        self.kind = kind
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        name = f"{self.kind}_{len(self.corpus.urls(self.site)):03d}"
+        self.corpus.record(request.url, self.site, self.kind, response.status_code,
+                           response.headers, response.content, name)
+        return response
+
+
+def install_replay(scraper, corpus: ReplayCorpus) -> None:
+    """Route a scraper's blocking session and async client through the corpus."""
+    adapter = ReplayAdapter(corpus)
+    scraper.session.mount('http://', adapter)
+    scraper.session.mount('https://', adapter)
+    scraper.async_client = httpx.AsyncClient(transport=AsyncReplayTransport(corpus))
+    scraper._owns_async_client = True
@@ -3,22 +3,102 @@ Scraper Manager
 Coordinates multiple scrapers and aggregates results
 """
 
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import re
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.normalization import normalize
+from app.data.products_database import get_product_by_id
+from .base_scraper import create_async_client
+from .circuit_breaker import OPEN
+from .cache import ScrapeCache, create_scrape_cache
+from .catalog_linker import CatalogLinker, unlinked_product_id
+from .http_cache import shared_http_cache
+from .matching import OfferMatcher
+from .singleflight import SingleFlight
 from .zap_scraper import ZapScraper
 from .ksp_scraper import KSPScraper
 from .bug_scraper import BugScraper
 
 
+# Per-site timeout for async searches (seconds)
+SITE_TIMEOUT = 30
+
+# Common listing words that don't help matching products across sites
+NOISE_WORDS = re.compile(r"\b(?:מקורי|חדש|new|original|משלוח חינמ|free shipping)\b")
+
+
+def _host(url: str) -> str:
+    """Host of a URL without a leading "www."."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class PriceStats:
+    """Running price statistics (count, sum, min, max) over a product's offers."""
+
+    __slots__ = ('count', 'total', 'lowest', 'highest')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.lowest = None
+        self.highest = None
+
+    def add_offer(self, offer: Dict) -> None:
+        """Fold in an offer; only available offers with a price count."""
+        price = offer.get('price')
+        if not price or not offer.get('availability'):
+            return
+        self.count += 1
+        self.total += price
+        if self.lowest is None or price < self.lowest:
+            self.lowest = price
+        if self.highest is None or price > self.highest:
+            self.highest = price
+
+    def apply_to(self, product: Dict) -> None:
+        """Write lowest/highest/average price and potential savings into a product."""
+        if not self.count:
+            product['lowest_price'] = None
+            product['highest_price'] = None
+            product['average_price'] = None
+            return
+
+        product['lowest_price'] = round(self.lowest, 2)
+        product['highest_price'] = round(self.highest, 2)
+        product['average_price'] = round(self.total / self.count, 2)
+
+        # Calculate savings
+        if product['lowest_price'] and product['highest_price']:
+            savings = product['highest_price'] - product['lowest_price']
+            savings_percent = (savings / product['highest_price']) * 100
+            product['potential_savings'] = round(savings, 2)
+            product['savings_percent'] = round(savings_percent, 1)
+
+
 class ScraperManager:
     """
     Manages multiple scrapers and aggregates their results.
     Provides parallel scraping capabilities for faster results.
+
+    Meant to be long-lived: the API creates one instance at startup, so
+    HTTP sessions, the async connection pool and the worker pool stay warm
+    across requests.
     """
 
-    def __init__(self, enabled_scrapers: Optional[List[str]] = None):
+    def __init__(
+        self,
+        enabled_scrapers: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        cache: Optional[ScrapeCache] = None,
+        deadline: Optional[float] = None,
+        catalog_linker: Optional[CatalogLinker] = None,
+    ):
         """
         Initialize the scraper manager.
 
@@ -26,6 +106,12 @@ class ScraperManager:
             enabled_scrapers: List of scraper names to enable.
                             If None, all scrapers are enabled.
                             Options: ['zap', 'ksp', 'bug']
+            max_workers: Size of the shared worker pool (defaults to SCRAPER_MAX_WORKERS)
+            cache: Scrape result cache (defaults to one configured from settings)
+            deadline: Seconds a fan-out waits before returning partial results
+                      (defaults to SCRAPE_DEADLINE_SECONDS)
+            catalog_linker: Maps aggregated products to catalog ids
+                            (defaults to one backed by the offer_links table)
         """
         self.scrapers = {}
 
@@ -39,12 +125,45 @@ class ScraperManager:
         if enabled_scrapers is None or 'bug' in enabled_scrapers:
             self.scrapers['bug'] = BugScraper()
 
+        # Host -> scraper name, for routing product URLs
+        self._hosts = {_host(scraper.base_url): name for name, scraper in self.scrapers.items()}
+
+        # Bounded worker pool shared by all searches (blocking fetches and parsing)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.SCRAPER_MAX_WORKERS,
+            thread_name_prefix="scraper",
+        )
+        for scraper in self.scrapers.values():
+            scraper.executor = self._executor
+
+        # Shared async connection pool, created on first async search
+        self._async_client = None
+
+        self.deadline = deadline or settings.SCRAPE_DEADLINE_SECONDS
+
+        # Per-site result cache; stale entries are refreshed in the background
+        self.cache = cache if cache is not None else create_scrape_cache()
+        self._background_tasks = set()
+
+        # Coalesce concurrent identical searches (whole fan-out and per site)
+        self.search_flight = SingleFlight()
+        self.site_flight = SingleFlight()
+
+        # Groups listings of the same product across sites
+        self.matcher = OfferMatcher()
+
+        # Links aggregated products to catalog product ids
+        self.catalog_linker = catalog_linker if catalog_linker is not None else CatalogLinker()
+
         print(f"[ScraperManager] Initialized with scrapers: {list(self.scrapers.keys())}")
 
     def search_all_parallel(self, query: str, max_results_per_site: int = 10) -> Dict[str, List[Dict]]:
         """
         Search all enabled scrapers in parallel for faster results.
 
+        Returns at the deadline with whatever sites have answered; sites
+        whose circuit is open are skipped.
+
         Args:
             query: Search query
             max_results_per_site: Maximum results per scraper
@@ -52,29 +171,302 @@ class ScraperManager:
         Returns:
             Dictionary with scraper names as keys and results as values
         """
+        key = (normalize(query), max_results_per_site)
+        return dict(self.search_flight.do(key, lambda: self._search_all_parallel(query, max_results_per_site)))
+
+    def _search_all_parallel(self, query: str, max_results_per_site: int) -> Dict[str, List[Dict]]:
         print(f"[ScraperManager] Starting parallel search for: {query}")
         results = {}
+        pending = []
 
-        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
-            # Submit all scraping tasks
-            future_to_scraper = {
-                executor.submit(scraper.search_product, query, max_results_per_site): name
-                for name, scraper in self.scrapers.items()
-            }
+        for name in self.scrapers:
+            cached = self._cached_results(name, query, max_results_per_site, self._schedule_refresh)
+            if cached is not None:
+                results[name] = cached
+            elif self._circuit_open(name):
+                results[name] = []
+            else:
+                pending.append(name)
+
+        # Submit scraping tasks for cache misses
+        future_to_scraper = {
+            self._executor.submit(self._scrape_site, name, query, max_results_per_site): name
+            for name in pending
+        }
+
+        # Collect what completed by the deadline; late sites keep running and fill the cache
+        done, not_done = wait(future_to_scraper, timeout=self.deadline)
+        for future in done:
+            scraper_name = future_to_scraper[future]
+            try:
+                scraper_results = future.result()
+                results[scraper_name] = scraper_results
+                print(f"[ScraperManager] {scraper_name} returned {len(scraper_results)} results")
+            except Exception as e:
+                print(f"[ScraperManager] Error with {scraper_name}: {e}")
+                results[scraper_name] = []
+        for future in not_done:
+            scraper_name = future_to_scraper[future]
+            print(f"[ScraperManager] {scraper_name} missed the {self.deadline}s deadline")
+            results[scraper_name] = []
+
+        return results
+
+    async def search_all(self, query: str, max_results_per_site: int = 10) -> Dict[str, List[Dict]]:
+        """
+        Search all enabled scrapers concurrently on the event loop.
+
+        All scrapers share one pooled httpx.AsyncClient, so connections stay
+        warm between searches; nothing blocks the calling event loop.
+        Concurrent identical searches share one fan-out. Returns at the
+        deadline with whatever sites have answered; sites whose circuit is
+        open are skipped.
+
+        Args:
+            query: Search query
+            max_results_per_site: Maximum results per scraper
+
+        Returns:
+            Dictionary with scraper names as keys and results as values
+        """
+        key = (normalize(query), max_results_per_site)
+        return dict(await self.search_flight.do_async(key, lambda: self._search_all(query, max_results_per_site)))
 
-            # Collect results as they complete
-            for future in as_completed(future_to_scraper):
-                scraper_name = future_to_scraper[future]
-                try:
-                    scraper_results = future.result(timeout=30)  # 30 second timeout
-                    results[scraper_name] = scraper_results
-                    print(f"[ScraperManager] {scraper_name} returned {len(scraper_results)} results")
-                except Exception as e:
-                    print(f"[ScraperManager] Error with {scraper_name}: {e}")
-                    results[scraper_name] = []
+    async def _search_all(self, query: str, max_results_per_site: int) -> Dict[str, List[Dict]]:
+        print(f"[ScraperManager] Starting async search for: {query}")
+        self._share_async_client()
+
+        results = {}
+        tasks = {}
+        keys = {name: self.cache.make_key(query, name, max_results_per_site) for name in self.scrapers}
+        if self.cache.backend is not None:
+            # Memory misses read SQLite - do every lookup in one trip to the worker pool
+            entries = await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: {name: self.cache.get(key) for name, key in keys.items()}
+            )
+        else:
+            entries = {name: self.cache.get(key) for name, key in keys.items()}
+        for name in self.scrapers:
+            cached = self._serve_cached(
+                name, query, max_results_per_site, keys[name], entries[name], self._schedule_async_refresh
+            )
+            if cached is not None:
+                results[name] = cached
+            elif self._circuit_open(name):
+                results[name] = []
+            else:
+                tasks[name] = asyncio.ensure_future(self._async_scrape_site(name, query, max_results_per_site))
+
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=self.deadline)
+
+        for name, task in tasks.items():
+            if not task.done():
+                # Late sites keep running in the background and fill the cache
+                print(f"[ScraperManager] {name} missed the {self.deadline}s deadline")
+                self._track_background(task)
+                results[name] = []
+            elif task.cancelled() or task.exception() is not None:
+                print(f"[ScraperManager] Error with {name}: {'cancelled' if task.cancelled() else repr(task.exception())}")
+                results[name] = []
+            else:
+                results[name] = task.result()
+                print(f"[ScraperManager] {name} returned {len(results[name])} results")
 
         return results
 
+    def _share_async_client(self) -> None:
+        """Point every scraper at the shared async client, creating it on first use."""
+        if self._async_client is None:
+            self._async_client = create_async_client()
+        for scraper in self.scrapers.values():
+            scraper.async_client = self._async_client
+
+    def scraper_for_url(self, url: str) -> Optional[str]:
+        """Name of the enabled scraper that handles a product URL, or None."""
+        return self._hosts.get(_host(url))
+
+    async def iter_product_details(self, urls: List[str]) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+        """
+        Fetch product detail pages concurrently, yielding each as soon as it is parsed.
+
+        All pages are requested at once; each scraper's per-host connection
+        limit and rate limiter decide how many of its pages are actually in
+        flight. Pages of sites whose circuit is open, of unknown sites, or
+        that fail are yielded with None.
+
+        Args:
+            urls: Product page URLs (any mix of sites; duplicates are fetched once)
+
+        Yields:
+            (url, details) in completion order - for Zap pages details
+            include the full 'stores' list
+        """
+        self._share_async_client()
+        tasks = []
+        for url in dict.fromkeys(urls):
+            name = self.scraper_for_url(url)
+            if name is None:
+                print(f"[ScraperManager] No scraper for {url}")
+                yield url, None
+            elif self._circuit_open(name):
+                yield url, None
+            else:
+                tasks.append(asyncio.ensure_future(self._async_product_details(name, url)))
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_product_details(self, name: str, url: str) -> Tuple[str, Optional[Dict]]:
+        """Fetch one detail page; concurrent requests for the same URL share one fetch."""
+        async def fetch():
+            return await asyncio.wait_for(self.scrapers[name].async_get_product_details(url), SITE_TIMEOUT)
+
+        try:
+            return url, await self.site_flight.do_async(('details', url), fetch)
+        except Exception as e:
+            print(f"[ScraperManager] Error fetching details from {url}: {e!r}")
+            return url, None
+
+    async def enrich_products(self, products: List[Dict], max_products: int = 10) -> List[Dict]:
+        """
+        Enrich aggregated products with their detail pages.
+
+        The detail pages of every offer of the first max_products products
+        are fetched concurrently (see iter_product_details) and merged into
+        the records as they arrive: offer prices and availability are
+        refreshed, missing descriptions and images are filled in, and store
+        lists are merged into a per-product 'stores' list (cheapest offer
+        per store, sorted by price).
+
+        Args:
+            products: Output of aggregate_results (modified in place)
+            max_products: Number of leading products to enrich
+
+        Returns:
+            The products list
+        """
+        offers_by_url = {}
+        for product in products[:max_products]:
+            for offer in product.get('prices', []):
+                if offer.get('url'):
+                    offers_by_url.setdefault(offer['url'], []).append((product, offer))
+
+        async for url, details in self.iter_product_details(list(offers_by_url)):
+            if details:
+                for product, offer in offers_by_url[url]:
+                    self._merge_details(product, offer, details)
+
+        return products
+
+    def _merge_details(self, product: Dict, offer: Dict, details: Dict) -> None:
+        """Merge one detail page into an aggregated product and the offer it came from."""
+        if details.get('price') is not None:
+            offer['price'] = details['price']
+            offer['availability'] = details.get('availability', offer.get('availability', True))
+            offer['last_updated'] = datetime.now()
+
+        for field in ('description', 'image_url'):
+            if not product.get(field) and details.get(field):
+                product[field] = details[field]
+
+        if details.get('stores'):
+            stores = {store['store_name']: store for store in product.get('stores', [])}
+            for store in details['stores']:
+                current = stores.get(store['store_name'])
+                if current is None or store['price'] < current['price']:
+                    stores[store['store_name']] = store
+            product['stores'] = sorted(stores.values(), key=lambda store: store['price'])
+
+        self._update_price_statistics(product)
+
+    def _circuit_open(self, name: str) -> bool:
+        """True (and logged) if the site's circuit breaker is rejecting calls."""
+        if self.scrapers[name].circuit_breaker.state() == OPEN:
+            print(f"[ScraperManager] Skipping {name} - circuit open")
+            return True
+        return False
+
+    def _track_background(self, task: asyncio.Future) -> None:
+        """Keep a reference to a background task until it finishes."""
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _cached_results(self, name: str, query: str, max_results: int, schedule_refresh) -> Optional[List[Dict]]:
+        """
+        Return cached results for a site, or None on a miss.
+
+        A stale entry is returned as-is and schedule_refresh(name, query,
+        max_results, key) is called once to revalidate it in the background.
+        """
+        key = self.cache.make_key(query, name, max_results)
+        return self._serve_cached(name, query, max_results, key, self.cache.get(key), schedule_refresh)
+
+    def _serve_cached(self, name: str, query: str, max_results: int, key, entry, schedule_refresh) -> Optional[List[Dict]]:
+        """Copy a looked-up entry's results for the caller (see _cached_results)."""
+        if entry is None:
+            return None
+        if self.cache.is_stale(entry) and self.cache.begin_refresh(key):
+            schedule_refresh(name, query, max_results, key)
+        print(f"[ScraperManager] {name} served {len(entry.value)} cached results")
+        # Callers enrich and aggregate the dicts in place - never hand out the cached ones
+        return [dict(product) for product in entry.value]
+
+    def _store_results(self, name: str, query: str, max_results: int, results: List[Dict]) -> None:
+        # Empty results are not cached - they usually mean the fetch failed
+        if results:
+            self.cache.set(self.cache.make_key(query, name, max_results), tuple(dict(product) for product in results))
+
+    def _scrape_site(self, name: str, query: str, max_results: int) -> List[Dict]:
+        """Scrape one site (blocking) and cache the results; concurrent identical calls share one scrape."""
+        def scrape():
+            results = self.scrapers[name].search_product(query, max_results)
+            self._store_results(name, query, max_results, results)
+            return results
+
+        return self.site_flight.do(self.cache.make_key(query, name, max_results), scrape)
+
+    async def _async_scrape_site(self, name: str, query: str, max_results: int) -> List[Dict]:
+        """Scrape one site on the event loop and cache the results; concurrent identical calls share one scrape."""
+        async def scrape():
+            results = await asyncio.wait_for(
+                self.scrapers[name].async_search_product(query, max_results), SITE_TIMEOUT
+            )
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._store_results, name, query, max_results, results
+            )
+            return results
+
+        return await self.site_flight.do_async(self.cache.make_key(query, name, max_results), scrape)
+
+    def _schedule_refresh(self, name: str, query: str, max_results: int, key) -> None:
+        """Revalidate a stale entry on the worker pool."""
+        def refresh():
+            try:
+                self._scrape_site(name, query, max_results)
+            except Exception as e:
+                print(f"[ScraperManager] Background refresh failed for {name}: {e}")
+            finally:
+                self.cache.end_refresh(key)
+
+        self._executor.submit(refresh)
+
+    def _schedule_async_refresh(self, name: str, query: str, max_results: int, key) -> None:
+        """Revalidate a stale entry in a background task."""
+        async def refresh():
+            try:
+                await self._async_scrape_site(name, query, max_results)
+            except Exception as e:
+                print(f"[ScraperManager] Background refresh failed for {name}: {e!r}")
+            finally:
+                self.cache.end_refresh(key)
+
+        self._track_background(asyncio.create_task(refresh()))
+
     def search_all_sequential(self, query: str, max_results_per_site: int = 10) -> Dict[str, List[Dict]]:
         """
         Search all enabled scrapers sequentially (slower but more reliable).
@@ -100,64 +492,73 @@ class ScraperManager:
 
         return results
 
-    def aggregate_results(self, scraper_results: Dict[str, List[Dict]]) -> List[Dict]:
+    def aggregate_results(self, scraper_results: Dict[str, List[Dict]], link_catalog: bool = False) -> List[Dict]:
         """
         Aggregate and deduplicate results from multiple scrapers.
 
+        Listings are grouped by OfferMatcher, so the same product matches
+        across sites even when names differ ("Samsung Galaxy S24 128GB" and
+        "סמסונג Galaxy S24 128GB שחור"). Each offer is then appended once
+        and folded into running price statistics, which are finalized
+        after the last offer.
+
+        With link_catalog, every listing is also resolved to a catalog
+        product (see CatalogLinker). Products get the catalog id and
+        details, clusters linked to the same catalog product are merged,
+        and unlinked products get a stable id above the catalog range.
+
         Args:
             scraper_results: Dictionary of results from each scraper
+            link_catalog: Assign catalog product ids
 
         Returns:
             Aggregated list of products with price comparisons
         """
-        # Dictionary to group products by similar names
-        product_map = {}
-
+        listings = []
         for scraper_name, products in scraper_results.items():
             for product in products:
                 # Normalize product name for matching
                 normalized_name = self._normalize_product_name(product.get('name', ''))
 
-                if not normalized_name:
-                    continue
-
-                # If this product exists, add pricing info
-                if normalized_name in product_map:
-                    existing = product_map[normalized_name]
-
-                    # Add this source's price to the list
-                    if 'prices' not in existing:
-                        existing['prices'] = []
-
-                    existing['prices'].append({
-                        'source': product['source'],
-                        'price': product.get('price'),
-                        'currency': product.get('currency', 'ILS'),
-                        'url': product.get('url'),
-                        'availability': product.get('availability', True),
-                        'last_updated': product.get('last_updated')
-                    })
-
-                    # Update price statistics
-                    self._update_price_statistics(existing)
-
-                else:
-                    # New product - initialize it
-                    product_map[normalized_name] = {
-                        'name': product.get('name'),
-                        'description': product.get('description'),
-                        'image_url': product.get('image_url'),
-                        'category': product.get('category'),
-                        'prices': [{
-                            'source': product['source'],
-                            'price': product.get('price'),
-                            'currency': product.get('currency', 'ILS'),
-                            'url': product.get('url'),
-                            'availability': product.get('availability', True),
-                            'last_updated': product.get('last_updated')
-                        }]
-                    }
-                    self._update_price_statistics(product_map[normalized_name])
+                if normalized_name:
+                    listings.append((normalized_name, product))
+
+        # Dictionary to group products by matched cluster
+        product_map = {}
+        price_stats = {}
+        clusters = self.matcher.cluster([name for name, _ in listings])
+        if link_catalog:
+            clusters = self._link_clusters(clusters, listings)
+
+        for cluster, (_, product) in zip(clusters, listings):
+            offer = {
+                'source': product['source'],
+                'price': product.get('price'),
+                'currency': product.get('currency', 'ILS'),
+                'url': product.get('url'),
+                'availability': product.get('availability', True),
+                'last_updated': product.get('last_updated')
+            }
+
+            existing = product_map.get(cluster)
+            if existing is None:
+                # New product - initialize it
+                existing = product_map[cluster] = {
+                    'name': product.get('name'),
+                    'description': product.get('description'),
+                    'image_url': product.get('image_url'),
+                    'category': product.get('category'),
+                    'prices': []
+                }
+                price_stats[cluster] = PriceStats()
+                if link_catalog:
+                    self._apply_catalog_link(existing, cluster)
+
+            existing['prices'].append(offer)
+            price_stats[cluster].add_offer(offer)
+
+        for cluster, product in product_map.items():
+            price_stats[cluster].apply_to(product)
 
         # Convert to list and sort by number of available prices
         aggregated = list(product_map.values())
@@ -166,6 +567,44 @@ class ScraperManager:
         print(f"[ScraperManager] Aggregated {len(aggregated)} unique products")
         return aggregated
 
+    def _link_clusters(self, clusters: List[int], listings: List[Tuple[str, Dict]]) -> List:
+        """
+        Replace cluster labels with catalog keys.
+
+        A cluster takes the catalog id most of its listings link to
+        ("catalog", id); clusters with no linked listing keep their label
+        as ("scraped", name) keyed by their first listing's name.
+        """
+        product_ids = self.catalog_linker.link([(product['source'], name) for name, product in listings])
+        votes: Dict[int, Dict[int, int]] = {}
+        first_name: Dict[int, str] = {}
+        for cluster, product_id, (name, _) in zip(clusters, product_ids, listings):
+            first_name.setdefault(cluster, name)
+            if product_id is not None:
+                counts = votes.setdefault(cluster, {})
+                counts[product_id] = counts.get(product_id, 0) + 1
+
+        keys = {}
+        for cluster, name in first_name.items():
+            counts = votes.get(cluster)
+            # Most votes wins; ties go to the first id seen
+            keys[cluster] = ('catalog', max(counts, key=counts.get)) if counts else ('scraped', name)
+        return [keys[cluster] for cluster in clusters]
+
+    def _apply_catalog_link(self, product: Dict, key: Tuple[str, object]) -> None:
+        """Set a new aggregated product's id (and catalog details when linked)."""
+        kind, value = key
+        if kind == 'scraped':
+            product['id'] = unlinked_product_id(value)
+            return
+        catalog = get_product_by_id(value)
+        product['id'] = value
+        if catalog is not None:
+            product['name'] = catalog['name']
+            product['description'] = catalog['description']
+            product['category'] = catalog['category']
+            product['image_url'] = product.get('image_url') or catalog.get('image_url')
+
     def _normalize_product_name(self, name: str) -> str:
         """
         Normalize product name for better matching across sites.
@@ -179,45 +618,23 @@ class ScraperManager:
         if not name:
             return ''
 
-        # Convert to lowercase and remove extra spaces
-        normalized = ' '.join(name.lower().split())
-
-        # Remove common words that don't help matching
-        remove_words = ['מקורי', 'חדש', 'new', 'original', 'משלוח חינם', 'free shipping']
-        for word in remove_words:
-            normalized = normalized.replace(word, '')
+        # Shared Hebrew-aware normalization (final letters fold, so "חינם" -> "חינמ")
+        normalized = NOISE_WORDS.sub('', normalize(name))
 
         # Clean up
-        normalized = ' '.join(normalized.split())
-
-        return normalized
+        return ' '.join(normalized.split())
 
     def _update_price_statistics(self, product: Dict) -> None:
         """
-        Calculate and update price statistics for a product.
+        Recalculate price statistics for a product from all of its offers.
 
         Args:
             product: Product dictionary (modified in place)
         """
-        prices = [p['price'] for p in product.get('prices', [])
-                  if p.get('price') and p.get('availability')]
-
-        if not prices:
-            product['lowest_price'] = None
-            product['highest_price'] = None
-            product['average_price'] = None
-            return
-
-        product['lowest_price'] = round(min(prices), 2)
-        product['highest_price'] = round(max(prices), 2)
-        product['average_price'] = round(sum(prices) / len(prices), 2)
-
-        # Calculate savings
-        if product['lowest_price'] and product['highest_price']:
-            savings = product['highest_price'] - product['lowest_price']
-            savings_percent = (savings / product['highest_price']) * 100
-            product['potential_savings'] = round(savings, 2)
-            product['savings_percent'] = round(savings_percent, 1)
+        stats = PriceStats()
+        for offer in product.get('prices', []):
+            stats.add_offer(offer)
+        stats.apply_to(product)
 
     def get_product_comparison(self, product_name: str) -> Optional[Dict]:
         """
@@ -238,10 +655,44 @@ class ScraperManager:
         # Return the best match (first result after aggregation)
         return aggregated[0]
 
+    def stats(self) -> dict:
+        """Return cache, circuit breaker and request-coalescing statistics."""
+        return {
+            "cache": self.cache.info(),
+            "http_cache": shared_http_cache().info(),
+            "catalog_links": self.catalog_linker.info(),
+            "circuits": {name: scraper.circuit_breaker.info() for name, scraper in self.scrapers.items()},
+            "coalescing": {
+                "searches": self.search_flight.info(),
+                "sites": self.site_flight.info(),
+            },
+        }
+
     def close_all(self):
-        """Close all scraper sessions"""
+        """Close all scraper sessions and stop the worker pool"""
         for scraper in self.scrapers.values():
             scraper.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
+
+    async def aclose(self):
+        """Close all scraper sessions and the shared async client"""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self.close_all()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.aclose()
 
     def __enter__(self):
         """Context manager entry"""
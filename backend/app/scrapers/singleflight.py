@@ -0,0 +1,108 @@
+"""
+Single-flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight call
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for and share its result or exception.
+    Works for threads (do) and asyncio tasks (do_async). Nothing is cached:
+    once the call finishes, the next caller starts a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() once for all threads concurrently asking for key.
+
+        Args:
+            key: Deduplication key
+            fn: Blocking call producing the result
+
+        Returns:
+            The shared result
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await factory() once for all tasks concurrently asking for key.
+
+        The shared call runs in its own task, so a caller that is cancelled
+        (e.g. a client disconnect) does not cancel it for the others.
+
+        Args:
+            key: Deduplication key
+            factory: Returns the awaitable producing the result
+
+        Returns:
+            The shared result
+        """
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(factory())
+                self.executions += 1
+
+                def forget(done: asyncio.Future):
+                    with self._lock:
+                        if self._tasks.get(key) is done:
+                            del self._tasks[key]
+                    if not done.cancelled():
+                        done.exception()  # mark retrieved even if every caller went away
+
+                task.add_done_callback(forget)
+            else:
+                self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def info(self) -> dict:
+        """Return coalescing statistics."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._futures) + len(self._tasks),
+            }
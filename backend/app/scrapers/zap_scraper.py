@@ -5,7 +5,9 @@ Israel's most popular price comparison website
 
 from typing import List, Dict, Optional
 from urllib.parse import quote
+from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .parsers import PageSpec
 
 
 class ZapScraper(BaseScraper):
@@ -13,6 +15,18 @@ class ZapScraper(BaseScraper):
     Scraper for Zap.co.il - Israel's leading price comparison platform
     """
 
+    # Zap uses different class names for product listings
+    # This is a simplified version - actual implementation needs DOM inspection
+    SEARCH_PAGE = PageSpec(
+        containers=[('div', {'class': 'ProdBox'}), ('div', {'class': 'product-item'})],
+        fields={
+            'name': [('a', {'class': 'ModelTitle'}), ('h3', {})],
+            'price': [('span', {'class': 'Price'}), ('div', {'class': 'price'})],
+            'image': [('img', {})],
+            'store_count': [('span', {'class': 'NumOffers'})],
+        },
+    )
+
     def __init__(self):
         super().__init__(
             site_name="Zap",
@@ -20,69 +34,26 @@ class ZapScraper(BaseScraper):
         )
         self.search_url = f"{self.base_url}/search.aspx"
 
-    def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
-        """
-        Search for products on Zap.
-
-        Args:
-            query: Search query
-            max_results: Maximum number of results
-
-        Returns:
-            List of product dictionaries
-        """
-        products = []
-        encoded_query = quote(query)
-        search_url = f"{self.search_url}?keyword={encoded_query}"
-
-        print(f"[Zap] Searching for: {query}")
-        soup = self.get_page(search_url)
-
-        if not soup:
-            print(f"[Zap] Failed to fetch search results")
-            return products
-
-        try:
-            # Zap uses different class names for product listings
-            # This is a simplified version - actual implementation needs DOM inspection
-            product_items = soup.find_all('div', class_='ProdBox', limit=max_results)
-
-            if not product_items:
-                # Try alternative selectors
-                product_items = soup.find_all('div', class_='product-item', limit=max_results)
-
-            for item in product_items:
-                try:
-                    product_data = self._parse_product_item(item)
-                    if product_data:
-                        products.append(self.format_product_data(product_data))
-                except Exception as e:
-                    print(f"[Zap] Error parsing product item: {e}")
-                    continue
-
-            print(f"[Zap] Found {len(products)} products")
-
-        except Exception as e:
-            print(f"[Zap] Error during search: {e}")
-
-        return products
+    def build_search_url(self, query: str) -> str:
+        """Return the Zap search results URL for a query."""
+        return f"{self.search_url}?keyword={quote(query)}"
 
     def _parse_product_item(self, item) -> Optional[Dict]:
         """
         Parse a single product item from search results.
 
         Args:
-            item: BeautifulSoup element
+            item: Product item node
 
         Returns:
             Product data dictionary or None
         """
         try:
             # Product name
-            name_elem = item.find('a', class_='ModelTitle') or item.find('h3')
+            name_elem = item.find('name')
             if not name_elem:
                 return None
-            product_name = name_elem.get_text(strip=True)
+            product_name = name_elem.text
 
             # Product URL
             product_link = name_elem.get('href', '')
@@ -90,21 +61,21 @@ class ZapScraper(BaseScraper):
                 product_link = f"{self.base_url}{product_link}"
 
             # Price - Zap shows price range
-            price_elem = item.find('span', class_='Price') or item.find('div', class_='price')
-            price_text = price_elem.get_text(strip=True) if price_elem else None
+            price_elem = item.find('price')
+            price_text = price_elem.text if price_elem else None
             price = self.extract_price(price_text) if price_text else None
 
             # Image
-            img_elem = item.find('img')
+            img_elem = item.find('image')
             image_url = img_elem.get('src', '') if img_elem else None
             if image_url and not image_url.startswith('http'):
                 image_url = f"{self.base_url}{image_url}"
 
             # Store count (how many stores sell this item)
-            store_count_elem = item.find('span', class_='NumOffers')
+            store_count_elem = item.find('store_count')
             store_count = 0
             if store_count_elem:
-                count_text = store_count_elem.get_text(strip=True)
+                count_text = store_count_elem.text
                 try:
                     store_count = int(''.join(filter(str.isdigit, count_text)))
                 except ValueError:
@@ -134,11 +105,10 @@ class ZapScraper(BaseScraper):
             Detailed product data or None
         """
         print(f"[Zap] Fetching details from: {product_url}")
-        soup = self.get_page(product_url)
-
-        if not soup:
-            return None
+        return self.get_parsed(product_url, 'details', lambda soup: self._parse_product_details(soup, product_url))
 
+    def _parse_product_details(self, soup: BeautifulSoup, product_url: str) -> Optional[Dict]:
+        """Extract product details from a parsed product page."""
         try:
             # Product name
             name_elem = soup.find('h1', class_='ModelTitle') or soup.find('h1')
@@ -180,7 +150,8 @@ class ZapScraper(BaseScraper):
                 'highest_price': highest_price,
                 'average_price': round(average_price, 2) if average_price else None,
                 'store_count': len(prices),
-                'availability': len(prices) > 0
+                'availability': len(prices) > 0,
+                'stores': self._parse_stores(soup)
             }
 
         except Exception as e:
@@ -197,10 +168,14 @@ class ZapScraper(BaseScraper):
         Returns:
             List of store dictionaries with prices
         """
-        soup = self.get_page(product_url)
-        if not soup:
-            return []
+        return self.get_parsed(product_url, 'stores', self._parse_stores) or []
+
+    async def async_get_stores_for_product(self, product_url: str) -> List[Dict]:
+        """Async variant of get_stores_for_product."""
+        return await self.async_get_parsed(product_url, 'stores', self._parse_stores) or []
 
+    def _parse_stores(self, soup: BeautifulSoup) -> List[Dict]:
+        """Extract the per-store offers from a parsed product page."""
         stores = []
         store_rows = soup.find_all('tr', class_='BizRow') or soup.find_all('div', class_='store-item')
 
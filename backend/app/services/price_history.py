@@ -0,0 +1,471 @@
+import io
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.orm import Session as DBSession
+
+from app.core.database import insert_ignoring_duplicates
+from app.data.products_database import UNLINKED_ID_BASE
+from app.models.price_archive import PriceArchive
+from app.models.price_observation import PriceObservation
+from app.models.price_rollup import PriceRollup
+from app.schemas.product import PriceInfo
+
+logger = logging.getLogger(__name__)
+
+# (source, observed_at, price, available), as returned by get_observations()
+ObservationRow = Tuple[str, int, Optional[float], bool]
+
+# Rollup bucket sizes maintained on every insert, in seconds
+ROLLUP_RESOLUTIONS = {'hour': 3600, 'day': 86400}
+
+# Product ids per IN (...) query - stays under SQLite's variable limit
+_ID_BATCH = 500
+
+
+def _batches(values: Sequence, size: int = _ID_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def to_timestamp(value) -> int:
+    """Unix seconds for a datetime (naive = local time) or a number."""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def month_start(timestamp: int) -> datetime:
+    """First instant (UTC) of the month containing a timestamp."""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment: datetime) -> datetime:
+    if moment.month == 12:
+        return moment.replace(year=moment.year + 1, month=1)
+    return moment.replace(month=moment.month + 1)
+
+
+def encode_partition(rows: Sequence[Tuple[int, str, int, Optional[float], bool]]) -> bytes:
+    """
+    Encode observations column-wise into a compressed blob.
+
+    Rows must be sorted by (product_id, source, observed_at). Ids,
+    timestamps and prices (in agorot) are delta-encoded, so long runs of
+    one product at a steady interval compress to almost nothing; sources
+    are dictionary-encoded and availability is bit-packed.
+
+    Args:
+        rows: (product_id, source, observed_at, price, available) tuples
+
+    Returns:
+        np.savez_compressed bytes
+    """
+    product_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    sources = np.array([r[1] for r in rows], dtype=str)
+    observed_at = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    prices = np.fromiter((np.nan if r[3] is None else r[3] for r in rows), dtype=np.float64, count=len(rows))
+    available = np.fromiter((bool(r[4]) for r in rows), dtype=bool, count=len(rows))
+
+    has_price = ~np.isnan(prices)
+    cents = np.where(has_price, np.round(np.nan_to_num(prices) * 100), 0).astype(np.int64)
+    source_names, source_codes = np.unique(sources, return_inverse=True)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        product_id=np.diff(product_ids, prepend=0),
+        source_names=source_names,
+        source=source_codes.astype(np.uint16),
+        observed_at=np.diff(observed_at, prepend=0),
+        price_cents=np.diff(cents, prepend=0),
+        has_price=np.packbits(has_price),
+        available=np.packbits(available),
+    )
+    return buffer.getvalue()
+
+
+def decode_partition(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Decode a blob from encode_partition().
+
+    Returns:
+        Columns product_id, source (str), observed_at, price (NaN when
+        missing) and available, in the stored (sorted) order
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as columns:
+        product_ids = np.cumsum(columns['product_id'])
+        count = len(product_ids)
+        has_price = np.unpackbits(columns['has_price'], count=count).astype(bool)
+        prices = np.cumsum(columns['price_cents']) / 100.0
+        return {
+            'product_id': product_ids,
+            'source': columns['source_names'][columns['source']],
+            'observed_at': np.cumsum(columns['observed_at']),
+            'price': np.where(has_price, prices, np.nan),
+            'available': np.unpackbits(columns['available'], count=count).astype(bool),
+        }
+
+
+def _partition_rows(columns: Dict[str, np.ndarray]) -> List[Tuple[int, str, int, Optional[float], bool]]:
+    prices = columns['price']
+    return [
+        (int(pid), str(source), int(ts), None if np.isnan(price) else float(price), bool(available))
+        for pid, source, ts, price, available in zip(
+            columns['product_id'], columns['source'], columns['observed_at'], prices, columns['available']
+        )
+    ]
+
+
+class PriceHistoryService:
+
+    @staticmethod
+    def record_observations(db: DBSession, observations: Iterable[dict]) -> int:
+        """
+        Append price observations in one bulk insert.
+
+        Each observation has product_id, source, observed_at (datetime or
+        Unix seconds), price, available and optionally url. An observation
+        whose key is already stored is ignored, so re-recording a price is
+        harmless. Only the rows the insert actually stored - not ones a
+        concurrent writer stored first - are folded into the hourly and
+        daily rollups, in the same transaction.
+
+        Returns:
+            Number of new observations stored
+        """
+        rows = {}
+        for o in observations:
+            row = {
+                'product_id': o['product_id'],
+                'source': o['source'],
+                'observed_at': to_timestamp(o['observed_at']),
+                'price': o.get('price'),
+                'available': bool(o.get('available', True)),
+                'url': o.get('url') or None,
+            }
+            rows.setdefault((row['product_id'], row['source'], row['observed_at']), row)
+        if not rows:
+            return 0
+
+        statement = insert_ignoring_duplicates(db, PriceObservation).returning(
+            PriceObservation.product_id, PriceObservation.source, PriceObservation.observed_at
+        )
+        inserted = {tuple(key) for key in db.execute(statement, list(rows.values()))}
+        new = [row for key, row in rows.items() if key in inserted]
+        if new:
+            PriceHistoryService._update_rollups(db, new)
+        db.commit()
+        return len(new)
+
+    @staticmethod
+    def _update_rollups(db: DBSession, rows: List[dict]) -> None:
+        """Fold new observations into their hourly and daily rollup rows."""
+        points: Dict[Tuple[int, int, str, int], List[Tuple[int, float]]] = {}
+        for row in rows:
+            if row['price'] is None:
+                continue
+            timestamp = row['observed_at']
+            for resolution in ROLLUP_RESOLUTIONS.values():
+                key = (row['product_id'], resolution, row['source'], timestamp - timestamp % resolution)
+                points.setdefault(key, []).append((timestamp, row['price']))
+        if not points:
+            return
+
+        first = min(key[3] for key in points)
+        last = max(key[3] for key in points)
+        existing = {}
+        for ids in _batches(sorted({key[0] for key in points})):
+            for rollup in db.execute(
+                select(PriceRollup).where(
+                    PriceRollup.product_id.in_(ids),
+                    PriceRollup.bucket >= first,
+                    PriceRollup.bucket <= last,
+                )
+            ).scalars():
+                existing[(rollup.product_id, rollup.resolution, rollup.source, rollup.bucket)] = rollup
+
+        for key, bucket_points in points.items():
+            rollup = existing.get(key)
+            for timestamp, price in sorted(bucket_points):
+                if rollup is None:
+                    product_id, resolution, source, bucket = key
+                    rollup = PriceRollup(
+                        product_id=product_id, resolution=resolution, source=source, bucket=bucket,
+                        open=price, high=price, low=price, close=price, total=0.0, count=0,
+                        first_at=timestamp, last_at=timestamp,
+                    )
+                    db.add(rollup)
+                rollup.high = max(rollup.high, price)
+                rollup.low = min(rollup.low, price)
+                if timestamp < rollup.first_at:
+                    rollup.open, rollup.first_at = price, timestamp
+                if timestamp >= rollup.last_at:
+                    rollup.close, rollup.last_at = price, timestamp
+                rollup.total += price
+                rollup.count += 1
+
+    @staticmethod
+    def record_prices(db: DBSession, product_id: int, prices: Iterable[PriceInfo]) -> int:
+        """Record a product's PriceInfo list (e.g. from PriceScraper)."""
+        return PriceHistoryService.record_observations(db, (
+            {
+                'product_id': product_id,
+                'source': price.source.value,
+                'observed_at': price.last_updated,
+                'price': price.price,
+                'available': price.availability,
+                'url': price.url,
+            }
+            for price in prices
+        ))
+
+    @staticmethod
+    def record_offers(db: DBSession, products: Iterable[dict], observed_at: Optional[datetime] = None) -> int:
+        """
+        Record scraped offers of aggregated products (see aggregate_results).
+
+        Only products linked to the catalog are recorded - unlinked ones
+        (ids from UNLINKED_ID_BASE up) have no page to show history on. A
+        source listing a product several times is recorded once per
+        observation time, with its lowest available price.
+        """
+        now = observed_at or datetime.now(timezone.utc)
+        best: Dict[Tuple[int, str, int], dict] = {}
+        for product in products:
+            if product.get('id') is None or product['id'] >= UNLINKED_ID_BASE:
+                continue
+            for offer in product.get('prices', []):
+                if offer.get('price') is None:
+                    continue
+                timestamp = to_timestamp(offer.get('last_updated') or now)
+                key = (product['id'], offer['source'], timestamp)
+                current = best.get(key)
+                rank = (not offer.get('availability', True), offer['price'])
+                if current is None or rank < (not current['available'], current['price']):
+                    best[key] = {
+                        'product_id': product['id'],
+                        'source': offer['source'],
+                        'observed_at': timestamp,
+                        'price': offer['price'],
+                        'available': offer.get('availability', True),
+                        'url': offer.get('url'),
+                    }
+        return PriceHistoryService.record_observations(db, best.values())
+
+    @staticmethod
+    def latest_prices(db: DBSession, product_ids: Sequence[int]) -> Dict[int, List[PriceObservation]]:
+        """
+        Latest observation per source for each product.
+
+        The max per (product, source) is a seek on the primary key, joined
+        back on the full key - no scan of a product's history.
+
+        Returns:
+            product_id -> observations, ordered by source
+        """
+        if not product_ids:
+            return {}
+        latest = (
+            select(
+                PriceObservation.product_id,
+                PriceObservation.source,
+                func.max(PriceObservation.observed_at).label('observed_at'),
+            )
+            .where(PriceObservation.product_id.in_(list(product_ids)))
+            .group_by(PriceObservation.product_id, PriceObservation.source)
+            .subquery()
+        )
+        rows = db.execute(
+            select(PriceObservation)
+            .join(latest, and_(
+                PriceObservation.product_id == latest.c.product_id,
+                PriceObservation.source == latest.c.source,
+                PriceObservation.observed_at == latest.c.observed_at,
+            ))
+            .order_by(PriceObservation.product_id, PriceObservation.source)
+        ).scalars()
+        result: Dict[int, List[PriceObservation]] = {}
+        for row in rows:
+            result.setdefault(row.product_id, []).append(row)
+        return result
+
+    @staticmethod
+    def get_observations(db: DBSession, product_id: int, start: int, end: int) -> List[ObservationRow]:
+        """
+        A product's observations with start <= observed_at < end, from the
+        live table and any archived partitions the range overlaps.
+
+        Returns:
+            (source, observed_at, price, available) tuples ordered by source, then time
+        """
+        rows: List[ObservationRow] = []
+        archives = db.execute(
+            select(PriceArchive.data)
+            .where(PriceArchive.first_observed < end, PriceArchive.last_observed >= start)
+        ).scalars()
+        for data in archives:
+            columns = decode_partition(data)
+            ids = columns['product_id']
+            lo, hi = np.searchsorted(ids, product_id, side='left'), np.searchsorted(ids, product_id, side='right')
+            for source, ts, price, available in zip(
+                columns['source'][lo:hi], columns['observed_at'][lo:hi], columns['price'][lo:hi], columns['available'][lo:hi]
+            ):
+                if start <= ts < end:
+                    rows.append((str(source), int(ts), None if np.isnan(price) else float(price), bool(available)))
+
+        live = db.execute(
+            select(PriceObservation.source, PriceObservation.observed_at, PriceObservation.price, PriceObservation.available)
+            .where(
+                PriceObservation.product_id == product_id,
+                PriceObservation.observed_at >= start,
+                PriceObservation.observed_at < end,
+            )
+        )
+        rows.extend((source, ts, price, bool(available)) for source, ts, price, available in live)
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return rows
+
+    @staticmethod
+    def archive_partitions(db: DBSession, before: datetime) -> List[str]:
+        """
+        Move whole months older than `before` into compressed column archives.
+
+        Each month ("YYYY-MM") is read through the time covering index,
+        encoded with encode_partition() - merged with an existing archive of
+        that month, if late observations arrived - and deleted from
+        price_observations in the same transaction.
+
+        Args:
+            before: Only months that end on or before this month's start are archived
+
+        Returns:
+            Archived partition names
+        """
+        cutoff = month_start(to_timestamp(before))
+        oldest = db.execute(select(func.min(PriceObservation.observed_at))).scalar()
+        archived = []
+        if oldest is None:
+            return archived
+
+        start = month_start(oldest)
+        while start < cutoff:
+            end = next_month(start)
+            lo, hi = int(start.timestamp()), int(end.timestamp())
+            window = and_(PriceObservation.observed_at >= lo, PriceObservation.observed_at < hi)
+            rows = [tuple(row) for row in db.execute(
+                select(
+                    PriceObservation.product_id, PriceObservation.source, PriceObservation.observed_at,
+                    PriceObservation.price, PriceObservation.available,
+                ).where(window)
+            )]
+            if rows:
+                name = start.strftime('%Y-%m')
+                archive = db.get(PriceArchive, name)
+                if archive is not None:
+                    rows.extend(_partition_rows(decode_partition(archive.data)))
+                    rows = list({row[:3]: row for row in rows}.values())
+                rows.sort(key=lambda row: row[:3])
+                if archive is None:
+                    archive = PriceArchive(partition=name)
+                    db.add(archive)
+                archive.data = encode_partition(rows)
+                archive.row_count = len(rows)
+                archive.first_observed = min(row[2] for row in rows)
+                archive.last_observed = max(row[2] for row in rows)
+                db.execute(delete(PriceObservation).where(window))
+                db.commit()
+                archived.append(name)
+                logger.info("Archived %d price observations into partition %s", len(rows), name)
+            start = end
+        return archived
+
+    @staticmethod
+    def get_history(
+        db: DBSession,
+        product_id: int,
+        start: int,
+        end: int,
+        resolution: str,
+    ) -> Dict[str, List[Tuple[int, float, float, float, float, float, int]]]:
+        """
+        A product's price history per source at a given resolution.
+
+        'hour' and 'day' read the rollup tables - one row per bucket -
+        and 'raw' reads the observations themselves (live and archived).
+
+        Args:
+            product_id: Catalog product id
+            start: Range start, Unix seconds (inclusive)
+            end: Range end, Unix seconds (exclusive)
+            resolution: 'raw', 'hour' or 'day'
+
+        Returns:
+            source -> [(timestamp, open, high, low, close, average, count)] in time order
+        """
+        series: Dict[str, List[Tuple[int, float, float, float, float, float, int]]] = {}
+        if resolution == 'raw':
+            for source, timestamp, price, _ in PriceHistoryService.get_observations(db, product_id, start, end):
+                if price is not None:
+                    series.setdefault(source, []).append((timestamp, price, price, price, price, price, 1))
+            return series
+
+        size = ROLLUP_RESOLUTIONS[resolution]
+        rollups = db.execute(
+            select(PriceRollup)
+            .where(
+                PriceRollup.product_id == product_id,
+                PriceRollup.resolution == size,
+                PriceRollup.bucket >= start - start % size,
+                PriceRollup.bucket < end,
+            )
+            .order_by(PriceRollup.source, PriceRollup.bucket)
+        ).scalars()
+        for r in rollups:
+            series.setdefault(r.source, []).append(
+                (r.bucket, r.open, r.high, r.low, r.close, round(r.total / r.count, 2), r.count)
+            )
+        return series
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket - the shape of
+    the line survives far better than with plain averaging.
+
+    Args:
+        x: Point times, ascending
+        y: Point values
+        threshold: Number of points to keep
+
+    Returns:
+        Indices of the kept points, ascending
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous]) - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
@@ -1,28 +1,146 @@
 import random
-from typing import List
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence
 from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.hashing import mix64
 from app.schemas.product import PriceInfo, SourceEnum
 
 
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def _seeded_uniform(product_ids: np.ndarray, source_indexes: np.ndarray, bucket: int, stream: int) -> np.ndarray:
+    """
+    Deterministic uniform draws in [0, 1) for (product, source, time bucket, stream).
+
+    product_ids and source_indexes broadcast against each other, so an
+    (N, 1) id column and a (3,) source row yield an N x 3 matrix.
+    """
+    keys = mix64(product_ids.astype(np.uint64))
+    salt = ((np.uint64(bucket) & _MASK32) << np.uint64(8)) | (source_indexes.astype(np.uint64) << np.uint64(4)) | np.uint64(stream)
+    keys = mix64(keys ^ salt)
+    return (keys >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class PriceBatch:
+    """
+    Prices for N products x len(SOURCES) sources, held as NumPy arrays.
+
+    Statistics are computed for all rows at once; PriceInfo objects are
+    only built (and cached on the scraper) when prices_for() is called.
+    """
+
+    def __init__(self, scraper: "PriceScraper", products: Sequence[dict], bucket: int,
+                 prices: np.ndarray, availability: np.ndarray):
+        self._scraper = scraper
+        self.products = products
+        self.bucket = bucket
+        self.prices = prices
+        self.availability = availability
+        self.last_updated = datetime.fromtimestamp(bucket * scraper.bucket_seconds, tz=timezone.utc)
+
+        counts = availability.sum(axis=1)
+        self._has_price = counts > 0
+        self.lowest = np.round(np.where(availability, prices, np.inf).min(axis=1), 2)
+        self.highest = np.round(np.where(availability, prices, -np.inf).max(axis=1), 2)
+        self.average = np.round(np.where(availability, prices, 0.0).sum(axis=1) / np.maximum(counts, 1), 2)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def statistics_for(self, row: int) -> dict:
+        """Return lowest/highest/average price for a row (None when nothing is available)."""
+        if not self._has_price[row]:
+            return {"lowest_price": None, "highest_price": None, "average_price": None}
+        return {
+            "lowest_price": float(self.lowest[row]),
+            "highest_price": float(self.highest[row]),
+            "average_price": float(self.average[row]),
+        }
+
+    def prices_for(self, row: int) -> List[PriceInfo]:
+        """Return the PriceInfo list for a row, building and caching it on first use."""
+        return self._scraper._materialize(self, row)
+
+    def price_dicts_for(self, row: int) -> List[dict]:
+        """
+        Return a row's prices as plain dicts shaped like serialized PriceInfo.
+
+        Trusted fast path for response serialization - no model is built
+        and no validator runs.
+        """
+        product = self.products[row]
+        price_row = self.prices[row].tolist()
+        available_row = self.availability[row].tolist()
+        generate_url = self._scraper.product_url
+        return [
+            {
+                "source": source.value,
+                "price": price_row[i],
+                "currency": "₪",
+                "availability": available_row[i],
+                "url": generate_url(source, product["name"]),
+                "last_updated": self.last_updated,
+            }
+            for i, source in enumerate(self._scraper.SOURCES)
+        ]
+
+
 class PriceScraper:
     """
     Simulates price scraping from multiple Israeli sources.
     In production, this would make actual HTTP requests to KSP, Bug, and Zap.
+
+    When a product id is given, prices are deterministic: they are derived
+    from (product id, source, time bucket), so the same product returns the
+    same prices for PRICE_BUCKET_SECONDS, and each bucket's price vector is
+    computed once and kept in a bounded LRU cache. Batches are cached the
+    same way, so a repeated search reuses its priced batch.
     """
 
     SOURCES = [SourceEnum.KSP, SourceEnum.BUG, SourceEnum.ZAP]
 
-    def scrape_prices(self, product_name: str, base_price: float = None) -> List[PriceInfo]:
+    def __init__(
+        self,
+        bucket_seconds: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        batch_cache_size: Optional[int] = None,
+    ):
+        self.bucket_seconds = bucket_seconds or settings.PRICE_BUCKET_SECONDS
+        self.cache_size = cache_size or settings.PRICE_CACHE_SIZE
+        self.batch_cache_size = batch_cache_size or settings.PRICE_BATCH_CACHE_SIZE
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._batch_cache: "OrderedDict[tuple, PriceBatch]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def scrape_prices(
+        self,
+        product_name: str,
+        base_price: float = None,
+        product_id: Optional[int] = None,
+    ) -> List[PriceInfo]:
         """
         Simulate scraping prices from multiple Israeli sources.
 
         Args:
             product_name: Name of the product to search for
             base_price: Optional base price to generate variations from
+            product_id: Optional catalog id - enables deterministic, cached prices
 
         Returns:
             List of PriceInfo objects from different sources
         """
+        if product_id is not None:
+            return self._deterministic_prices(product_id, product_name, base_price)
+
         if base_price is None:
             base_price = random.uniform(50.0, 2000.0)
 
@@ -41,14 +159,131 @@ class PriceScraper:
                 price=round(price, 2),
                 currency="₪",
                 availability=availability,
-                url=self._generate_url(source, product_name),
+                url=self.product_url(source, product_name),
                 last_updated=datetime.now(timezone.utc)
             )
             prices.append(price_info)
 
         return prices
 
-    def _generate_url(self, source: SourceEnum, product_name: str) -> str:
+    def current_bucket(self) -> int:
+        """Return the index of the current pricing time bucket."""
+        return int(time.time() // self.bucket_seconds)
+
+    def _deterministic_prices(self, product_id: int, product_name: str, base_price: Optional[float]) -> List[PriceInfo]:
+        """Return the cached price vector for the product in the current bucket."""
+        bucket = self.current_bucket()
+        key = (product_id, base_price, bucket)
+        cached = self._cache_get(self._cache, key)
+        if cached is None:
+            product = {"id": product_id, "name": product_name, "base_price": base_price}
+            cached = self._price_infos(self._compute_batch([product], bucket), 0)
+            self._cache_put(self._cache, key, cached, self.cache_size)
+        return list(cached)
+
+    def scrape_prices_batch(self, products: Sequence[dict]) -> PriceBatch:
+        """
+        Compute deterministic prices for many catalog products at once.
+
+        Variation and availability for N products x 3 sources are drawn in
+        a single vectorized pass, and price statistics are computed for all
+        rows together. Use PriceBatch.prices_for(i) / statistics_for(i) to
+        read a row; prices match scrape_prices(..., product_id=...).
+
+        Args:
+            products: Product dicts with 'id', 'name' and optional 'base_price'
+
+        Returns:
+            PriceBatch for the current time bucket
+        """
+        bucket = self.current_bucket()
+        key = (tuple(p["id"] for p in products), tuple(p.get("base_price") for p in products), bucket)
+        batch = self._cache_get(self._batch_cache, key)
+        if batch is None:
+            batch = self._compute_batch(tuple(products), bucket)
+            self._cache_put(self._batch_cache, key, batch, self.batch_cache_size)
+        return batch
+
+    def _compute_batch(self, products: Sequence[dict], bucket: int) -> PriceBatch:
+        """Vectorized price generation for one time bucket."""
+        count = len(products)
+        source_count = len(self.SOURCES)
+        ids = np.fromiter((p["id"] for p in products), dtype=np.int64, count=count).reshape(count, 1)
+        base = np.fromiter(
+            (np.nan if p.get("base_price") is None else p["base_price"] for p in products),
+            dtype=np.float64, count=count,
+        )
+        missing = np.isnan(base)
+        if missing.any():
+            generated = 50.0 + _seeded_uniform(ids[:, 0], np.zeros(1, dtype=np.int64), 0, 0) * 1950.0
+            base = np.where(missing, generated, base)
+
+        sources = np.arange(source_count, dtype=np.int64)
+        # Simulate price variation between sources (±20%) and 90% availability
+        variation = -0.20 + _seeded_uniform(ids, sources, bucket, 1) * 0.40
+        availability = _seeded_uniform(ids, sources, bucket, 2) > 0.1
+        prices = np.round(base[:, None] * (1 + variation), 2)
+        return PriceBatch(self, products, bucket, prices, availability)
+
+    def _cache_get(self, cache: OrderedDict, key: tuple):
+        """Look up a price cache entry, counting hits and misses."""
+        with self._cache_lock:
+            cached = cache.get(key)
+            if cached is None:
+                self.cache_misses += 1
+                return None
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+    def _cache_put(self, cache: OrderedDict, key: tuple, value, max_size: int) -> None:
+        """Store a price cache entry, evicting the least recently used beyond max_size."""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+
+    def _materialize(self, batch: PriceBatch, row: int) -> List[PriceInfo]:
+        """Build PriceInfo objects for one batch row, reusing the bucket cache."""
+        product = batch.products[row]
+        key = (product["id"], product.get("base_price"), batch.bucket)
+        cached = self._cache_get(self._cache, key)
+        if cached is None:
+            cached = self._price_infos(batch, row)
+            self._cache_put(self._cache, key, cached, self.cache_size)
+        return list(cached)
+
+    def _price_infos(self, batch: PriceBatch, row: int) -> tuple:
+        """Build the PriceInfo tuple for one batch row."""
+        product = batch.products[row]
+        last_updated = batch.last_updated
+        price_row = batch.prices[row].tolist()
+        available_row = batch.availability[row].tolist()
+        return tuple(
+            PriceInfo(
+                source=source,
+                price=price_row[i],
+                currency="₪",
+                availability=available_row[i],
+                url=self.product_url(source, product["name"]),
+                last_updated=last_updated
+            )
+            for i, source in enumerate(self.SOURCES)
+        )
+
+    def cache_info(self) -> dict:
+        """Return price cache statistics."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+            "batches": len(self._batch_cache),
+            "max_batches": self.batch_cache_size,
+        }
+
+    def product_url(self, source: SourceEnum, product_name: str) -> str:
         """Generate a mock URL for the product on the given Israeli source"""
         product_slug = product_name.lower().replace(" ", "-")
 
@@ -0,0 +1,75 @@
+"""
+Result aggregation benchmark.
+Aggregates synthetic scraper results of increasing size and reports total
+time and cost per offer, which should stay flat as offers per product grow.
+
+Usage:
+    python benchmarks/bench_aggregate.py
+    python benchmarks/bench_aggregate.py --sizes 20000 80000 --offers-per-product 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scrapers.cache import ScrapeCache
+from app.scrapers.scraper_manager import ScraperManager
+
+
+SITES = ['Zap', 'KSP', 'Bug', 'Ivory', 'TMS', 'Payngo']
+MODELS = ['Samsung Galaxy S24', 'iPhone 15 Pro', 'Sony WH-1000XM5', 'AirPods Pro 2', 'MacBook Air M3', 'Pixel 8']
+
+
+def synthetic_results(offers: int, offers_per_product: int, seed: int = 42) -> dict:
+    """Scraper results with `offers` listings spread over offers/offers_per_product products."""
+    rng = random.Random(seed)
+    products = max(1, offers // offers_per_product)
+    now = datetime.now()
+    results = {site: [] for site in SITES}
+    for i in range(offers):
+        site = SITES[i % len(SITES)]
+        model = i % products
+        results[site].append({
+            'source': site,
+            'name': f"{MODELS[model % len(MODELS)]} {model}",
+            'price': round(rng.uniform(100, 5000), 2),
+            'currency': 'ILS',
+            'url': f"https://{site.lower()}.example/p/{i}",
+            'availability': rng.random() > 0.1,
+            'last_updated': now,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 20_000, 40_000, 80_000])
+    parser.add_argument('--offers-per-product', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    manager = ScraperManager(enabled_scrapers=[], cache=ScrapeCache())
+    print(f"{'offers':>8} {'products':>9} {'p50 ms':>9} {'min ms':>9} {'us/offer':>9}")
+    for size in args.sizes:
+        results = synthetic_results(size, args.offers_per_product)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                aggregated = manager.aggregate_results(results)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        print(f"{size:>8} {len(aggregated):>9} {median:>9.1f} {min(timings):>9.1f} {median * 1000 / size:>9.2f}")
+    manager.close_all()
+
+
+if __name__ == '__main__':
+    main()
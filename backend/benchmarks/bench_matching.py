@@ -0,0 +1,103 @@
+"""
+Offer matching benchmark.
+Generates a synthetic corpus of listings - each product (10% without a
+model number) listed several times with the naming noise seen across sites (Hebrew/English brand names,
+colors, boilerplate, word order, missing brand) - clusters it with
+OfferMatcher and reports time and pairwise precision/recall against the
+ground truth.
+
+Usage:
+    python benchmarks/bench_matching.py
+    python benchmarks/bench_matching.py --listings 100000 200000 --per-product 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scrapers.matching import OfferMatcher, extract_features
+
+
+BRANDS = {
+    'Samsung': ('Samsung', 'סמסונג'), 'Apple': ('Apple', 'אפל'), 'Xiaomi': ('Xiaomi', 'שיאומי'),
+    'Sony': ('Sony', 'סוני'), 'Lenovo': ('Lenovo', 'לנובו'), 'Asus': ('Asus', 'אסוס'),
+    'JBL': ('JBL',), 'Logitech': ('Logitech', 'לוגיטק'), 'LG': ('LG',), 'Philips': ('Philips', 'פיליפס'),
+}
+LINES = ['Phone', 'Tab', 'Book', 'Watch', 'Buds', 'Vision', 'Sound', 'Mouse', 'Monitor', 'Max', 'Note']
+CATEGORY_WORDS = ['סמארטפון', 'אוזניות', 'מחשב נייד', 'טאבלט', 'שעון חכם', 'מסך', 'Smartphone', 'Laptop']
+VARIANTS = ['', '', '', 'Pro', 'Ultra', 'Plus', 'Lite', 'Mini']
+STORAGE = ['', '64GB', '128GB', '256GB', '512GB', '1TB']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ven', 'tor', 'ex', 'zen', 'quo', 'lum', 'dri', 'vox', 'nel', 'ar', 'sil']
+NOISE = ['שחור', 'לבן', 'כחול', 'Black', 'Silver', 'יבואן רשמי', 'אחריות שנה', 'חדש', 'מקורי']
+
+
+def synthetic_listings(count: int, per_product: int, seed: int = 42) -> tuple[list[str], list[int]]:
+    """Return (listing names, true product id per listing)."""
+    rng = random.Random(seed)
+    names, truth = [], []
+    product_id = 0
+    while len(names) < count:
+        brand = rng.choice(list(BRANDS))
+        line = rng.choice(LINES)
+        if rng.random() < 0.1:
+            # Some products have no model number - only a product name
+            model = ' '.join(''.join(rng.choices(SYLLABLES, k=3)).capitalize() for _ in range(2))
+        else:
+            model = f"{rng.choice('ABCDEFGHKMNPRSTXZ')}{rng.randint(1, 9999)}"
+        variant = rng.choice(VARIANTS)
+        storage = rng.choice(STORAGE)
+        category = rng.choice(CATEGORY_WORDS)
+        for _ in range(min(per_product, count - len(names))):
+            words = [line, model, variant, storage]
+            if rng.random() < 0.8:
+                words.insert(0, rng.choice(BRANDS[brand]))
+            if rng.random() < 0.4:
+                words.append(category)
+            if rng.random() < 0.5:
+                words.append(rng.choice(NOISE))
+            if rng.random() < 0.2:
+                rng.shuffle(words)
+            names.append(' '.join(w for w in words if w))
+            truth.append(product_id)
+        product_id += 1
+    return names, truth
+
+
+def pairs(counts) -> int:
+    return sum(n * (n - 1) // 2 for n in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--per-product', type=int, default=5)
+    args = parser.parse_args()
+
+    matcher = OfferMatcher()
+    print(f"{'listings':>9} {'features s':>11} {'cluster s':>10} {'clusters':>9} {'products':>9} "
+          f"{'precision':>10} {'recall':>7}")
+    for count in args.listings:
+        names, truth = synthetic_listings(count, args.per_product)
+
+        start = time.perf_counter()
+        features = [extract_features(name) for name in names]
+        extract_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        labels = matcher.cluster_features(features)
+        cluster_time = time.perf_counter() - start
+
+        true_pairs = pairs(Counter(truth).values())
+        found_pairs = pairs(Counter(labels).values())
+        correct_pairs = pairs(Counter(zip(labels, truth)).values())
+        print(f"{count:>9} {extract_time:>11.2f} {cluster_time:>10.2f} {len(set(labels)):>9} {len(set(truth)):>9} "
+              f"{correct_pairs / max(found_pairs, 1):>10.3f} {correct_pairs / max(true_pairs, 1):>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
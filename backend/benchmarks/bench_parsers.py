@@ -0,0 +1,83 @@
+"""
+Search page parser benchmark.
+Parses the recorded search pages in the replay corpus with each parser backend and
+reports per-page parse latency and peak Python memory (tracemalloc).
+
+Usage:
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --repeat 200 --backends soup lxml
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scrapers.zap_scraper import ZapScraper
+from app.scrapers.ksp_scraper import KSPScraper
+from app.scrapers.bug_scraper import BugScraper
+from app.scrapers.parsers import PARSER_BACKENDS
+from app.scrapers.replay import ReplayCorpus
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'corpus')
+
+SITES = {
+    'zap': ZapScraper,
+    'ksp': KSPScraper,
+    'bug': BugScraper,
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def parse(scraper, content: bytes) -> list:
+    # Scrapers log every parse - keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scraper._parse_search_page(content, 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--backends', nargs='+', default=list(PARSER_BACKENDS), choices=PARSER_BACKENDS)
+    args = parser.parse_args()
+
+    corpus = ReplayCorpus(CORPUS_DIR)
+    print(f"{'site':>5} {'page':>18} {'backend':>9} {'KB':>6} {'items':>6} {'p50 ms':>8} {'p99 ms':>8} {'peak KB':>9}")
+    for site, scraper_cls in SITES.items():
+        scraper = scraper_cls()
+        for url in corpus.urls(site, 'search'):
+            content = corpus.body(url)
+            page = os.path.basename(corpus.entries[url]['file']).split('.')[0]
+
+            for backend in args.backends:
+                scraper.parser_backend = backend
+                items = len(parse(scraper, content))  # warm-up
+
+                latencies = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    parse(scraper, content)
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                tracemalloc.start()
+                parse(scraper, content)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                print(f"{site:>5} {page:>18} {backend:>9} {len(content) / 1024:>6.1f} {items:>6} "
+                      f"{statistics.median(latencies):>8.3f} {percentile(latencies, 99):>8.3f} {peak / 1024:>9.1f}")
+        scraper.close()
+
+if __name__ == '__main__':
+    main()
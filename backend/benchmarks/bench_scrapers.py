@@ -0,0 +1,128 @@
+"""
+Offline scraper benchmark.
+Runs each scraper's fetch + parse path against the recorded replay corpus
+(no network, no rate limiting, no HTTP cache) and reports pages/sec,
+items/sec, p50/p99 per-page latency and peak RSS. Each site runs in its
+own process so the RSS figure belongs to that scraper alone.
+
+Usage:
+    python benchmarks/bench_scrapers.py
+    python benchmarks/bench_scrapers.py --repeat 50 --sites zap bug
+    python benchmarks/bench_scrapers.py --site ksp --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scrapers.zap_scraper import ZapScraper
+from app.scrapers.ksp_scraper import KSPScraper
+from app.scrapers.bug_scraper import BugScraper
+from app.scrapers.http_cache import HTTPCache
+from app.scrapers.rate_limiter import RateLimiter
+from app.scrapers.replay import ReplayCorpus, install_replay
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'corpus')
+
+SITES = {
+    'zap': ZapScraper,
+    'ksp': KSPScraper,
+    'bug': BugScraper,
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def scrape(scraper, url: str, kind: str) -> int:
+    """Fetch and parse one recorded page; returns the number of items extracted."""
+    # Scrapers log every request - keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        if kind == 'search':
+            return len(scraper._parse_search_page(scraper.fetch(url), 100))
+        return 1 if scraper.get_product_details(url) else 0
+
+
+def bench_site(site: str, repeat: int) -> dict:
+    corpus = ReplayCorpus(CORPUS_DIR)
+    scraper = SITES[site]()
+    scraper.rate_limiter = RateLimiter(rate=1e9, burst=1000)
+    # A private cache with no room for bodies - the shared cache would serve
+    # pages recorded with ETag / max-age headers and skip the parse on repeats
+    scraper.http_cache = HTTPCache(max_bytes=0)
+    install_replay(scraper, corpus)
+
+    result = {'site': site}
+    for kind in ('search', 'detail'):
+        urls = corpus.urls(site, kind)
+        for url in urls:
+            scrape(scraper, url, kind)  # warm-up (also decompresses the corpus)
+
+        latencies = []
+        items = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for url in urls:
+                page_start = time.perf_counter()
+                items += scrape(scraper, url, kind)
+                latencies.append((time.perf_counter() - page_start) * 1000)
+        elapsed = time.perf_counter() - start
+
+        result[kind] = {
+            'pages': len(latencies),
+            'pages_per_sec': round(len(latencies) / elapsed, 1),
+            'items_per_sec': round(items / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+        }
+    scraper.close()
+
+    # ru_maxrss is reported in kilobytes on Linux
+    result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--sites', nargs='+', default=list(SITES), choices=list(SITES))
+    parser.add_argument('--site', choices=list(SITES), help='Benchmark one site in this process')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if args.site:
+        results = [bench_site(args.site, args.repeat)]
+    else:
+        results = []
+        for site in args.sites:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--site', site, '--repeat', str(args.repeat), '--json'],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.extend(json.loads(output))
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{'site':>5} {'kind':>7} {'pages':>6} {'pages/s':>9} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>7}")
+    for result in results:
+        for kind in ('search', 'detail'):
+            r = result[kind]
+            print(f"{result['site']:>5} {kind:>7} {r['pages']:>6} {r['pages_per_sec']:>9.1f} {r['items_per_sec']:>9.1f} "
+                  f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {result['peak_rss_mb']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Catalog search benchmark.
+Builds synthetic catalogs of increasing size from the real product
+templates and reports index build time and per-query latency for exact
+(every match, and the first 50 as the search endpoint asks for), ranked
+(BM25 top-50) and fuzzy (trigram) search, plus the average number of
+exact matches - exact search returns every match, so its latency grows
+with the result set, not only the catalog.
+
+Usage:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.data import products_database
+from app.data.products_database import (
+    search_products, search_products_ranked, fuzzy_search_products, load_catalog, ensure_indexes,
+)
+
+
+EXACT_QUERIES = ['Samsung Galaxy', 'iPhone 15', 'אוזניות', 'MacBook Pro', 'LEGO', 'Nike Air']
+FUZZY_QUERIES = ['galxy s24', 'airpod pro', 'samsnug', 'macbok air', 'playstaton 5', 'logitek']
+
+
+def synthetic_catalog(size: int, seed: int = 42) -> list[dict]:
+    """Grow the real catalog to `size` items by adding model/variant suffixes."""
+    rng = random.Random(seed)
+    base = list(products_database.PRODUCTS_DATABASE)
+    products = []
+    for i in range(size):
+        template = base[i % len(base)]
+        variant = f"{rng.choice('ABCDEFGHKMNPRSTXZ')}{rng.randint(10, 99999)}"
+        products.append({
+            **template,
+            'id': i + 1,
+            'name': f"{template['name']} {variant}",
+        })
+    return products
+
+
+def time_queries(fn, queries: list[str], repeat: int) -> list[float]:
+    """Run each query `repeat` times and return latencies in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            fn(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    original = list(products_database.PRODUCTS_DATABASE)
+    print(f"{'size':>10} {'build s':>9} {'exact p50':>10} {'exact p99':>10} {'first50 p50':>11} "
+          f"{'ranked p50':>11} {'ranked p99':>11} {'fuzzy p50':>10} {'fuzzy p99':>10} {'hits':>8}  (ms)")
+    try:
+        for size in args.sizes:
+            catalog = synthetic_catalog(size)
+            start = time.perf_counter()
+            load_catalog(catalog)
+            ensure_indexes()
+            build_time = time.perf_counter() - start
+
+            exact = time_queries(search_products, EXACT_QUERIES, args.repeat)
+            first = time_queries(lambda q: search_products(q, limit=50), EXACT_QUERIES, args.repeat)
+            ranked = time_queries(search_products_ranked, EXACT_QUERIES, args.repeat)
+            fuzzy = time_queries(lambda q: fuzzy_search_products(q, limit=50), FUZZY_QUERIES, args.repeat)
+            hits = statistics.mean(len(search_products(query)) for query in EXACT_QUERIES)
+            print(f"{size:>10} {build_time:>9.2f} "
+                  f"{statistics.median(exact):>10.3f} {percentile(exact, 99):>10.3f} {statistics.median(first):>11.3f} "
+                  f"{statistics.median(ranked):>11.3f} {percentile(ranked, 99):>11.3f} "
+                  f"{statistics.median(fuzzy):>10.3f} {percentile(fuzzy, 99):>10.3f} {hits:>8.0f}")
+            # Free this size's catalog and indexes before generating the next one
+            del catalog
+            load_catalog(original)
+    finally:
+        load_catalog(original)
+
+
+if __name__ == '__main__':
+    main()
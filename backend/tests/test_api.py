@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timezone
 from fastapi.testclient import TestClient
 import sys
 import os
@@ -6,6 +7,30 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.main import app
+from app.api.responses import FastJSONResponse, product_payload
+from app.schemas.product import ProductWithPrices, SearchResponse
+from app.services.scraper import PriceScraper
+from app.services.price_history import PriceHistoryService
+from app.core.database import Base, get_db
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def memory_sessions():
+    """Point get_db at a fresh in-memory database and return its session factory."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    sessions = sessionmaker(bind=engine)
+
+    def override_get_db():
+        with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield sessions
+    app.dependency_overrides.pop(get_db, None)
 
 
 class TestHealthEndpoints:
@@ -83,6 +108,41 @@ class TestProductSearchEndpoint:
         assert "name" in product
         assert "prices" in product
 
+    def test_search_catalog_order(self, client):
+        """Test searching with catalog ordering."""
+        response = client.get("/api/products/search?query=Samsung&sort=catalog")
+        assert response.status_code == 200
+        ids = [p["id"] for p in response.json()["products"]]
+        assert ids == sorted(ids)
+
+    def test_relevance_sort_matches_inside_words(self, client):
+        """Test that the default relevance sort returns the same matches as catalog order."""
+        for query, expected in [("pad", 12), ("phone", 6), ("book", 10)]:
+            ranked = client.get(f"/api/products/search?query={query}").json()["products"]
+            catalog = client.get(f"/api/products/search?query={query}&sort=catalog").json()["products"]
+            assert len(ranked) == expected, query
+            assert sorted(p["id"] for p in ranked) == [p["id"] for p in catalog]
+            assert all(query in (p["name"] + p["description"]).lower() for p in ranked), query
+
+    def test_search_invalid_sort(self, client):
+        """Test that unknown sort modes are rejected."""
+        response = client.get("/api/products/search?query=Samsung&sort=price")
+        assert response.status_code == 422
+
+    def test_search_misspelled_query(self, client):
+        """Test that misspelled queries fall back to fuzzy matching."""
+        response = client.get("/api/products/search?query=galxy s24")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_results"] > 0
+        assert "Galaxy S24" in data["products"][0]["name"]
+
+    def test_search_misspelled_query_without_fuzzy(self, client):
+        """Test that fuzzy fallback can be disabled."""
+        response = client.get("/api/products/search?query=galxy s24&fuzzy=false")
+        assert response.status_code == 200
+        assert response.json()["total_results"] == 0
+
     def test_search_hebrew_query(self, client):
         """Test searching with Hebrew query."""
         response = client.get("/api/products/search?query=אלקטרוניקה")
@@ -91,6 +151,72 @@ class TestProductSearchEndpoint:
         assert data["total_results"] > 0
 
 
+class TestFastPathSerialization:
+    """Tests that fast-path responses keep the pydantic JSON contract."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_search_matches_response_model(self, client):
+        """Test search output round-trips through SearchResponse unchanged."""
+        data = client.get("/api/products/search?query=Samsung").json()
+        assert SearchResponse.model_validate(data).model_dump(mode="json") == data
+
+    def test_list_matches_response_model(self, client):
+        """Test list output round-trips through ProductWithPrices unchanged."""
+        data = client.get("/api/products?limit=20").json()
+        assert len(data) == 20
+        for product in data:
+            assert ProductWithPrices.model_validate(product).model_dump(mode="json") == product
+
+    def test_category_matches_response_model(self, client):
+        """Test category output round-trips through SearchResponse unchanged."""
+        data = client.get("/api/categories/אופנה/products?limit=10").json()
+        assert data["total_results"] == 10
+        assert SearchResponse.model_validate(data).model_dump(mode="json") == data
+
+    def test_payload_bytes_match_pydantic(self, sample_product):
+        """Test that product_payload encodes to the same JSON as the model."""
+        batch = PriceScraper().scrape_prices_batch([sample_product])
+        now = datetime.now(timezone.utc)
+        payload = product_payload(sample_product, batch.price_dicts_for(0), batch.statistics_for(0), now)
+        model = ProductWithPrices(
+            id=sample_product["id"],
+            name=sample_product["name"],
+            description=sample_product["description"],
+            category=sample_product["category"],
+            image_url=sample_product["image_url"],
+            created_at=now,
+            updated_at=now,
+            prices=batch.prices_for(0),
+            **batch.statistics_for(0)
+        )
+        assert FastJSONResponse(payload).body == model.model_dump_json().encode()
+
+
+class TestSuggestEndpoint:
+    """Tests for the autocomplete endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_suggest(self, client):
+        """Test autocomplete returns matching product names."""
+        response = client.get("/api/products/suggest?q=iphone 15&limit=3")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["query"] == "iphone 15"
+        assert len(data["suggestions"]) == 3
+        assert all(s["name"].startswith("iPhone 15") for s in data["suggestions"])
+
+    def test_suggest_requires_query(self, client):
+        """Test that an empty prefix is rejected."""
+        response = client.get("/api/products/suggest?q=")
+        assert response.status_code == 422
+
+
 class TestCategoriesEndpoint:
     """Tests for categories endpoint."""
 
@@ -128,9 +254,68 @@ class TestProductsEndpoint:
     """Tests for products listing endpoint."""
 
     @pytest.fixture
-    def client(self):
+    def client(self, memory_sessions):
         return TestClient(app)
 
+    def test_get_product_by_id(self, client):
+        """Test fetching a single product with prices."""
+        response = client.get("/api/products/201")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == 201
+        assert len(data["prices"]) == 3
+
+    def test_get_product_prices_stable(self, client):
+        """Test that repeated detail requests return the same prices."""
+        first = client.get("/api/products/201").json()
+        second = client.get("/api/products/201").json()
+        assert first["prices"] == second["prices"]
+
+    def test_detail_prices_are_stored(self, client, memory_sessions):
+        """Test that detail prices are recorded and read back from the price history store."""
+        data = client.get("/api/products/202").json()
+        with memory_sessions() as db:
+            stored = PriceHistoryService.latest_prices(db, [202])[202]
+        assert sorted((o.source, o.price) for o in stored) == sorted((p["source"], p["price"]) for p in data["prices"])
+        assert client.get("/api/products/202/prices").json() == data["prices"]
+
+    def test_stored_prices_keep_their_urls(self, client, memory_sessions):
+        """Test that stored prices are served with the URL they were recorded with, or none."""
+        now = datetime.now(timezone.utc)
+        with memory_sessions() as db:
+            PriceHistoryService.record_observations(db, [
+                {"product_id": 203, "source": "Zap", "observed_at": now, "price": 999.0,
+                 "url": "https://www.zap.co.il/model.aspx?modelid=1"},
+                {"product_id": 203, "source": "KSP", "observed_at": now, "price": 1010.0},
+            ])
+        prices = client.get("/api/products/203/prices").json()
+        assert [(p["source"], p["url"]) for p in prices] == [("KSP", None), ("Zap", "https://www.zap.co.il/model.aspx?modelid=1")]
+
+    def test_get_product_not_found(self, client):
+        """Test that unknown product ids return 404."""
+        response = client.get("/api/products/999999")
+        assert response.status_code == 404
+
+    def test_get_product_prices(self, client):
+        """Test fetching price comparison for a product."""
+        response = client.get("/api/products/1/prices")
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+
+    def test_list_products_by_category(self, client):
+        """Test listing products filtered by category."""
+        response = client.get("/api/products?category=מחשבים&limit=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 5
+        assert all(p["category"] == "מחשבים" for p in data)
+
+    def test_list_products_unknown_category(self, client):
+        """Test listing products for an unknown category."""
+        response = client.get("/api/products?category=nonexistent")
+        assert response.status_code == 200
+        assert response.json() == []
+
     def test_list_products_limit_validation_too_high(self, client):
         """Test that limit has valid bounds - too high."""
         response = client.get("/api/products?limit=200")
@@ -142,6 +327,47 @@ class TestProductsEndpoint:
         assert response.status_code == 422
 
 
+class TestPriceHistoryEndpoint:
+    """Tests for the downsampled price history endpoint."""
+
+    @pytest.fixture
+    def client(self, memory_sessions):
+        start = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+        with memory_sessions() as db:
+            PriceHistoryService.record_observations(db, [
+                {"product_id": 1, "source": source, "observed_at": start + i * 3600, "price": 5000.0 + (i % 24), "available": True}
+                for i in range(24 * 60) for source in ("KSP", "Zap")
+            ])
+        return TestClient(app)
+
+    def test_daily_ohlc_from_rollups(self, client):
+        """Test that a long range is served as one daily bucket per source."""
+        response = client.get("/api/products/1/history?from=2026-01-01T00:00:00Z&to=2026-03-01T00:00:00Z")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resolution"] == "day"
+        assert [s["source"] for s in data["series"]] == ["KSP", "Zap"]
+        first = data["series"][0]["points"][0]
+        assert len(data["series"][0]["points"]) == 59
+        assert (first["open"], first["high"], first["low"], first["close"], first["count"]) == (5000.0, 5023.0, 5000.0, 5023.0, 24)
+        assert first["average"] == 5011.5
+
+    def test_hourly_and_lttb_points(self, client):
+        """Test hourly resolution for a short range and LTTB point limits."""
+        data = client.get("/api/products/1/history?from=2026-01-02T00:00:00&to=2026-01-04T00:00:00").json()
+        assert data["resolution"] == "hour"
+        assert len(data["series"][1]["points"]) == 48
+
+        data = client.get("/api/products/1/history?from=2026-01-02T00:00:00&to=2026-01-04T00:00:00&resolution=raw&points=20").json()
+        assert all(len(s["points"]) == 20 for s in data["series"])
+
+    def test_invalid_range_and_unknown_product(self, client):
+        """Test validation of the range and 404 for unknown products."""
+        assert client.get("/api/products/1/history?from=2026-02-01T00:00:00&to=2026-01-01T00:00:00").status_code == 422
+        assert client.get("/api/products/1/history?resolution=week").status_code == 422
+        assert client.get("/api/products/999999/history").status_code == 404
+
+
 class TestScraperEndpoints:
     """Tests for scraper status endpoints."""
 
@@ -157,3 +383,14 @@ class TestScraperEndpoints:
         assert "scrapers_available" in data
         assert "use_real_scrapers" in data
         assert "message" in data
+
+    def test_lifespan_manages_shared_scraper_manager(self):
+        """Test that one ScraperManager lives for the app lifetime and is closed on shutdown."""
+        with TestClient(app) as client:
+            manager = app.state.scraper_manager
+            assert manager is not None
+            client.get("/api/products/search?query=iPhone")
+            assert app.state.scraper_manager is manager
+
+        assert app.state.scraper_manager is None
+        assert manager._executor._shutdown
@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.normalization import normalize, normalize_many
+from app.scrapers.scraper_manager import ScraperManager
+
+
+class TestNormalize:
+    """Tests for shared text normalization."""
+
+    def test_lowercase_and_whitespace(self):
+        """Test lowercasing and whitespace collapsing."""
+        assert normalize("  Samsung   Galaxy\tS24 ") == "samsung galaxy s24"
+
+    def test_strips_niqqud(self):
+        """Test that Hebrew points are removed."""
+        assert normalize("שָׁלוֹם") == normalize("שלום")
+
+    def test_geresh_and_gershayim(self):
+        """Test that geresh and gershayim are removed."""
+        assert normalize("אינץ׳") == normalize("אינץ'") == "אינצ"
+        assert normalize('מ״ל') == normalize('מ"ל') == "מל"
+
+    def test_final_letters(self):
+        """Test that final letter forms fold into regular forms."""
+        assert normalize("ךםןףץ") == "כמנפצ"
+
+    def test_unit_spacing(self):
+        """Test that numbers are joined to their units."""
+        assert normalize("256 GB") == "256gb"
+        assert normalize("5000 mAh, 65 W") == "5000mah, 65w"
+        assert normalize("Series 5 Lite") == "series 5 lite"
+
+    def test_empty(self):
+        """Test empty input."""
+        assert normalize("") == ""
+        assert normalize_many(["", None]) == ["", ""]
+
+    def test_normalize_many_matches_normalize(self):
+        """Test that batch and single normalization agree."""
+        texts = ["iPhone 15 Pro 128 GB", "אוזניות Sony", "קרם 200 מ\"ל"]
+        assert normalize_many(texts) == [normalize(t) for t in texts]
+
+
+class TestScraperNameNormalization:
+    """Tests for ScraperManager product name normalization."""
+
+    def test_removes_noise_words(self):
+        """Test that listing noise words are removed as whole words."""
+        manager = ScraperManager(enabled_scrapers=[])
+        assert manager._normalize_product_name("Samsung Galaxy S24 256 GB חדש משלוח חינם") == "samsung galaxy s24 256gb"
+        assert manager._normalize_product_name("Newton Original") == "newton"
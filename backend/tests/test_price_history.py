@@ -0,0 +1,224 @@
+import pytest
+from datetime import datetime, timezone
+import numpy as np
+import sys
+import os
+
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.data.products_database import UNLINKED_ID_BASE
+from app.models.price_archive import PriceArchive
+from app.models.price_observation import PriceObservation
+from app.models.price_rollup import PriceRollup
+from app.services.price_history import PriceHistoryService, decode_partition, encode_partition, lttb
+
+JAN = int(datetime(2026, 1, 10, tzinfo=timezone.utc).timestamp())
+FEB = int(datetime(2026, 2, 10, tzinfo=timezone.utc).timestamp())
+MAR = int(datetime(2026, 3, 10, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory price history database."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[PriceObservation.__table__, PriceArchive.__table__, PriceRollup.__table__])
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def observation(product_id, source, observed_at, price, available=True):
+    return {"product_id": product_id, "source": source, "observed_at": observed_at, "price": price, "available": available}
+
+
+class TestPriceObservations:
+    """Tests for recording and reading price observations."""
+
+    def test_latest_price_per_source(self, db):
+        """Test that the newest observation per source is returned and duplicates are ignored."""
+        PriceHistoryService.record_observations(db, [
+            observation(1, "KSP", JAN, 100.0),
+            observation(1, "KSP", FEB, 90.0),
+            observation(1, "Zap", JAN, 95.0),
+            observation(2, "Bug", FEB, 50.0),
+        ])
+        PriceHistoryService.record_observations(db, [observation(1, "KSP", FEB, 999.0)])
+
+        latest = PriceHistoryService.latest_prices(db, [1, 2, 3])
+        assert [(o.source, o.observed_at, o.price) for o in latest[1]] == [("KSP", FEB, 90.0), ("Zap", JAN, 95.0)]
+        assert [o.price for o in latest[2]] == [50.0]
+        assert 3 not in latest
+        assert db.query(PriceObservation).count() == 4
+
+    def test_record_offers_keeps_lowest_available(self, db):
+        """Test that several listings of one source record a single, cheapest available price."""
+        seen = datetime(2026, 2, 1, 12, 0, tzinfo=timezone.utc)
+        PriceHistoryService.record_offers(db, [{
+            "id": 6,
+            "prices": [
+                {"source": "Zap", "price": 4900.0, "availability": True, "last_updated": seen},
+                {"source": "Zap", "price": 4500.0, "availability": False, "last_updated": seen},
+                {"source": "Zap", "price": 4700.0, "availability": True, "last_updated": seen,
+                 "url": "https://www.zap.co.il/p/47"},
+                {"source": "Bug", "price": None, "availability": True, "last_updated": seen},
+            ],
+        }])
+        rows = db.query(PriceObservation).all()
+        assert [(r.source, r.price, r.available, r.url) for r in rows] == [("Zap", 4700.0, True, "https://www.zap.co.il/p/47")]
+
+    def test_record_offers_skips_unlinked_products(self, db):
+        """Test that scraped products with no catalog match are not recorded."""
+        seen = datetime(2026, 2, 1, 12, 0, tzinfo=timezone.utc)
+        prices = [{"source": "Zap", "price": 99.0, "availability": True, "last_updated": seen}]
+        stored = PriceHistoryService.record_offers(db, [
+            {"id": UNLINKED_ID_BASE + 12345, "prices": prices},
+            {"id": None, "prices": prices},
+            {"id": 7, "prices": prices},
+        ])
+        assert stored == 1
+        assert [r.product_id for r in db.query(PriceObservation).all()] == [7]
+
+
+    def test_concurrently_stored_observation_is_not_rolled_up_twice(self, tmp_path):
+        """Test that a row another writer stores just before our insert is skipped, not counted."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+        Base.metadata.create_all(engine, tables=[PriceObservation.__table__, PriceArchive.__table__, PriceRollup.__table__])
+        sessions = sessionmaker(bind=engine)
+
+        with sessions() as db:
+            execute = db.execute
+            raced = []
+
+            def racing_execute(statement, *args, **kwargs):
+                # Another request records the same observation right before our insert runs
+                if getattr(statement, "is_insert", False) and not raced:
+                    raced.append(True)
+                    with sessions() as other:
+                        PriceHistoryService.record_observations(other, [observation(1, "KSP", JAN, 100.0)])
+                return execute(statement, *args, **kwargs)
+
+            with patch.object(db, "execute", side_effect=racing_execute):
+                stored = PriceHistoryService.record_observations(db, [
+                    observation(1, "KSP", JAN, 100.0),
+                    observation(1, "KSP", JAN + 60, 80.0),
+                ])
+            assert raced and stored == 1
+            assert db.query(PriceObservation).count() == 2
+            (hour,) = PriceHistoryService.get_history(db, 1, JAN, JAN + 3600, "hour")["KSP"]
+            assert hour[1:] == (100.0, 100.0, 80.0, 80.0, 90.0, 2)
+
+
+class TestPriceArchive:
+    """Tests for the compressed column archive of old partitions."""
+
+    def test_encode_round_trip(self):
+        """Test that columns survive encoding, including missing prices."""
+        rows = [(1, "Bug", JAN, 10.5, True), (1, "KSP", JAN, None, False), (7, "Bug", FEB, 3.99, True)]
+        columns = decode_partition(encode_partition(rows))
+        assert columns["product_id"].tolist() == [1, 1, 7]
+        assert columns["source"].tolist() == ["Bug", "KSP", "Bug"]
+        assert columns["observed_at"].tolist() == [JAN, JAN, FEB]
+        assert columns["price"][0] == 10.5 and columns["price"][2] == 3.99
+        assert columns["available"].tolist() == [True, False, True]
+
+    def test_archive_old_months(self, db):
+        """Test that whole old months move to archives and reads span archive and live rows."""
+        PriceHistoryService.record_observations(db, [
+            observation(1, "KSP", JAN, 100.0),
+            observation(1, "KSP", JAN + 3600, 98.0),
+            observation(2, "KSP", JAN, 20.0),
+            observation(1, "KSP", FEB, 90.0),
+            observation(1, "Zap", MAR, 85.0),
+        ])
+        archived = PriceHistoryService.archive_partitions(db, datetime(2026, 3, 15, tzinfo=timezone.utc))
+        assert archived == ["2026-01", "2026-02"]
+        assert db.query(PriceObservation).count() == 1
+        assert db.get(PriceArchive, "2026-01").row_count == 3
+
+        history = PriceHistoryService.get_observations(db, 1, JAN, MAR + 1)
+        assert history == [
+            ("KSP", JAN, 100.0, True), ("KSP", JAN + 3600, 98.0, True), ("KSP", FEB, 90.0, True), ("Zap", MAR, 85.0, True),
+        ]
+        assert PriceHistoryService.get_observations(db, 1, FEB, MAR) == [("KSP", FEB, 90.0, True)]
+
+    def test_late_observations_merge_into_archive(self, db):
+        """Test that archiving a month again merges late rows into its partition."""
+        PriceHistoryService.record_observations(db, [observation(1, "KSP", JAN, 100.0)])
+        PriceHistoryService.archive_partitions(db, datetime(2026, 2, 1, tzinfo=timezone.utc))
+        PriceHistoryService.record_observations(db, [observation(1, "Bug", JAN + 60, 95.0)])
+        assert PriceHistoryService.archive_partitions(db, datetime(2026, 2, 1, tzinfo=timezone.utc)) == ["2026-01"]
+
+        assert db.get(PriceArchive, "2026-01").row_count == 2
+        assert db.query(PriceObservation).count() == 0
+        assert [row[0] for row in PriceHistoryService.get_observations(db, 1, JAN, FEB)] == ["Bug", "KSP"]
+
+
+class TestPriceRollups:
+    """Tests for incrementally maintained hourly/daily rollups."""
+
+    def test_rollups_follow_out_of_order_inserts(self, db):
+        """Test OHLC, average and count per bucket, with late and duplicate observations."""
+        PriceHistoryService.record_observations(db, [
+            observation(1, "KSP", JAN + 600, 100.0),
+            observation(1, "KSP", JAN + 1200, 80.0),
+        ])
+        # A late (earlier) observation, a duplicate, and one the next hour
+        stored = PriceHistoryService.record_observations(db, [
+            observation(1, "KSP", JAN + 60, 90.0),
+            observation(1, "KSP", JAN + 600, 100.0),
+            observation(1, "KSP", JAN + 3600, 120.0),
+            observation(1, "Bug", JAN + 60, None),
+        ])
+        assert stored == 3
+
+        hours = PriceHistoryService.get_history(db, 1, JAN, JAN + 7200, "hour")
+        assert list(hours) == ["KSP"]
+        first, second = hours["KSP"]
+        assert first[1:] == (90.0, 100.0, 80.0, 80.0, 90.0, 3)
+        assert second[1:] == (120.0, 120.0, 120.0, 120.0, 120.0, 1)
+
+        (day,) = PriceHistoryService.get_history(db, 1, JAN, JAN + 7200, "day")["KSP"]
+        assert day[0] == JAN - JAN % 86400
+        assert day[1:] == (90.0, 120.0, 80.0, 120.0, 97.5, 4)
+
+    def test_rollups_match_raw_observations(self, db):
+        """Test that daily rollups equal an aggregation of the raw rows."""
+        rng = np.random.default_rng(7)
+        times = JAN + np.sort(rng.choice(30 * 86400, size=500, replace=False))
+        prices = np.round(rng.uniform(50, 150, size=500), 2)
+        for chunk in range(0, 500, 100):
+            PriceHistoryService.record_observations(db, [
+                observation(3, "Zap", int(t), float(p)) for t, p in zip(times[chunk:chunk + 100], prices[chunk:chunk + 100])
+            ])
+
+        raw = PriceHistoryService.get_history(db, 3, JAN, JAN + 31 * 86400, "raw")["Zap"]
+        days = PriceHistoryService.get_history(db, 3, JAN, JAN + 31 * 86400, "day")["Zap"]
+        assert len(raw) == 500 and sum(d[6] for d in days) == 500
+        for bucket, open_, high, low, close, _, count in days:
+            in_day = [r for r in raw if bucket <= r[0] < bucket + 86400]
+            assert (open_, close, count) == (in_day[0][1], in_day[-1][1], len(in_day))
+            assert (high, low) == (max(r[1] for r in in_day), min(r[1] for r in in_day))
+
+
+class TestLTTB:
+    """Tests for Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_keeps_endpoints_and_spikes(self):
+        """Test that the first/last points and a lone spike survive downsampling."""
+        x = np.arange(1000)
+        y = np.full(1000, 100.0)
+        y[537] = 40.0
+        kept = lttb(x, y, 50)
+        assert len(kept) == 50
+        assert kept[0] == 0 and kept[-1] == 999
+        assert 537 in kept
+        assert (np.diff(kept) > 0).all()
+
+    def test_short_series_unchanged(self):
+        """Test that series already under the threshold are returned whole."""
+        assert lttb(np.arange(10), np.arange(10), 20).tolist() == list(range(10))
@@ -0,0 +1,297 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.normalization import normalize
+from app.data.search_index import InvertedIndex, intersect_postings, union_postings, tokenize
+from app.data.fuzzy_index import TrigramIndex, trigrams, dice_similarity
+from app.data.suggest_index import SuggestIndex
+from app.data import products_database
+from app.data.products_database import (
+    search_products, search_products_ranked, search_products_any, fuzzy_search_products, get_product_by_id, get_products_by_ids, get_products_by_category,
+    get_categories, get_category_stats, resolve_category, load_catalog, suggest_products,
+)
+
+
+class TestInvertedIndex:
+    """Tests for the catalog inverted index."""
+
+    @pytest.fixture
+    def index(self, sample_products):
+        return InvertedIndex.build(sample_products)
+
+    def test_tokenize_hebrew_and_latin(self):
+        """Test that Hebrew and Latin words are both tokenized."""
+        assert tokenize("MacBook Air עם שבב M3") == ["macbook", "air", "עמ", "שבב", "m3"]
+
+    def test_intersect_postings(self):
+        """Test intersecting sorted posting lists."""
+        assert intersect_postings([[1, 3, 5, 7], [3, 4, 5], [0, 3, 5, 9]]) == [3, 5]
+        assert intersect_postings([[1, 2], []]) == []
+
+    def test_union_postings(self):
+        """Test unioning sorted posting lists."""
+        assert union_postings([[1, 5], [2, 5, 9]]) == [1, 2, 5, 9]
+
+    def test_multi_word_query_intersects(self, index):
+        """Test that all query words must match."""
+        assert index.search("air max") == [401]
+        assert index.search("air") == [201, 401]
+
+    def test_any_mode_unions(self, index):
+        """Test that 'any' mode matches at least one word."""
+        assert index.search("iphone nike", mode="any") == [1, 401]
+
+    def test_prefix_match(self, index):
+        """Test that partial words match indexed tokens."""
+        assert index.search("macb") == [201]
+        assert index.search("אופ") == [401]
+
+
+class TestSearchProducts:
+    """Tests for catalog search."""
+
+    def test_search_by_name(self):
+        """Test searching by a product name."""
+        results = search_products("Galaxy S24")
+        names = [p["name"] for p in results]
+        assert "Samsung Galaxy S24 Ultra 512GB" in names
+        assert all("galaxy" in (p["name"] + p["description"]).lower() for p in results)
+
+    def test_search_by_category(self):
+        """Test that the category name is searchable."""
+        results = search_products("מחשבים")
+        assert results
+        assert all(p["category"] == "מחשבים" for p in results)
+
+    def test_search_normalizes_hebrew_and_units(self):
+        """Test that geresh, final letters and unit spacing are normalized."""
+        assert search_products("אינץ׳") == search_products("אינץ")
+        assert search_products("256 GB") == search_products("256gb")
+        assert search_products("256 GB")
+
+    def test_search_matches_inside_words(self):
+        """Test that a query matches anywhere inside a field, not only at word starts."""
+        names = [p["name"] for p in search_products("phone")]
+        assert "iPhone 15 Pro Max 256GB" in names
+        assert search_products("PHONE") == search_products("phone")
+        assert [p["name"] for p in search_products("hone 15 Pro M")] == ["iPhone 15 Pro Max 256GB"]
+
+    def test_search_equals_substring_scan(self):
+        """Test that indexed search returns exactly the products a full substring scan finds."""
+        for query in ["phone", "galaxy s2", "pro", "s", "אוזני", "ם", "6.1", "256 GB", "!!!", ""]:
+            needle = normalize(query)
+            expected = [
+                p["id"] for p in products_database.PRODUCTS_DATABASE
+                if any(needle in normalize(p[field]) for field in ("name", "description", "category"))
+            ]
+            assert [p["id"] for p in search_products(query)] == expected, query
+
+    def test_search_with_category_filter(self):
+        """Test filtering search results by category."""
+        results = search_products("Samsung", category="מחשבים")
+        assert results
+        assert all(p["category"] == "מחשבים" for p in results)
+
+    def test_search_limit_keeps_first_matches(self):
+        """Test that a limit returns the first matches in catalog order."""
+        everything = search_products("Samsung")
+        assert search_products("Samsung", limit=5) == everything[:5]
+        assert search_products("Samsung", category="מחשבים", limit=3) == search_products("Samsung", category="מחשבים")[:3]
+        assert search_products("Samsung", limit=0) == []
+
+    def test_results_in_catalog_order(self):
+        """Test that results keep catalog (id) order."""
+        ids = [p["id"] for p in search_products("Samsung")]
+        assert ids == sorted(ids)
+
+    def test_no_match(self):
+        """Test that unknown queries return nothing."""
+        assert search_products("zzzqqq") == []
+        assert search_products("!!!") == []
+
+
+class TestRankedSearch:
+    """Tests for BM25 top-k ranked search."""
+
+    def test_top_k_matches_exhaustive_ranking(self):
+        """Test that early termination returns the same top-k as a full sort."""
+        products_database.ensure_indexes()
+        index = products_database._SEARCH_INDEX
+        for query in ["samsung galaxy", "pro", "אוזניות", "s"]:
+            all_ids = set(index.search(query))
+            top = index.top_k(query, len(all_ids))
+            assert {pid for pid, _ in top} == all_ids
+            for k in (1, 5, 20):
+                assert index.top_k(query, k) == top[:k]
+
+    def test_name_match_ranks_first(self):
+        """Test that name hits outrank description-only hits."""
+        results = search_products_ranked("אוזניות", limit=3)
+        assert all("אוזניות" in p["name"] for p in results[:2])
+
+    def test_ranked_limit_and_category(self):
+        """Test ranked search honours limit and category."""
+        results = search_products_ranked("Samsung", category="מחשבים", limit=3)
+        assert len(results) == 3
+        assert all(p["category"] == "מחשבים" for p in results)
+
+    def test_ranked_same_matches_as_search(self):
+        """Test ranked search matches the same products as search_products, inside words too."""
+        for query in ["galaxy", "phone", "pad", "book", "hone 15 pro m", "s"]:
+            ranked = search_products_ranked(query, limit=1000)
+            assert sorted(p["id"] for p in ranked) == [p["id"] for p in search_products(query)], query
+
+    def test_whole_word_outranks_inside_word(self):
+        """Test that a query matching a whole word ranks above matches inside longer words."""
+        results = search_products_ranked("phone", limit=10)
+        assert results[0]["name"] == "Nothing Phone (2) 256GB"
+        assert all("iphone" in p["name"].lower() for p in results[1:])
+
+    def test_any_word_search_prefers_rare_words(self):
+        """Test that partial matches are returned, model numbers outranking common words."""
+        results = search_products_any("Samsung Galaxy S24 Ultra שחור יבואן רשמי", limit=5)
+        assert results[0]["name"] == "Samsung Galaxy S24 Ultra 512GB"
+        assert len(results) == 5
+        assert search_products_any("xyzzy") == []
+
+
+class TestSuggest:
+    """Tests for prefix autocomplete."""
+
+    def test_whole_name_prefix(self):
+        """Test completing the start of a product name."""
+        names = [p["name"] for p in suggest_products("samsung gal")]
+        assert names
+        assert all(name.startswith("Samsung Galaxy") for name in names)
+
+    def test_mid_name_prefix(self):
+        """Test completing from a word in the middle of a name."""
+        names = [p["name"] for p in suggest_products("galaxy s2")]
+        assert "Samsung Galaxy S24 128GB" in names
+
+    def test_limit_and_distinct(self):
+        """Test the limit and that products are not repeated."""
+        ids = [p["id"] for p in suggest_products("s", limit=10)]
+        assert len(ids) == 10
+        assert len(set(ids)) == 10
+
+    def test_heavy_prefixes_match_range_ranking(self):
+        """Test that precomputed heavy prefixes agree with on-the-fly ranking."""
+        index = SuggestIndex.build(products_database.PRODUCTS_DATABASE, heavy_range=32)
+        assert index._heavy
+        for prefix, expected in list(index._heavy.items())[:20]:
+            heavy = index._heavy.pop(prefix)
+            assert index.suggest(prefix, 20) == expected
+            index._heavy[prefix] = heavy
+
+    def test_no_match(self):
+        """Test unknown prefixes."""
+        assert suggest_products("zzzqqq") == []
+        assert suggest_products("   ") == []
+
+
+class TestProductLookup:
+    """Tests for id-keyed product lookup."""
+
+    def test_get_product_by_id(self):
+        """Test fetching a product by id."""
+        product = get_product_by_id(201)
+        assert product["id"] == 201
+        assert product["category"] == "מחשבים"
+
+    def test_get_product_by_unknown_id(self):
+        """Test that unknown ids return None."""
+        assert get_product_by_id(0) is None
+        assert get_product_by_id(999999) is None
+
+    def test_get_products_by_ids(self):
+        """Test batch lookup keeps request order and skips unknown ids."""
+        products = get_products_by_ids([401, 999999, 1])
+        assert [p["id"] for p in products] == [401, 1]
+
+
+class TestCategoryPartitions:
+    """Tests for precomputed category partitions."""
+
+    def test_products_by_category_with_limit(self):
+        """Test that the limit is applied to the partition."""
+        products = get_products_by_category("אופנה", limit=5)
+        assert len(products) == 5
+        assert all(p["category"] == "אופנה" for p in products)
+
+    def test_unknown_category(self):
+        """Test that unknown categories return an empty list."""
+        assert get_products_by_category("nonexistent") == []
+
+    def test_category_stats_match_partitions(self):
+        """Test that cached stats match the partition sizes."""
+        stats = get_category_stats()
+        assert list(stats) == get_categories()
+        for category, count in stats.items():
+            assert count == len(get_products_by_category(category))
+
+    def test_resolve_category_case_insensitive(self):
+        """Test case-insensitive category resolution."""
+        assert resolve_category("אופנה") == "אופנה"
+        assert resolve_category("nonexistent") is None
+
+    def test_load_catalog_rebuilds_indexes(self, sample_products):
+        """Test that reloading the catalog invalidates derived indexes."""
+        original = list(products_database.PRODUCTS_DATABASE)
+        try:
+            load_catalog(sample_products)
+            assert get_category_stats()["מחשבים"] == 1
+            assert [p["id"] for p in search_products("nike")] == [401]
+            assert get_product_by_id(2) is None
+        finally:
+            load_catalog(original)
+        assert get_product_by_id(2) is not None
+
+
+class TestFuzzySearch:
+    """Tests for trigram typo-tolerant search."""
+
+    def test_trigram_similarity(self):
+        """Test Dice similarity of padded trigrams."""
+        assert dice_similarity(trigrams("galaxy"), trigrams("galaxy")) == 1.0
+        assert dice_similarity(trigrams("galxy"), trigrams("galaxy")) > 0.5
+        assert dice_similarity(trigrams("galxy"), trigrams("iphone")) == 0.0
+
+    def test_similar_terms(self):
+        """Test fuzzy term lookup against a small vocabulary."""
+        index = TrigramIndex.build(["galaxy", "airpods", "iphone"])
+        terms = [term for term, _ in index.similar_terms("galxy")]
+        assert terms == ["galaxy"]
+        assert index.similar_terms("zzzz") == []
+
+    def test_similar_terms_match_brute_force(self):
+        """Test that prefix filtering finds exactly the terms a full Dice scan finds."""
+        products_database.ensure_indexes()
+        vocabulary = products_database._SEARCH_INDEX.vocabulary
+        index = TrigramIndex.build(vocabulary)
+        for token, threshold in [("galxy", 0.5), ("samsnug", 0.5), ("s24", 0.4), ("macbok", 0.7), ("אוזנית", 0.5)]:
+            grams = trigrams(token)
+            expected = sorted(
+                (term, dice_similarity(grams, trigrams(term))) for term in vocabulary
+                if dice_similarity(grams, trigrams(term)) >= threshold
+            )
+            assert sorted(index.similar_terms(token, threshold)) == expected, token
+
+    def test_misspelled_query(self):
+        """Test that misspelled model names still find products."""
+        names = [p["name"] for p in fuzzy_search_products("galxy s24")]
+        assert "Samsung Galaxy S24 128GB" in names
+
+    def test_ranked_best_first(self):
+        """Test that closer matches rank first."""
+        results = fuzzy_search_products("airpod pro", limit=1)
+        assert results[0]["name"] == "Apple AirPods Pro 2nd Gen"
+
+    def test_category_filter(self):
+        """Test filtering fuzzy results by category."""
+        results = fuzzy_search_products("samsnug", category="מחשבים")
+        assert results
+        assert all(p["category"] == "מחשבים" for p in results)
@@ -1,5 +1,6 @@
 import pytest
 import sys
+from unittest.mock import patch
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -72,3 +73,109 @@ class TestPriceScraper:
             sources = [p.source for p in prices]
             # Should have multiple sources
             assert len(sources) > 0
+
+
+class TestDeterministicPricing:
+    """Tests for seeded, cached mock prices."""
+
+    @pytest.fixture
+    def scraper(self):
+        return PriceScraper(bucket_seconds=900, cache_size=2)
+
+    def test_same_bucket_same_prices(self, scraper):
+        """Test that a product gets identical prices within a bucket."""
+        first = scraper.scrape_prices("Test Product", 100.0, product_id=1)
+        second = scraper.scrape_prices("Test Product", 100.0, product_id=1)
+        assert first == second
+        assert scraper.cache_info()["hits"] == 1
+
+    def test_deterministic_across_instances(self, scraper):
+        """Test that prices depend only on (product, source, bucket)."""
+        other = PriceScraper(bucket_seconds=900)
+        assert scraper.scrape_prices("Test", 100.0, product_id=7) == other.scrape_prices("Test", 100.0, product_id=7)
+
+    def test_new_bucket_new_prices(self, scraper):
+        """Test that prices change when the time bucket changes."""
+        with patch.object(PriceScraper, "current_bucket", return_value=1000):
+            first = scraper.scrape_prices("Test", 100.0, product_id=1)
+        with patch.object(PriceScraper, "current_bucket", return_value=1001):
+            second = scraper.scrape_prices("Test", 100.0, product_id=1)
+        assert [p.price for p in first] != [p.price for p in second]
+        assert first[0].last_updated.timestamp() == 1000 * 900
+
+    def test_prices_within_variation(self, scraper):
+        """Test that seeded prices stay within ±20% of the base price."""
+        for product_id in range(50):
+            for price in scraper.scrape_prices("Test", 100.0, product_id=product_id):
+                assert 80.0 <= price.price <= 120.0
+
+    def test_cache_is_bounded(self, scraper):
+        """Test that the LRU cache never exceeds its size."""
+        for product_id in range(5):
+            scraper.scrape_prices("Test", 100.0, product_id=product_id)
+        info = scraper.cache_info()
+        assert info["size"] == 2
+        assert info["misses"] == 5
+
+    def test_cached_list_not_shared(self, scraper):
+        """Test that callers can't mutate the cached price vector."""
+        prices = scraper.scrape_prices("Test", 100.0, product_id=1)
+        prices.clear()
+        assert len(scraper.scrape_prices("Test", 100.0, product_id=1)) == 3
+
+
+class TestBatchPricing:
+    """Tests for vectorized batch pricing."""
+
+    @pytest.fixture
+    def scraper(self):
+        return PriceScraper(bucket_seconds=900)
+
+    def test_batch_matches_single_product_prices(self, scraper, sample_products):
+        """Test that batch rows match scrape_prices for the same product."""
+        batch = scraper.scrape_prices_batch(sample_products)
+        fresh = PriceScraper(bucket_seconds=900)
+        for row, product in enumerate(sample_products):
+            single = fresh.scrape_prices(product["name"], product["base_price"], product_id=product["id"])
+            assert batch.prices_for(row) == single
+
+    def test_batch_statistics(self, scraper, sample_products):
+        """Test that vectorized statistics match get_price_statistics."""
+        batch = scraper.scrape_prices_batch(sample_products)
+        for row in range(len(batch)):
+            assert batch.statistics_for(row) == scraper.get_price_statistics(batch.prices_for(row))
+
+    def test_statistics_without_available_prices(self, scraper):
+        """Test statistics when no source has the product available."""
+        products = [{"id": i, "name": "Test", "base_price": 100.0} for i in range(2000)]
+        batch = scraper.scrape_prices_batch(products)
+        unavailable = [row for row in range(len(batch)) if not batch.availability[row].any()]
+        assert unavailable
+        assert batch.statistics_for(unavailable[0]) == {
+            "lowest_price": None, "highest_price": None, "average_price": None
+        }
+
+    def test_missing_base_price(self, scraper):
+        """Test that products without a base price still get prices."""
+        batch = scraper.scrape_prices_batch([{"id": 5, "name": "Test"}])
+        assert all(50.0 * 0.8 <= p.price <= 2000.0 * 1.2 for p in batch.prices_for(0))
+
+    def test_repeated_batch_is_cached(self, scraper, sample_products):
+        """Test that pricing the same products again in a bucket reuses the batch."""
+        first = scraper.scrape_prices_batch(sample_products)
+        assert scraper.scrape_prices_batch(list(sample_products)) is first
+        assert scraper.cache_info()["batches"] == 1
+        assert scraper.scrape_prices_batch(sample_products[:1]) is not first
+
+    def test_batch_rows_count_cache_hits(self, scraper, sample_products):
+        """Test that reading batch rows is counted in the cache statistics."""
+        batch = scraper.scrape_prices_batch(sample_products)
+        batch.prices_for(0)
+        batch.prices_for(0)
+        scraper.scrape_prices(sample_products[0]["name"], sample_products[0]["base_price"], product_id=sample_products[0]["id"])
+        info = scraper.cache_info()
+        assert (info["hits"], info["misses"]) == (2, 2)
+
+    def test_empty_batch(self, scraper):
+        """Test pricing an empty list."""
+        assert len(scraper.scrape_prices_batch([])) == 0
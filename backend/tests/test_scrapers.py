@@ -0,0 +1,1189 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+import os
+
+import httpx
+import numpy as np
+import pytest
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.data import products_database
+from app.models.offer_link import OfferLink
+from app.scrapers.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from app.scrapers.cache import ScrapeCache, SQLiteCacheBackend
+from app.scrapers.catalog_linker import CatalogLinker, UNLINKED_ID_BASE, unlinked_product_id
+from app.scrapers.base_scraper import MAX_CONNECTIONS_PER_HOST
+from app.scrapers.http_cache import HTTPCache, freshness_lifetime
+from app.scrapers.matching import OfferMatcher, extract_features, blocking_keys, minhash_signatures
+from app.scrapers.rate_limiter import RateLimiter, get_rate_limiter, parse_retry_after, backoff_delay, MAX_RETRY_AFTER
+from app.scrapers.scraper_manager import ScraperManager
+from app.scrapers.singleflight import SingleFlight
+from app.scrapers.parsers import PageSpec, PARSER_BACKENDS, parse_items
+from app.scrapers.replay import AsyncReplayTransport, ReplayCorpus, ReplayMissError, install_replay
+from app.scrapers.ksp_scraper import KSPScraper
+from app.scrapers.bug_scraper import BugScraper
+from app.scrapers.zap_scraper import ZapScraper
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "corpus")
+CORPUS = ReplayCorpus(CORPUS_DIR)
+
+SCRAPERS = {"zap": ZapScraper, "ksp": KSPScraper, "bug": BugScraper}
+
+ZAP_SEARCH_HTML = """
+<html><body>
+  <div class="ProdBox">
+    <a class="ModelTitle" href="/model.aspx?modelid=1">Samsung Galaxy S24</a>
+    <span class="Price">3,499 ₪</span>
+  </div>
+  <div class="ProdBox">
+    <a class="ModelTitle" href="/model.aspx?modelid=2">Samsung Galaxy S23</a>
+    <span class="Price">2,899 ₪</span>
+  </div>
+</body></html>
+"""
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+def unthrottled(scraper):
+    """Give a scraper its own limiter so tests never wait on the shared one."""
+    scraper.rate_limiter = RateLimiter(rate=1000, burst=100)
+    return scraper
+
+
+def mock_client(handler) -> httpx.AsyncClient:
+    """Create an AsyncClient backed by an in-process handler."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAsyncFetch:
+    """Tests for the asyncio fetch path in BaseScraper."""
+
+    def test_async_search_product_parses_results(self):
+        """Test that async search fetches and parses a results page."""
+        requested = []
+
+        def handler(request):
+            requested.append(str(request.url))
+            return httpx.Response(200, text=ZAP_SEARCH_HTML)
+
+        async def search():
+            scraper = unthrottled(ZapScraper())
+            scraper.async_client = mock_client(handler)
+            try:
+                return await scraper.async_search_product("galaxy", max_results=5)
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        products = run(search())
+
+        assert [p["name"] for p in products] == ["Samsung Galaxy S24", "Samsung Galaxy S23"]
+        assert products[0]["price"] == 3499.0
+        assert products[0]["source"] == "Zap"
+        assert requested == ["https://www.zap.co.il/search.aspx?keyword=galaxy"]
+
+    def test_async_fetch_retries_then_gives_up(self):
+        """Test that failed fetches are retried and return None."""
+        attempts = []
+
+        def handler(request):
+            attempts.append(request.url)
+            return httpx.Response(503)
+
+        async def fetch():
+            scraper = unthrottled(ZapScraper())
+            scraper.async_client = mock_client(handler)
+            try:
+                with patch("app.scrapers.base_scraper.asyncio.sleep", new=AsyncMock()):
+                    return await scraper.async_fetch("https://www.zap.co.il/x", max_retries=3)
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        assert run(fetch()) is None
+        assert len(attempts) == 3
+
+    def test_private_client_closed_by_aclose(self):
+        """Test that a scraper closes the async client it created itself."""
+        async def lifecycle():
+            scraper = ZapScraper()
+            client = scraper._get_async_client()
+            await scraper.aclose()
+            return client, scraper.async_client
+
+        client, remaining = asyncio.run(lifecycle())
+        assert client.is_closed
+        assert remaining is None
+
+
+class TestScraperManagerAsync:
+    """Tests for ScraperManager.search_all."""
+
+    def test_search_all_shares_client_and_isolates_failures(self):
+        """Test that one failing site does not affect the others."""
+        async def search():
+            manager = ScraperManager(enabled_scrapers=['zap', 'ksp'])
+            unthrottled(manager.scrapers['zap'])
+            manager._async_client = mock_client(lambda request: httpx.Response(200, text=ZAP_SEARCH_HTML))
+
+            async def broken(*args, **kwargs):
+                raise RuntimeError("site down")
+
+            manager.scrapers['ksp'].async_search_product = broken
+            async with manager:
+                results = await manager.search_all("galaxy", max_results_per_site=1)
+                shared = manager.scrapers['zap'].async_client is manager._async_client
+            return results, shared, manager._async_client
+
+        results, shared, client_after = run(search())
+
+        assert len(results['zap']) == 1
+        assert results['ksp'] == []
+        assert shared
+        assert client_after is None
+
+    def test_manager_shares_worker_pool_and_user_agent(self):
+        """Test that scrapers reuse the manager's worker pool and one UserAgent."""
+        manager = ScraperManager(max_workers=2)
+        try:
+            scrapers = list(manager.scrapers.values())
+            assert all(s.executor is manager._executor for s in scrapers)
+            assert all(s.ua is scrapers[0].ua for s in scrapers)
+            assert manager._executor._max_workers == 2
+        finally:
+            manager.close_all()
+
+
+class TestRateLimiter:
+    """Tests for the per-host GCRA limiter and retry backoff."""
+
+    def test_burst_served_immediately_after_idle(self):
+        """Test that requests within the burst are not delayed."""
+        limiter = RateLimiter(rate=0.5, burst=3)
+        assert [limiter.reserve(now=100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_delays_only_when_rate_exceeded(self):
+        """Test that requests beyond the burst wait one interval each."""
+        limiter = RateLimiter(rate=0.5, burst=3)
+        for _ in range(3):
+            limiter.reserve(now=100.0)
+        assert limiter.reserve(now=100.0) == pytest.approx(2.0)
+        assert limiter.reserve(now=100.0) == pytest.approx(4.0)
+
+    def test_tokens_refill_over_time(self):
+        """Test that an idle period restores the full burst."""
+        limiter = RateLimiter(rate=1.0, burst=2)
+        limiter.reserve(now=0.0)
+        limiter.reserve(now=0.0)
+        assert limiter.reserve(now=10.0) == 0.0
+        assert limiter.reserve(now=10.0) == 0.0
+
+    def test_limiter_shared_per_host(self):
+        """Test that scrapers for the same host share one limiter."""
+        assert get_rate_limiter("example.test", 1.0) is get_rate_limiter("example.test", 1.0)
+        assert ZapScraper().rate_limiter is ZapScraper().rate_limiter
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing in seconds and HTTP-date forms."""
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that backoff stays within the exponential envelope."""
+        for attempt in range(10):
+            delay = backoff_delay(attempt)
+            assert 0 <= delay <= min(30.0, 2 ** attempt)
+
+    def test_backoff_honors_retry_after(self):
+        """Test that Retry-After sets a minimum delay, and very long ones give up."""
+        assert backoff_delay(0, "5") >= 5.0
+        assert backoff_delay(0, str(int(MAX_RETRY_AFTER) + 1)) is None
+
+    def test_async_fetch_waits_for_retry_after(self):
+        """Test that a 429 with Retry-After delays the retry accordingly."""
+        responses = [httpx.Response(429, headers={"Retry-After": "4"}), httpx.Response(200, text="ok")]
+
+        async def fetch():
+            scraper = unthrottled(ZapScraper())
+            scraper.async_client = mock_client(lambda request: responses.pop(0))
+            try:
+                with patch("app.scrapers.base_scraper.asyncio.sleep", new=AsyncMock()) as sleep:
+                    body = await scraper.async_fetch("https://www.zap.co.il/x")
+                return body, sleep.await_args_list
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        body, sleeps = run(fetch())
+        assert body == b"ok"
+        assert len(sleeps) == 1
+        assert sleeps[0].args[0] >= 4.0
+
+
+class FakeClock:
+    """Manually advanced clock for cache tests."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestScrapeCache:
+    """Tests for the scrape result cache."""
+
+    PRODUCTS = [{"name": "Samsung Galaxy S24", "price": 3499.0, "source": "Zap"}]
+
+    def test_fresh_stale_and_expired(self):
+        """Test that entries go fresh -> stale -> gone."""
+        clock = FakeClock()
+        cache = ScrapeCache(ttl=10, stale_ttl=20, clock=clock)
+        key = cache.make_key("galaxy", "zap", 5)
+        cache.set(key, self.PRODUCTS)
+
+        assert not cache.is_stale(cache.get(key))
+        clock.now += 15
+        entry = cache.get(key)
+        assert entry.value == self.PRODUCTS
+        assert cache.is_stale(entry)
+        clock.now += 20
+        assert cache.get(key) is None
+        assert (cache.hits, cache.stale_hits, cache.misses) == (1, 1, 1)
+
+    def test_key_uses_normalized_query(self):
+        """Test that equivalent queries share a cache entry."""
+        cache = ScrapeCache()
+        cache.set(cache.make_key("  Galaxy   S24 ", "zap", 5), self.PRODUCTS)
+        assert cache.get(cache.make_key("galaxy s24", "zap", 5)) is not None
+        assert cache.get(cache.make_key("galaxy s24", "ksp", 5)) is None
+        assert cache.get(cache.make_key("galaxy s24", "zap", 10)) is None
+
+    def test_per_site_ttl(self):
+        """Test that site TTL overrides apply."""
+        clock = FakeClock()
+        cache = ScrapeCache(ttl=100, site_ttls={"zap": 5}, clock=clock)
+        cache.set(cache.make_key("q", "zap", 5), self.PRODUCTS)
+        cache.set(cache.make_key("q", "ksp", 5), self.PRODUCTS)
+        clock.now += 10
+        assert cache.is_stale(cache.get(cache.make_key("q", "zap", 5)))
+        assert not cache.is_stale(cache.get(cache.make_key("q", "ksp", 5)))
+
+    def test_lru_bounded_by_bytes(self):
+        """Test that least recently used entries are evicted to stay within budget."""
+        entry_size = len(ScrapeCache().set(("q", "zap", 1), self.PRODUCTS).payload)
+        cache = ScrapeCache(max_bytes=entry_size * 2)
+        cache.set(("a", "zap", 1), self.PRODUCTS)
+        cache.set(("b", "zap", 1), self.PRODUCTS)
+        cache.get(("a", "zap", 1))
+        cache.set(("c", "zap", 1), self.PRODUCTS)
+
+        assert cache.get(("b", "zap", 1)) is None
+        assert cache.get(("a", "zap", 1)) is not None
+        assert cache.info()["bytes"] <= cache.max_bytes
+
+    def test_refresh_claimed_once(self):
+        """Test that only one background refresh runs per key."""
+        cache = ScrapeCache()
+        key = cache.make_key("q", "zap", 5)
+        assert cache.begin_refresh(key)
+        assert not cache.begin_refresh(key)
+        cache.end_refresh(key)
+        assert cache.begin_refresh(key)
+
+    def test_sqlite_backend_survives_restart(self, tmp_path):
+        """Test that persisted entries are readable by a new cache instance."""
+        path = str(tmp_path / "scrape_cache.db")
+        products = [{**self.PRODUCTS[0], "last_updated": datetime(2024, 1, 1, 12, 0)}]
+        first = ScrapeCache(backend=SQLiteCacheBackend(path))
+        first.set(first.make_key("galaxy", "zap", 5), products)
+        first.close()
+
+        second = ScrapeCache(backend=SQLiteCacheBackend(path))
+        entry = second.get(second.make_key("galaxy", "zap", 5))
+        second.close()
+
+        assert entry is not None
+        assert entry.value == products
+
+    def test_manager_serves_cache_and_revalidates_stale(self):
+        """Test that repeated searches hit the cache and stale entries refresh in the background."""
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request.url)
+            return httpx.Response(200, text=ZAP_SEARCH_HTML)
+
+        clock = FakeClock()
+
+        async def scenario():
+            manager = ScraperManager(enabled_scrapers=['zap'], cache=ScrapeCache(ttl=10, stale_ttl=100, clock=clock))
+            unthrottled(manager.scrapers['zap'])
+            manager._async_client = mock_client(handler)
+            async with manager:
+                first = await manager.search_all("galaxy", max_results_per_site=2)
+                second = await manager.search_all("Galaxy", max_results_per_site=2)
+                fetched_before_stale = len(requests_seen)
+
+                clock.now += 20
+                stale = await manager.search_all("galaxy", max_results_per_site=2)
+                await asyncio.gather(*manager._background_tasks)
+                refreshed = manager.cache.get(manager.cache.make_key("galaxy", "zap", 2))
+            return first, second, stale, fetched_before_stale, refreshed
+
+        first, second, stale, fetched_before_stale, refreshed = run(scenario())
+
+        assert first == second == stale
+        assert fetched_before_stale == 1
+        assert len(requests_seen) == 2
+        assert refreshed.is_fresh(clock.now)
+
+    def test_manager_hands_out_copies(self, tmp_path):
+        """Test that SQLite reads run off the event loop and callers cannot change cached results."""
+        path = str(tmp_path / "scrape_cache.db")
+        seed = ScrapeCache(backend=SQLiteCacheBackend(path))
+        seed.set(seed.make_key("galaxy", "zap", 2), self.PRODUCTS)
+        seed.close()
+
+        backend = SQLiteCacheBackend(path)
+        read_on = []
+        backend_get = backend.get
+        backend.get = lambda key: read_on.append(threading.current_thread()) or backend_get(key)
+
+        async def scenario():
+            manager = ScraperManager(enabled_scrapers=['zap'], cache=ScrapeCache(backend=backend))
+            async with manager:
+                first = await manager.search_all("galaxy", max_results_per_site=2)
+                first['zap'][0]['price'] = 1.0
+                first['zap'].clear()
+                return await manager.search_all("galaxy", max_results_per_site=2)
+
+        second = run(scenario())
+        assert second['zap'] == self.PRODUCTS
+        assert read_on and threading.main_thread() not in read_on
+
+
+class TestSingleFlight:
+    """Tests for single-flight request coalescing."""
+
+    def test_threads_share_one_call(self):
+        """Test that concurrent threads with the same key run the call once."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        while flight.info()["coalesced"] < 4:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.info() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+    def test_tasks_share_one_call(self):
+        """Test that concurrent tasks with the same key await one call."""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"zap": []}
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(5)))
+
+        results = run(scenario())
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.info()["coalesced"] == 4
+
+    def test_exception_shared_and_not_cached(self):
+        """Test that followers see the leader's error and the next call runs again."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("site down")
+
+        async def scenario():
+            outcomes = await asyncio.gather(*(flight.do_async("k", failing) for _ in range(3)), return_exceptions=True)
+            again = await flight.do_async("k", lambda: asyncio.sleep(0, result="ok"))
+            return outcomes, again
+
+        outcomes, again = run(scenario())
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+        assert again == "ok"
+        assert flight.info()["executions"] == 2
+
+    def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Test that one caller going away leaves the call running for others."""
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def scenario():
+            first = asyncio.ensure_future(flight.do_async("k", fetch))
+            second = asyncio.ensure_future(flight.do_async("k", fetch))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert run(scenario()) == "done"
+
+    def test_manager_coalesces_identical_searches(self):
+        """Test that concurrent identical real-data searches scrape each site once."""
+        requests_seen = []
+
+        async def handler(request):
+            requests_seen.append(request.url)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, text=ZAP_SEARCH_HTML)
+
+        async def scenario():
+            manager = ScraperManager(enabled_scrapers=['zap'], cache=ScrapeCache())
+            unthrottled(manager.scrapers['zap'])
+            manager._async_client = mock_client(handler)
+            async with manager:
+                results = await asyncio.gather(*(manager.search_all("galaxy", 2) for _ in range(10)))
+                return results, manager.stats()
+
+        results, stats = run(scenario())
+        assert len(requests_seen) == 1
+        assert all(r == results[0] for r in results)
+        assert stats["coalescing"]["searches"]["coalesced"] == 9
+
+
+class TestCircuitBreaker:
+    """Tests for the per-site circuit breaker."""
+
+    def test_opens_on_error_rate(self):
+        """Test that the circuit opens once enough calls in the window fail."""
+        breaker = CircuitBreaker("zap", failure_rate=0.5, min_calls=4)
+        for now, ok in [(0, True), (1, False), (2, True)]:
+            (breaker.record_success if ok else breaker.record_failure)(0.1, now=now)
+        assert breaker.state(now=3) == CLOSED
+        breaker.record_failure(0.1, now=3)
+        assert breaker.state(now=3) == OPEN
+        assert not breaker.allow(now=4)
+
+    def test_slow_calls_count_against_site(self):
+        """Test that calls slower than the threshold trip the circuit."""
+        breaker = CircuitBreaker("zap", min_calls=2, slow_call_seconds=1.0)
+        breaker.record_success(5.0, now=0)
+        breaker.record_success(5.0, now=1)
+        assert breaker.state(now=1) == OPEN
+
+    def test_old_calls_leave_window(self):
+        """Test that failures outside the rolling window are forgotten."""
+        breaker = CircuitBreaker("zap", min_calls=3, window_seconds=10)
+        breaker.record_failure(now=0)
+        breaker.record_failure(now=1)
+        for now in (20, 21, 22):
+            breaker.record_success(0.1, now=now)
+        assert breaker.state(now=22) == CLOSED
+
+    def test_half_open_trial_closes_or_reopens(self):
+        """Test recovery through a half-open trial call."""
+        breaker = CircuitBreaker("zap", min_calls=1, open_seconds=30)
+        breaker.record_failure(now=0)
+        assert breaker.state(now=10) == OPEN
+        assert breaker.state(now=30) == HALF_OPEN
+        assert breaker.allow(now=30)
+        assert not breaker.allow(now=30)
+        breaker.record_failure(now=31)
+        assert breaker.state(now=31) == OPEN
+
+        assert breaker.allow(now=61)
+        breaker.record_success(0.1, now=61)
+        assert breaker.state(now=61) == CLOSED
+
+    def test_open_circuit_skips_fetch(self):
+        """Test that an open circuit fails fast without sending requests."""
+        requests_seen = []
+
+        async def fetch():
+            scraper = unthrottled(ZapScraper())
+            scraper.async_client = mock_client(lambda request: requests_seen.append(1) or httpx.Response(200))
+            scraper.circuit_breaker._open(float("inf"))
+            try:
+                return await scraper.async_fetch("https://www.zap.co.il/x")
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        assert run(fetch()) is None
+        assert requests_seen == []
+
+    def test_cancelled_fetch_is_not_a_failure(self):
+        """Test that cancelling a half-open trial frees its slot without reopening the circuit."""
+        async def handler(request):
+            await asyncio.sleep(5)
+            return httpx.Response(200)
+
+        async def fetch():
+            scraper = unthrottled(ZapScraper())
+            scraper.async_client = mock_client(handler)
+            breaker = scraper.circuit_breaker
+            breaker._open(time.monotonic() - breaker.open_seconds)
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(scraper.async_fetch("https://www.zap.co.il/x"), 0.05)
+                return breaker.state(), breaker.allow()
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        assert run(fetch()) == (HALF_OPEN, True)
+
+
+class TestDeadlineFanOut:
+    """Tests for deadline-bounded fan-out and hedged requests."""
+
+    def test_partial_results_at_deadline(self):
+        """Test that a slow site does not hold up the others past the deadline."""
+        async def handler(request):
+            if "ksp" in request.url.host:
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=ZAP_SEARCH_HTML)
+
+        async def scenario():
+            manager = ScraperManager(enabled_scrapers=['zap', 'ksp'], cache=ScrapeCache(), deadline=0.2)
+            for scraper in manager.scrapers.values():
+                unthrottled(scraper)
+            manager._async_client = mock_client(handler)
+            loop = asyncio.get_running_loop()
+            async with manager:
+                started = loop.time()
+                results = await manager.search_all("galaxy", 2)
+                elapsed = loop.time() - started
+                late = len(manager._background_tasks)
+            return results, elapsed, late
+
+        results, elapsed, late = run(scenario())
+        assert len(results['zap']) == 2
+        assert results['ksp'] == []
+        assert elapsed < 1.0
+        assert late == 1
+
+    def test_open_site_skipped_by_manager(self):
+        """Test that the manager skips sites whose circuit is open."""
+        async def scenario():
+            manager = ScraperManager(enabled_scrapers=['zap', 'ksp'], cache=ScrapeCache())
+            for scraper in manager.scrapers.values():
+                unthrottled(scraper)
+            manager.scrapers['ksp'].circuit_breaker._open(float("inf"))
+            manager._async_client = mock_client(lambda request: httpx.Response(200, text=ZAP_SEARCH_HTML))
+            async with manager:
+                results = await manager.search_all("galaxy", 2)
+                return results, manager.stats()["circuits"]
+
+        results, circuits = run(scenario())
+        assert results['ksp'] == []
+        assert len(results['zap']) == 2
+        assert circuits['ksp']['state'] == OPEN
+
+    def test_hedged_request_wins_over_slow_primary(self):
+        """Test that a slow request is hedged and the faster response is used."""
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+                return httpx.Response(200, text="slow")
+            return httpx.Response(200, text="fast")
+
+        async def fetch():
+            scraper = unthrottled(ZapScraper())
+            scraper.hedge_after = 0.05
+            scraper.async_client = mock_client(handler)
+            loop = asyncio.get_running_loop()
+            try:
+                started = loop.time()
+                body = await scraper.async_fetch("https://www.zap.co.il/x")
+                return body, loop.time() - started
+            finally:
+                await scraper.async_client.aclose()
+                scraper.close()
+
+        body, elapsed = run(fetch())
+        assert body == b"fast"
+        assert len(calls) == 2
+        assert elapsed < 1.0
+
+
+class TestParserBackends:
+    """Tests for the pluggable search page parsers."""
+
+    @pytest.mark.parametrize("url", CORPUS.urls(kind="search"))
+    def test_backends_agree_on_corpus(self, url):
+        """Test that every backend extracts the same products as the full-tree parser."""
+        content = CORPUS.body(url)
+        scraper = SCRAPERS[CORPUS.entries[url]["file"].split("/")[0]]()
+        results = {}
+        for backend in PARSER_BACKENDS:
+            scraper.parser_backend = backend
+            products = scraper._parse_search_page(content, 50)
+            for product in products:
+                product.pop("last_updated")
+            results[backend] = products
+        scraper.close()
+
+        assert len(results["soup"]) >= 20
+        assert results["lxml"] == results["soup"]
+        assert results["strainer"] == results["soup"]
+
+    def test_container_fallback_and_limit(self):
+        """Test that container selectors fall back in order and respect max_results."""
+        spec = PageSpec(
+            containers=[("div", {"class": "missing"}), ("li", {"data-id": True})],
+            fields={"name": [("b", {})]},
+        )
+        content = "".join(f'<li data-id="{i}"><b>item {i}</b></li>' for i in range(5)).encode()
+        for backend in PARSER_BACKENDS:
+            items = parse_items(content, spec, 3, backend)
+            assert [item.find("name").text for item in items] == ["item 0", "item 1", "item 2"]
+
+    def test_lxml_text_matches_get_text(self):
+        """Test that lxml text skips comments and scripts and strips like get_text(strip=True)."""
+        spec = PageSpec(containers=[("div", {"class": "p"})], fields={"name": [("span", {})]})
+        content = '<div class="p x"><span> a <!-- c --> <b> b </b><script>s()</script> c </span></div>'.encode()
+        texts = {backend: parse_items(content, spec, 1, backend)[0].find("name").text for backend in PARSER_BACKENDS}
+        assert set(texts.values()) == {"abc"}
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            parse_items(b"<html></html>", ZapScraper.SEARCH_PAGE, 10, "regex")
+
+
+class TestReplay:
+    """Tests for the offline record/replay harness."""
+
+    @pytest.mark.parametrize("site", list(SCRAPERS))
+    def test_search_and_details_replay_offline(self, site):
+        """Test that a scraper runs its search and detail paths against the corpus."""
+        scraper = SCRAPERS[site]()
+        unthrottled(scraper)
+        install_replay(scraper, CORPUS)
+
+        products = scraper.search_product("galaxy", max_results=10)
+        assert len(products) == 10
+        assert all(p["price"] > 0 for p in products)
+
+        for url in CORPUS.urls(site, "detail"):
+            details = scraper.get_product_details(url)
+            assert details is not None
+            assert details["name"].startswith("Samsung Galaxy S24")
+            assert details["price"] > 0
+        scraper.close()
+
+    def test_zap_store_rows_replay(self):
+        """Test that Zap's per-store offers parse from a recorded model page."""
+        scraper = ZapScraper()
+        unthrottled(scraper)
+        install_replay(scraper, CORPUS)
+        url = CORPUS.urls("zap", "detail")[0]
+        stores = scraper.get_stores_for_product(url)
+        assert len(stores) >= 12
+        assert all(store["price"] > 0 and store["store_name"] for store in stores)
+        scraper.close()
+
+    def test_async_search_replay(self):
+        """Test that the async fetch path is served by the replay transport."""
+        scraper = KSPScraper()
+        unthrottled(scraper)
+        install_replay(scraper, CORPUS)
+        products = run(scraper.async_search_product("אוזניות", max_results=5))
+        run(scraper.aclose())
+        scraper.close()
+        assert len(products) == 5
+
+    def test_unrecorded_url_raises(self):
+        """Test that a URL missing from the corpus fails loudly instead of going online."""
+        scraper = BugScraper()
+        unthrottled(scraper)
+        install_replay(scraper, CORPUS)
+        with pytest.raises(ReplayMissError):
+            scraper.fetch("https://www.bug.co.il/search?q=unrecorded")
+        scraper.close()
+
+    def test_record_round_trip(self, tmp_path):
+        """Test that recorded responses are compressed, listed in the manifest and replayed."""
+        corpus = ReplayCorpus(str(tmp_path))
+        body = ZAP_SEARCH_HTML.encode("utf-8")
+        corpus.record("https://www.zap.co.il/search.aspx?keyword=x", "zap", "search", 200,
+                      {"Content-Type": "text/html", "Set-Cookie": "secret"}, body, "search_x")
+        corpus.save()
+
+        assert (tmp_path / "zap" / "search_x.html.gz").stat().st_size > 0
+        reloaded = ReplayCorpus(str(tmp_path))
+        assert reloaded.urls("zap", "search") == ["https://www.zap.co.il/search.aspx?keyword=x"]
+        assert reloaded.entries["https://www.zap.co.il/search.aspx?keyword=x"]["headers"] == {"Content-Type": "text/html"}
+        assert reloaded.body("https://www.zap.co.il/search.aspx?keyword=x") == body
+
+
+def http_response(status: int, body: bytes = b"", headers: dict = None) -> requests.Response:
+    """Build a requests.Response for a patched session.get."""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+class TestHTTPCache:
+    """Tests for conditional GET and HTTP caching in the scrapers."""
+
+    def test_freshness_lifetime(self):
+        """Test Cache-Control / Expires handling."""
+        now = 1_700_000_000.0
+        assert freshness_lifetime({"Cache-Control": "public, max-age=300"}, now) == 300
+        assert freshness_lifetime({"Cache-Control": "max-age=300", "Age": "100"}, now) == 200
+        assert freshness_lifetime({"Cache-Control": "no-cache, max-age=300"}, now) == 0
+        assert freshness_lifetime({"Cache-Control": "private, no-store"}, now) is None
+        assert freshness_lifetime({
+            "Date": "Tue, 14 Nov 2023 22:13:20 GMT",
+            "Expires": "Tue, 14 Nov 2023 22:23:20 GMT",
+        }, now) == 600
+        assert freshness_lifetime({}, now) == 0
+
+    def test_conditional_get_reuses_parsed_results(self):
+        """Test that a 304 reuses the stored body and skips re-parsing the page."""
+        scraper = unthrottled(ZapScraper())
+        scraper.http_cache = HTTPCache()
+        sent = []
+
+        def get(url, headers=None, timeout=None):
+            sent.append(dict(headers))
+            if headers.get("If-None-Match") == '"v1"':
+                return http_response(304, headers={"ETag": '"v1"'})
+            return http_response(200, ZAP_SEARCH_HTML.encode(), {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+        with patch.object(scraper.session, "get", side_effect=get):
+            first = scraper.search_product("galaxy")
+            with patch.object(scraper, "_parse_search_page", wraps=scraper._parse_search_page) as parse:
+                second = scraper.search_product("galaxy")
+        scraper.close()
+
+        assert sent[0] == {}
+        assert sent[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        parse.assert_not_called()
+        assert [p["name"] for p in second] == [p["name"] for p in first]
+        assert second[0]["last_updated"] >= first[0]["last_updated"]
+        assert second[0] is not first[0]
+        assert scraper.http_cache.info()["revalidated"] == 1
+
+    def test_changed_page_is_parsed_again(self):
+        """Test that a 200 with a new validator replaces the stored page and its results."""
+        scraper = unthrottled(ZapScraper())
+        scraper.http_cache = HTTPCache()
+        versions = iter([('"v1"', ZAP_SEARCH_HTML), ('"v2"', ZAP_SEARCH_HTML.replace("Galaxy S24", "Galaxy S25"))])
+
+        def get(url, headers=None, timeout=None):
+            etag, body = next(versions)
+            return http_response(200, body.encode(), {"ETag": etag})
+
+        with patch.object(scraper.session, "get", side_effect=get):
+            first = scraper.search_product("galaxy")
+            second = scraper.search_product("galaxy")
+        scraper.close()
+
+        assert "Galaxy S24" in first[0]["name"]
+        assert "Galaxy S25" in second[0]["name"]
+
+    def test_max_age_skips_the_request(self):
+        """Test that a fresh response is served without contacting the site."""
+        clock = FakeClock()
+        scraper = unthrottled(KSPScraper())
+        scraper.http_cache = HTTPCache(clock=clock)
+        url = CORPUS.urls("ksp", "detail")[0]
+        body = CORPUS.body(url)
+        get = patch.object(scraper.session, "get", return_value=http_response(200, body, {"Cache-Control": "max-age=60"}))
+
+        with get as session_get:
+            first = scraper.get_product_details(url)
+            clock.now += 30
+            assert scraper.get_product_details(url) == first
+            assert session_get.call_count == 1
+            clock.now += 60
+            scraper.get_product_details(url)
+            assert session_get.call_count == 2
+        scraper.close()
+
+    def test_no_store_is_not_cached(self):
+        """Test that responses without validators or with no-store are not kept."""
+        cache = HTTPCache()
+        assert cache.store("https://a/1", {"Cache-Control": "no-store", "ETag": '"x"'}, b"body") is None
+        assert cache.store("https://a/2", {}, b"body") is None
+        assert cache.info()["entries"] == 0
+
+    def test_lru_bounded_by_body_size(self):
+        """Test that the cache evicts least recently used bodies beyond max_bytes."""
+        cache = HTTPCache(max_bytes=250)
+        for i in range(3):
+            cache.store(f"https://a/{i}", {"ETag": f'"{i}"'}, b"x" * 100)
+        assert cache.get("https://a/0") is None
+        assert cache.get("https://a/2") is not None
+        assert cache.info()["bytes"] == 200
+
+    def test_async_conditional_get(self):
+        """Test that the async fetch path revalidates and reuses results on 304."""
+        scraper = unthrottled(ZapScraper())
+        scraper.http_cache = HTTPCache()
+        conditional = []
+
+        def handler(request):
+            conditional.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=ZAP_SEARCH_HTML, headers={"ETag": '"v1"'})
+
+        scraper.async_client = mock_client(handler)
+
+        async def scenario():
+            first = await scraper.async_search_product("galaxy")
+            second = await scraper.async_search_product("galaxy")
+            await scraper.async_client.aclose()
+            return first, second
+
+        first, second = run(scenario())
+        scraper.close()
+        assert conditional == [None, '"v1"']
+        assert len(second) == len(first) > 0
+
+
+def offer(source: str, name: str, url: str, price: float) -> dict:
+    """A scraped search result as produced by format_product_data."""
+    return {"source": source, "name": name, "price": price, "url": url, "availability": True,
+            "currency": "ILS", "last_updated": datetime.now()}
+
+
+class TestDetailEnrichment:
+    """Tests for batch detail-page enrichment on ScraperManager."""
+
+    def test_enrich_merges_details_and_store_lists(self):
+        """Test that detail pages from every site are merged into the aggregated records."""
+        zap_url, ksp_url, bug_url = (CORPUS.urls(site, "detail")[0] for site in ("zap", "ksp", "bug"))
+
+        async def enrich():
+            manager = ScraperManager(cache=ScrapeCache())
+            for scraper in manager.scrapers.values():
+                unthrottled(scraper).http_cache = HTTPCache()
+            manager._async_client = httpx.AsyncClient(transport=AsyncReplayTransport(CORPUS))
+            async with manager:
+                aggregated = manager.aggregate_results({
+                    "zap": [offer("Zap", "Galaxy S24", zap_url, 9999)],
+                    "ksp": [offer("KSP", "Galaxy S24", ksp_url, 9999)],
+                    "bug": [offer("Bug", "Galaxy S24 Ultra", bug_url, 9999)],
+                })
+                return await manager.enrich_products(aggregated)
+
+        products = run(enrich())
+        galaxy = next(p for p in products if p["name"] == "Galaxy S24")
+
+        assert galaxy["description"]
+        assert len(galaxy["stores"]) >= 12
+        assert [s["price"] for s in galaxy["stores"]] == sorted(s["price"] for s in galaxy["stores"])
+        assert all(p["price"] < 9999 for p in galaxy["prices"])
+        assert galaxy["highest_price"] < 9999
+        ultra = next(p for p in products if p["name"] == "Galaxy S24 Ultra")
+        assert ultra["prices"][0]["price"] < 9999
+        assert "stores" not in ultra
+
+    def test_details_stream_in_completion_order_under_host_limits(self):
+        """Test that results stream as they finish and each host's concurrency is capped."""
+        body = CORPUS.body(CORPUS.urls("zap", "detail")[0])
+        zap_urls = [f"https://www.zap.co.il/model.aspx?modelid={i}" for i in range(12)]
+        bug_url = CORPUS.urls("bug", "detail")[0]
+        in_flight = {"www.zap.co.il": 0}
+        peak = {"www.zap.co.il": 0}
+
+        async def handler(request):
+            if request.url.host == "www.bug.co.il":
+                return httpx.Response(200, content=CORPUS.body(bug_url))
+            in_flight[request.url.host] += 1
+            peak[request.url.host] = max(peak[request.url.host], in_flight[request.url.host])
+            await asyncio.sleep(0.02)
+            in_flight[request.url.host] -= 1
+            return httpx.Response(200, content=body)
+
+        async def stream():
+            manager = ScraperManager(enabled_scrapers=["zap", "bug"], cache=ScrapeCache())
+            for scraper in manager.scrapers.values():
+                unthrottled(scraper).http_cache = HTTPCache()
+            manager._async_client = mock_client(handler)
+            async with manager:
+                return [(url, details) async for url, details in manager.iter_product_details(
+                    zap_urls + [bug_url, "https://example.com/p/1", zap_urls[0]]
+                )]
+
+        results = run(stream())
+        urls = [url for url, _ in results]
+
+        assert urls[0] == "https://example.com/p/1" and results[0][1] is None
+        assert urls[1] == bug_url
+        assert sorted(urls[2:]) == sorted(zap_urls)
+        assert all(details["stores"] for _, details in results[2:])
+        assert peak["www.zap.co.il"] == MAX_CONNECTIONS_PER_HOST
+
+
+class TestAggregation:
+    """Tests for ScraperManager.aggregate_results."""
+
+    def test_groups_offers_and_computes_statistics(self):
+        """Test grouping by normalized name and statistics over available offers only."""
+        manager = ScraperManager(enabled_scrapers=[], cache=ScrapeCache())
+        sold_out = dict(offer("Bug", "galaxy s24", "https://www.bug.co.il/p/1", 100.0), availability=False)
+        aggregated = manager.aggregate_results({
+            "zap": [offer("Zap", "Galaxy S24", "https://www.zap.co.il/p/1", 3000.0),
+                    offer("Zap", "Pixel 8", "https://www.zap.co.il/p/2", None)],
+            "ksp": [offer("KSP", "GALAXY  S24 חדש", "https://ksp.co.il/p/1", 2400.0)],
+            "bug": [sold_out, offer("Bug", "Galaxy S24", "https://www.bug.co.il/p/2", 2600.0)],
+        })
+        manager.close_all()
+
+        galaxy, pixel = aggregated
+        assert [o["source"] for o in galaxy["prices"]] == ["Zap", "KSP", "Bug", "Bug"]
+        assert galaxy["lowest_price"] == 2400.0
+        assert galaxy["highest_price"] == 3000.0
+        assert galaxy["average_price"] == round((3000 + 2400 + 2600) / 3, 2)
+        assert galaxy["potential_savings"] == 600.0
+        assert galaxy["savings_percent"] == 20.0
+        assert pixel["lowest_price"] is None and "potential_savings" not in pixel
+
+    def test_statistics_match_full_recompute(self):
+        """Test that running statistics equal a from-scratch recomputation."""
+        manager = ScraperManager(enabled_scrapers=[], cache=ScrapeCache())
+        results = {
+            site: [offer(site, f"Product {i % 7}", f"https://{site}/p/{i}", 100 + (i * 37) % 900) for i in range(60)]
+            for site in ("Zap", "KSP", "Bug")
+        }
+        aggregated = manager.aggregate_results(results)
+        for product in aggregated:
+            expected = dict(product)
+            manager._update_price_statistics(expected)
+            assert expected == product
+        manager.close_all()
+
+
+class TestOfferMatching:
+    """Tests for blocking / MinHash-LSH offer matching."""
+
+    def test_extract_features(self):
+        """Test brand aliases, storage, model numbers and dropped boilerplate."""
+        features = extract_features("סמסונג Galaxy S24 Ultra 1 TB שחור 5000 mAh")
+        assert features.brand == "samsung"
+        assert features.storage == 1024
+        assert features.models == {"s24"}
+        assert features.variants == {"ultra"}
+        assert "שחור" not in features.tokens
+        assert blocking_keys(features) == ["s24|ultra"]
+
+    def test_cross_site_listings_merge(self):
+        """Test that differently written listings of one product cluster together."""
+        labels = OfferMatcher().cluster([
+            "Samsung Galaxy S24 128GB",
+            "סמסונג Galaxy S24 128GB שחור",
+            "Apple iPhone 15 Pro 256GB טיטניום טבעי",
+            "אייפון 15 Pro 256GB",
+            "iPhone 15 Pro 256GB",
+        ])
+        assert labels == [0, 0, 1, 1, 1]
+
+    def test_conflicting_listings_stay_apart(self):
+        """Test that variant, storage, model and brand conflicts are never merged."""
+        labels = OfferMatcher().cluster([
+            "Samsung Galaxy S24 128GB",
+            "Samsung Galaxy S24 Ultra 128GB",
+            "Samsung Galaxy S24 256GB",
+            "Samsung Galaxy S23 128GB",
+            "Google Pixel 8",
+            "Google Pixel 7",
+            "Sony WH-1000XM5",
+            "Bose WH-1000XM5",
+        ])
+        assert labels == list(range(8))
+
+    def test_plus_suffix_is_a_variant(self):
+        """Test that "S24+" matches "S24 Plus" but not the plain S24, and "דל" is not Dell."""
+        assert extract_features("Galaxy S24+").variants == {"plus"}
+        labels = OfferMatcher().cluster(["Samsung Galaxy S24", "Samsung Galaxy S24+", "סמסונג Galaxy S24 Plus"])
+        assert labels == [0, 1, 1]
+        assert extract_features("מזרן דל 10 סמ").brand is None
+
+    def test_large_bucket_stays_linear(self):
+        """Test that thousands of identical listings collapse into one cluster."""
+        labels = OfferMatcher().cluster(["AirPods Pro 2"] * 5000 + ["JBL Tune 760NC"])
+        assert set(labels[:5000]) == {0}
+        assert labels[-1] == 1
+
+    def test_minhash_estimates_jaccard(self):
+        """Test that signature agreement approximates Jaccard similarity."""
+        a = frozenset(f"t{i}" for i in range(100))
+        b = frozenset(f"t{i}" for i in range(50, 150))
+        signatures = minhash_signatures([a, b, frozenset()], num_perm=256)
+        agreement = (signatures[0] == signatures[1]).mean()
+        assert abs(agreement - 1 / 3) < 0.1
+        assert (signatures[2] == np.iinfo(np.uint64).max).all()
+
+    def test_aggregate_merges_across_sites(self):
+        """Test that aggregate_results groups matched listings into one product."""
+        manager = ScraperManager(enabled_scrapers=[], cache=ScrapeCache())
+        aggregated = manager.aggregate_results({
+            "ksp": [offer("KSP", "Samsung Galaxy S24 128GB", "https://ksp.co.il/p/1", 3200.0)],
+            "bug": [offer("Bug", "סמסונג Galaxy S24 128GB שחור", "https://www.bug.co.il/p/1", 3000.0)],
+        })
+        manager.close_all()
+        assert len(aggregated) == 1
+        assert aggregated[0]["name"] == "Samsung Galaxy S24 128GB"
+        assert aggregated[0]["lowest_price"] == 3000.0
+
+
+def link_sessions():
+    """Session factory for a fresh in-memory offer_links table."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[OfferLink.__table__])
+    return sessionmaker(bind=engine)
+
+
+class TestCatalogLinking:
+    """Tests for linking scraped listings to catalog product ids."""
+
+    def test_match_listing_names(self):
+        """Test catalog matches despite Hebrew brands and boilerplate, and SKU conflicts."""
+        linker = CatalogLinker(session_factory=link_sessions())
+        assert linker.match("סמסונג Galaxy S24 Ultra 512GB שחור יבואן רשמי") == 6
+        assert linker.match("Apple iPhone 15 Pro Max 256GB Black") == 1
+        assert linker.match("Samsung Galaxy S24 Ultra 256GB") is None  # storage conflict
+        assert linker.match("Samsung Galaxy S25 Ultra 512GB") is None  # unknown model
+        assert linker.match("") is None
+
+    def test_links_are_persisted_and_reused(self):
+        """Test that decisions (including no-match) are stored and looked up, not re-matched."""
+        sessions = link_sessions()
+        listings = [("Zap", "galaxy s24 ultra 512gb"), ("KSP", "unknown gadget 3000"), ("Zap", "galaxy s24 ultra 512gb")]
+        first = CatalogLinker(session_factory=sessions)
+        assert first.link(listings) == [6, None, 6]
+        assert first.matched == 2
+        assert first.link(listings[:1]) == [6] and first.memory_hits == 1
+
+        second = CatalogLinker(session_factory=sessions)
+        with patch.object(second, "match") as match:
+            assert second.link(listings) == [6, None, 6]
+        match.assert_not_called()
+        assert second.stored_hits == 2
+        with sessions() as db:
+            assert db.query(OfferLink).count() == 2
+
+    def test_concurrently_stored_links_keep_the_batch(self):
+        """Test that a listing another search stored first does not drop the rest of the batch."""
+        sessions = link_sessions()
+        CatalogLinker(session_factory=sessions).link([("Zap", "galaxy s24 ultra 512gb")])
+        racing = CatalogLinker(session_factory=sessions)
+        with patch.object(racing, "_load", return_value={}):
+            assert racing.link([("Zap", "galaxy s24 ultra 512gb"), ("Bug", "google pixel 8 pro 256gb")]) == [6, 15]
+        with sessions() as db:
+            assert sorted(db.query(OfferLink.product_id).all()) == [(6,), (15,)]
+
+    def test_catalog_reload_rematches_unmatched(self):
+        """Test that "no match" decisions are forgotten when the catalog is reloaded."""
+        sessions = link_sessions()
+        linker = CatalogLinker(session_factory=sessions)
+        listing = ("Zap", "acme rocket x900")
+        assert linker.link([listing]) == [None]
+
+        original = list(products_database.PRODUCTS_DATABASE)
+        rocket = {"id": 999999, "name": "Acme Rocket X900", "description": "", "category": "צעצועים", "image_url": None}
+        try:
+            products_database.load_catalog(original + [rocket])
+            assert linker.link([listing]) == [999999]
+            assert CatalogLinker(session_factory=sessions).link([listing]) == [999999]
+        finally:
+            products_database.load_catalog(original)
+
+    def test_catalog_reload_revalidates_matches(self):
+        """Test that stored matches to products that changed or vanished are re-matched."""
+        sessions = link_sessions()
+        listings = [("Zap", "galaxy s24 ultra 512gb"), ("Bug", "google pixel 8 pro 256gb")]
+        linker = CatalogLinker(session_factory=sessions)
+        assert linker.link(listings) == [6, 15]
+
+        original = list(products_database.PRODUCTS_DATABASE)
+        by_id = {p["id"]: p for p in original}
+        # Id 6 now belongs to another product; the Galaxy moves to a new id and the Pixel is gone
+        reloaded = [p for p in original if p["id"] not in (6, 15)] + [
+            {**by_id[6], "id": 999998},
+            {**by_id[1], "id": 6},
+        ]
+        try:
+            products_database.load_catalog(reloaded)
+            assert linker.link(listings) == [999998, None]
+            assert CatalogLinker(session_factory=sessions).link(listings) == [999998, None]
+            with sessions() as db:
+                assert sorted(db.query(OfferLink.product_id).all(), key=str) == [(999998,), (None,)]
+        finally:
+            products_database.load_catalog(original)
+
+    def test_database_errors_do_not_break_linking(self):
+        """Test that linking still matches in memory when the table is missing."""
+        linker = CatalogLinker(session_factory=sessionmaker(bind=create_engine("sqlite://")))
+        with patch("builtins.print"):
+            assert linker.link([("Bug", "google pixel 8 pro 256gb")]) == [15]
+
+    def test_aggregate_assigns_catalog_ids(self):
+        """Test catalog ids and details on aggregated products, and stable ids for unlinked ones."""
+        manager = ScraperManager(enabled_scrapers=[], cache=ScrapeCache(),
+                                 catalog_linker=CatalogLinker(session_factory=link_sessions()))
+        results = {
+            "zap": [offer("Zap", "Samsung Galaxy S24 Ultra 512GB", "https://www.zap.co.il/p/1", 4900.0),
+                    offer("Zap", "מטען נייד ללא שם", "https://www.zap.co.il/p/2", 99.0)],
+            "bug": [offer("Bug", "סמסונג S24 Ultra 512GB אחריות יבואן", "https://www.bug.co.il/p/1", 4700.0)],
+        }
+        aggregated = manager.aggregate_results(results, link_catalog=True)
+        again = manager.aggregate_results(results, link_catalog=True)
+        manager.close_all()
+
+        galaxy, charger = aggregated
+        assert galaxy["id"] == 6
+        assert galaxy["name"] == "Samsung Galaxy S24 Ultra 512GB"
+        assert galaxy["category"] == "אלקטרוניקה"
+        assert [o["source"] for o in galaxy["prices"]] == ["Zap", "Bug"]
+        assert galaxy["lowest_price"] == 4700.0
+        assert charger["id"] == unlinked_product_id("מטען נייד ללא שם") > UNLINKED_ID_BASE
+        assert [p["id"] for p in again] == [6, charger["id"]]